@@ -0,0 +1,4 @@
+"""Benchmarks and load generators for the CompassX CRM backend.
+
+Run from the backend directory, e.g. ``python -m bench.copilot --help``.
+"""
@@ -0,0 +1,160 @@
+"""AI copilot latency/throughput benchmark.
+
+Two modes:
+
+- provider (default): drives the long-lived provider stack from
+  ``llm_providers`` (deadlines, circuit breaker, metrics) around the
+  deterministic fake provider. No network or database needed.
+- http: drives POST /api/ai/copilot or /api/ai/copilot/stream on a running
+  backend (start it with LLM_PROVIDER=fake to keep it offline).
+
+    python -m bench.copilot --requests 2000 --concurrency 64
+    python -m bench.copilot --mode http --url http://localhost:8001 --token $JWT --opp-id opp_1 --stream
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_providers import CircuitBreaker, FakeProvider, LLMError, ResilientProvider  # noqa: E402
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(latencies, ttfts, errors, elapsed):
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round((len(latencies) + errors) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.5) * 1000, 2) if latencies else None,
+            "p99": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+            "max": round(max(latencies) * 1000, 2) if latencies else None,
+        },
+        "ttft_ms": {
+            "p50": round(percentile(ttfts, 0.5) * 1000, 2) if ttfts else None,
+            "p99": round(percentile(ttfts, 0.99) * 1000, 2) if ttfts else None,
+        },
+    }
+
+
+async def run(n, concurrency, call):
+    """Run `call(i)` n times with bounded concurrency; call returns ttft or None"""
+    latencies, ttfts = [], []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ttft = await call(i)
+            except (LLMError, httpx.HTTPError):
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            if ttft is not None:
+                ttfts.append(ttft)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return summarize(latencies, ttfts, errors, time.perf_counter() - started)
+
+
+async def bench_provider(args):
+    provider = ResilientProvider(
+        FakeProvider(first_token_ms=args.first_token_ms, token_ms=args.token_ms, num_tokens=args.tokens,
+                     error_rate=args.error_rate, seed=args.seed),
+        timeout=args.timeout,
+        breaker=CircuitBreaker(failure_threshold=10 ** 9),  # measure raw behaviour, never trip
+    )
+
+    async def call(i):
+        prompt = f"benchmark prompt {i % args.distinct_prompts}"
+        if not args.stream:
+            await provider.complete(prompt, "system", f"bench_{i}")
+            return None
+        started = time.perf_counter()
+        ttft = None
+        async for _ in provider.stream(prompt, "system", f"bench_{i}"):
+            if ttft is None:
+                ttft = time.perf_counter() - started
+        return ttft
+
+    result = await run(args.requests, args.concurrency, call)
+    result["provider"] = provider.stats()
+    return result
+
+
+async def bench_http(args):
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=120) as client:
+
+        async def call(i):
+            payload = {"action": args.action, "opp_id": args.opp_id, "context": f"bench {i % args.distinct_prompts}"}
+            if not args.stream:
+                response = await client.post("/api/ai/copilot", json=payload)
+                response.raise_for_status()
+                return None
+            started = time.perf_counter()
+            ttft = None
+            async with client.stream("POST", "/api/ai/copilot/stream", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if ttft is None and line.startswith("event: token"):
+                        ttft = time.perf_counter() - started
+            return ttft
+
+        result = await run(args.requests, args.concurrency, call)
+        metrics = await client.get("/api/ai/copilot/metrics")
+        if metrics.status_code == 200:
+            result["server"] = metrics.json()
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["provider", "http"], default="provider")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--stream", action="store_true", help="Measure the streaming path (reports TTFT)")
+    parser.add_argument("--distinct-prompts", type=int, default=10 ** 9,
+                        help="Cycle through this many distinct prompts (lower values exercise coalescing in http mode)")
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--token-ms", type=float, default=5)
+    parser.add_argument("--tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--url", default=os.environ.get("BENCH_URL", "http://localhost:8001"))
+    parser.add_argument("--token", default=os.environ.get("BENCH_TOKEN"))
+    parser.add_argument("--opp-id", default="opp_1")
+    parser.add_argument("--action", default="summarize")
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(bench_provider(args) if args.mode == "provider" else bench_http(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Endpoint benchmark: latency, throughput, memory and Mongo commands per /api route.
+
+Drives the FastAPI app in-process through httpx's ASGI transport against a
+real mongod (MONGO_URL, default mongodb://localhost:27017). Each dataset
+scale gets its own database (<db-prefix>_<scale>), filled with the
+synthetic data generator and reused on later runs while its counts match.
+
+Every GET route under /api is discovered from the app and called with ids
+sampled from the dataset, plus a scenario for every create/update
+endpoint. Per endpoint it reports throughput, p50/p99 latency, peak RSS
+and the Mongo commands issued per request, which is how N+1 query
+patterns and extra read-backs after writes show up.
+
+    python -m bench.endpoints run --scales 1k 10k --output bench-results.json
+    python -m bench.endpoints run --scales 100k --only /api/organizations /api/dashboard
+    python -m bench.endpoints run --writes-only --iterations 200 --output writes.json
+    python -m bench.endpoints compare baseline.json bench-results.json --threshold 0.2
+
+compare prints the p50 change of every endpoint in both files to stderr and
+exits with status 1 when an endpoint regressed, so it can gate CI.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from pymongo import monitoring
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "compassx_bench")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts Mongo commands by name; registered before the app's client is created"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def reset(self):
+        with self.lock:
+            self.counts = {}
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.counts)
+
+    def started(self, event):
+        with self.lock:
+            self.counts[event.command_name] = self.counts.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+commands = CommandCounter()
+monitoring.register(commands)
+
+import server  # noqa: E402
+from bench.copilot import percentile  # noqa: E402
+
+# Opportunities per scale; the other collections are sized relative to it
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+# GET routes that mutate data, never finish (the /api/events SSE stream) or aren't meaningful to time
+SKIP_ROUTES = {"/api/seed", "/api/auth/logout", "/api/events", "/api/ai/copilot/stream"}
+
+# Writes benchmarked alongside the GET routes: (name, method, path template, body)
+WRITE_SCENARIOS = [
+    ("POST /api/organizations", "POST", "/api/organizations",
+     lambda ids: {"name": f"Bench Organization {time.time()}", "region": "North America"}),
+    ("PUT /api/organizations/{org_id}", "PUT", "/api/organizations/{org_id}",
+     lambda ids: {"name": "Bench Organization", "region": "North America"}),
+    ("POST /api/contacts", "POST", "/api/contacts",
+     lambda ids: {"name": "Bench Contact", "org_id": ids["org_id"], "email": "bench@example.com"}),
+    ("PUT /api/contacts/{contact_id}", "PUT", "/api/contacts/{contact_id}",
+     lambda ids: {"name": "Bench Contact", "org_id": ids["org_id"], "title": f"bench {time.time()}"}),
+    ("POST /api/opportunities", "POST", "/api/opportunities",
+     lambda ids: {"name": "Bench Opportunity", "org_id": ids["org_id"], "engagement_type": "Strategy",
+                  "estimated_value": 100000, "pipeline_id": ids["pipeline_id"], "stage_id": ids["stage_id"]}),
+    ("PUT /api/opportunities/{opp_id}", "PUT", "/api/opportunities/{opp_id}",
+     lambda ids: {"notes": f"bench {time.time()}"}),
+    ("PUT /api/opportunities/{opp_id}/at-risk", "PUT", "/api/opportunities/{opp_id}/at-risk",
+     lambda ids: {"is_at_risk": True, "at_risk_reason": "bench"}),
+    ("POST /api/activities", "POST", "/api/activities",
+     lambda ids: {"activity_type": "Call", "title": "bench", "opp_id": ids["opp_id"],
+                  "due_date": datetime.now(timezone.utc).isoformat()}),
+    ("PUT /api/activities/{activity_id}", "PUT", "/api/activities/{activity_id}",
+     lambda ids: {"notes": f"bench {time.time()}"}),
+    ("PUT /api/auth/users/{user_id}", "PUT", "/api/auth/users/{user_id}",
+     lambda ids: {"name": "Bench Admin"}),
+]
+
+# A route regresses when p50/p99 grow by more than the threshold (and this
+# many ms, to ignore jitter on very fast routes) or it issues more commands
+MIN_REGRESSION_MS = 1.0
+
+
+def dataset_volumes(opportunities: int) -> dict:
+    return {
+        "organizations": max(opportunities // 10, 1),
+        "contacts": opportunities // 2,
+        "opportunities": opportunities,
+        "activities": opportunities * 3,
+    }
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1 << 20)
+    except (OSError, ValueError):
+        # ru_maxrss is KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+class RSSSampler:
+    """Samples process RSS in a background thread to catch per-endpoint peaks"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.peak = current_rss_mb()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_mb())
+
+
+async def prepare_dataset(scale: str, db_prefix: str, seed: int, regenerate: bool) -> dict:
+    """Point the app at the scale's database and make sure it holds the expected volumes"""
+    server.db = server.client[f"{db_prefix}_{scale}"]
+    server.change_log.db = server.db
+    server.write_generations.collection = server.db.write_generations
+    server.export_lookups = server.LookupCache(server.EXPORT_LOOKUP_TTL)
+    volumes = dataset_volumes(SCALES[scale])
+
+    await server.setup_admin()
+    counts = {c: await server.db[c].count_documents({}) for c in volumes}
+    if regenerate or counts != volumes:
+        print(f"[{scale}] generating {volumes}", file=sys.stderr)
+        params = server.SyntheticDataRequest(**volumes, seed=seed, anchor_date="2026-01-01", clear=True)
+        await server.generate_synthetic_data(params)
+    else:
+        print(f"[{scale}] reusing existing dataset", file=sys.stderr)
+    await server.startup_tasks()  # indexes
+
+    admin = await server.db.users.find_one({"role": "admin"}, {"_id": 0})
+    ids = {"user_id": admin["user_id"], "collection": "opportunities", "job_id": "job_bench_missing"}
+    for collection, field in [("organizations", "org_id"), ("contacts", "contact_id"),
+                              ("opportunities", "opp_id"), ("activities", "activity_id"),
+                              ("pipelines", "pipeline_id")]:
+        # A mid-sized record rather than the first one inserted
+        doc = await server.db[collection].find_one({}, {"_id": 0, field: 1}, skip=min(volumes.get(collection, 0) // 2, 1000))
+        doc = doc or await server.db[collection].find_one({}, {"_id": 0, field: 1})
+        ids[field] = doc[field] if doc else "missing"
+    stage = await server.db.stages.find_one({"pipeline_id": ids["pipeline_id"]}, {"_id": 0, "stage_id": 1})
+    ids["stage_id"] = stage["stage_id"] if stage else "missing"
+    ids["token"] = server.create_access_token({"user_id": admin["user_id"], "email": admin["email"]})
+    return ids
+
+
+def discover_routes(only=None, writes_only: bool = False) -> list:
+    """(name, method, path template, body factory) for every GET route under /api and the write scenarios"""
+    routes = []
+    for route in [] if writes_only else server.app.routes:
+        path = getattr(route, "path", "")
+        if not path.startswith("/api") or path in SKIP_ROUTES or "GET" not in getattr(route, "methods", set()):
+            continue
+        routes.append((f"GET {path}", "GET", path, None))
+    routes.extend(WRITE_SCENARIOS)
+    if only:
+        routes = [r for r in routes if any(r[2].startswith(prefix) for prefix in only)]
+    return routes
+
+
+async def bench_endpoint(client: httpx.AsyncClient, method: str, path: str, body, ids: dict,
+                         iterations: int, warmup: int) -> dict:
+    url = path.format(**ids)
+    statuses = {}
+
+    async def call():
+        response = await client.request(method, url, json=body(ids) if body else None)
+        await response.aread()
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    for _ in range(warmup):
+        await call()
+    statuses.clear()
+
+    latencies = []
+    commands.reset()
+    with RSSSampler() as rss:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+    issued = commands.snapshot()
+    total_commands = sum(issued.values())
+
+    return {
+        "requests": iterations,
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+        "throughput_rps": round(iterations / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.5) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2),
+        },
+        "peak_rss_mb": round(rss.peak, 1),
+        "db_commands_per_request": round(total_commands / iterations, 2),
+        "db_commands": issued,
+    }
+
+
+async def run_benchmarks(args) -> dict:
+    results = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mongo_url": os.environ["MONGO_URL"].split("@")[-1],
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+        },
+        "scales": {},
+    }
+    transport = httpx.ASGITransport(app=server.app)
+    for scale in args.scales:
+        ids = await prepare_dataset(scale, args.db_prefix, args.seed, args.regenerate)
+        scale_results = {"volumes": dataset_volumes(SCALES[scale]), "endpoints": {}}
+        headers = {"Authorization": f"Bearer {ids['token']}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=600) as client:
+            for name, method, path, body in discover_routes(args.only, args.writes_only):
+                result = await bench_endpoint(client, method, path, body, ids, args.iterations, args.warmup)
+                scale_results["endpoints"][name] = result
+                print(f"[{scale}] {name:<55} p50 {result['latency_ms']['p50']:>9.2f}ms  "
+                      f"p99 {result['latency_ms']['p99']:>9.2f}ms  "
+                      f"{result['db_commands_per_request']:>7.1f} cmds/req  {result['status_codes']}",
+                      file=sys.stderr)
+        results["scales"][scale] = scale_results
+    results["meta"]["peak_rss_mb"] = round(current_rss_mb(), 1)
+    server.client.close()
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """List regressions of current vs baseline for every (scale, endpoint) in both"""
+    regressions = []
+    for scale, data in current.get("scales", {}).items():
+        base_endpoints = baseline.get("scales", {}).get(scale, {}).get("endpoints", {})
+        for name, result in data["endpoints"].items():
+            base = base_endpoints.get(name)
+            if not base:
+                continue
+            for q in ("p50", "p99"):
+                before, after = base["latency_ms"][q], result["latency_ms"][q]
+                if after > before * (1 + threshold) and after - before > MIN_REGRESSION_MS:
+                    regressions.append({"scale": scale, "endpoint": name, "metric": f"latency_ms.{q}",
+                                        "baseline": before, "current": after,
+                                        "change": f"+{(after / before - 1) * 100:.0f}%" if before else "new"})
+            before, after = base["db_commands_per_request"], result["db_commands_per_request"]
+            if after > before:
+                regressions.append({"scale": scale, "endpoint": name, "metric": "db_commands_per_request",
+                                    "baseline": before, "current": after, "change": f"+{after - before:g}"})
+    return regressions
+
+
+def p50_changes(baseline: dict, current: dict) -> list:
+    """(scale, endpoint, baseline p50, current p50, commands before, after) for every endpoint in both"""
+    rows = []
+    for scale, data in current.get("scales", {}).items():
+        base_endpoints = baseline.get("scales", {}).get(scale, {}).get("endpoints", {})
+        for name, result in data["endpoints"].items():
+            base = base_endpoints.get(name)
+            if base:
+                rows.append((scale, name, base["latency_ms"]["p50"], result["latency_ms"]["p50"],
+                             base["db_commands_per_request"], result["db_commands_per_request"]))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Benchmark endpoints at one or more dataset scales")
+    run.add_argument("--scales", nargs="+", choices=list(SCALES), default=["1k"])
+    run.add_argument("--iterations", type=int, default=30, help="Timed requests per endpoint")
+    run.add_argument("--warmup", type=int, default=3)
+    run.add_argument("--only", nargs="+", help="Only routes whose path starts with one of these")
+    run.add_argument("--writes-only", action="store_true", help="Only the create/update scenarios")
+    run.add_argument("--db-prefix", default="compassx_bench")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--regenerate", action="store_true", help="Rebuild datasets even if they look complete")
+    run.add_argument("--output", help="Write the JSON result to this file")
+
+    cmp = sub.add_parser("compare", help="Flag regressions against a baseline result file")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.2, help="Allowed relative latency increase")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        baseline, current = json.loads(Path(args.baseline).read_text()), json.loads(Path(args.current).read_text())
+        for scale, name, before, after, cmds_before, cmds_after in p50_changes(baseline, current):
+            change = f"{(after / before - 1) * 100:+.0f}%" if before else "n/a"
+            print(f"[{scale}] {name:<55} p50 {before:>9.2f}ms -> {after:>9.2f}ms {change:>6}  "
+                  f"cmds/req {cmds_before:g} -> {cmds_after:g}", file=sys.stderr)
+        regressions = compare(baseline, current, args.threshold)
+        print(json.dumps({"regressions": regressions}, indent=2))
+        sys.exit(1 if regressions else 0)
+
+    result = asyncio.run(run_benchmarks(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""Page-load replay load test.
+
+Virtual users log in and browse like the React app does: each page replays
+the same fan-out of API calls as its component (parallel Promise.all waves,
+then the dependent follow-up calls), followed by exponential think time.
+A share of actions are writes taken from the UI: dragging a deal to another
+stage on the Pipeline board and logging an activity on an opportunity.
+
+Reports page-level latency percentiles (the whole fan-out, as the user
+waits for it), per-request percentiles and throughput. With --ramp it runs
+one step per virtual-user count and reports where throughput saturates.
+
+    python -m bench.pageload --url http://localhost:8001 --users 50 --duration 60
+    python -m bench.pageload --ramp 10 25 50 100 200 --duration 30 --slo-ms 1000 --output pageload.json
+
+Page call patterns mirror frontend/src/pages/*.jsx; keep them in sync when
+a page's data loading changes.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench.copilot import percentile  # noqa: E402
+
+DEFAULT_ACCOUNTS = ["brian.clements@compassx.com:CompassX2026!", "seth.cushing@compassx.com:CompassX2026!"]
+
+
+class VirtualUser:
+    """One logged-in browser session replaying page loads"""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, pools: dict, stats: "Stats", max_fanout: int):
+        self.client = client
+        self.rng = rng
+        self.pools = pools
+        self.stats = stats
+        self.max_fanout = max_fanout
+
+    async def request(self, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            body = response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+            ok = response.status_code < 400
+        except (httpx.HTTPError, ValueError):
+            body, ok = None, False
+        self.stats.record_request(time.perf_counter() - started, ok)
+        if not ok:
+            raise PageError(f"{method} {path}")
+        return body
+
+    async def get(self, *paths):
+        """One Promise.all wave: GET all paths concurrently, return bodies in order"""
+        return await asyncio.gather(*(self.request("GET", p) for p in paths))
+
+    def pick(self, pool: str):
+        return self.rng.choice(self.pools[pool]) if self.pools[pool] else "missing"
+
+    # ---- pages (frontend/src/pages) ----
+
+    async def dashboard(self):
+        await self.get("/api/dashboard/sales", "/api/auth/me", "/api/organizations", "/api/reports/summary")
+
+    async def pipeline(self):
+        pipelines, _, _, _ = await self.get("/api/pipelines", "/api/organizations", "/api/auth/users", "/api/auth/me")
+        if pipelines:
+            pipeline_id = next((p for p in pipelines if p.get("is_default")), pipelines[0])["pipeline_id"]
+            await self.get(f"/api/pipelines/{pipeline_id}/stages", f"/api/opportunities?pipeline_id={pipeline_id}")
+
+    async def my_pipeline(self):
+        await self.get("/api/dashboard/my-pipeline", "/api/organizations", "/api/auth/me")
+
+    async def executive_dashboard(self):
+        await self.get("/api/dashboard/executive")
+
+    async def organizations(self):
+        orgs, _ = await self.get("/api/organizations", "/api/auth/users")
+        # The list page loads a summary per organization
+        limit = len(orgs) if not self.max_fanout else self.max_fanout
+        await self.get(*[f"/api/organizations/{o['org_id']}/summary" for o in orgs[:limit]])
+
+    async def organization_detail(self):
+        org_id = self.pick("org_ids")
+        results = await self.get(
+            f"/api/organizations/{org_id}", f"/api/contacts?org_id={org_id}", "/api/opportunities",
+            "/api/auth/users", "/api/pipelines", f"/api/activities?org_id={org_id}",
+            f"/api/organizations/{org_id}/summary", f"/api/organizations/{org_id}/notes"
+        )
+        pipelines = results[4]
+        if pipelines:
+            pipeline_id = next((p for p in pipelines if p.get("is_default")), pipelines[0])["pipeline_id"]
+            await self.get(f"/api/pipelines/{pipeline_id}/stages")
+
+    async def opportunity_detail(self):
+        opp_id = self.pick("opp_ids")
+        opp, _, pipelines, _, _ = await self.get(
+            f"/api/opportunities/{opp_id}", f"/api/activities?opp_id={opp_id}", "/api/pipelines",
+            "/api/auth/users", f"/api/ai/copilot/results/{opp_id}"
+        )
+        if pipelines:
+            pipeline_id = next((p for p in pipelines if p.get("is_default")), pipelines[0])["pipeline_id"]
+            await self.get(f"/api/pipelines/{pipeline_id}/stages")
+        if opp.get("org_id"):
+            await self.get(f"/api/organizations/{opp['org_id']}")
+        if opp.get("primary_contact_id"):
+            await self.get(f"/api/contacts/{opp['primary_contact_id']}")
+
+    async def contacts(self):
+        await self.get("/api/contacts", "/api/organizations", "/api/auth/users")
+
+    async def contact_detail(self):
+        contact, _ = await self.get(f"/api/contacts/{self.pick('contact_ids')}", "/api/auth/users")
+        if contact.get("org_id"):
+            await self.get(f"/api/organizations/{contact['org_id']}")
+        await self.get("/api/opportunities")
+
+    async def activities(self):
+        await self.get("/api/activities", "/api/opportunities", "/api/organizations")
+
+    async def reports(self):
+        (me,) = await self.get("/api/auth/me")
+        owner = f"?owner_id={me['user_id']}" if self.rng.random() < 0.5 else ""
+        await self.get(f"/api/analytics/pipeline{owner}", f"/api/analytics/engagement-types{owner}",
+                       "/api/analytics/by-owner", f"/api/analytics/summary{owner}")
+
+    # ---- writes ----
+
+    async def move_stage(self):
+        """Pipeline board drag-and-drop"""
+        await self.request("PUT", f"/api/opportunities/{self.pick('opp_ids')}", json={"stage_id": self.pick("stage_ids")})
+
+    async def log_activity(self):
+        """Add Activity dialog on an opportunity"""
+        due = datetime.now(timezone.utc) + timedelta(days=self.rng.randint(-3, 14))
+        await self.request("POST", "/api/activities", json={
+            "activity_type": self.rng.choice(["Call", "Meeting", "Follow-up", "Demo"]),
+            "title": "Load test activity",
+            "opp_id": self.pick("opp_ids"),
+            "due_date": due.isoformat(),
+            "status": "Planned",
+        })
+
+
+class PageError(Exception):
+    pass
+
+
+# Relative frequency of each action in the user mix
+PAGE_MIX = {
+    "dashboard": 20, "pipeline": 14, "my_pipeline": 8, "opportunity_detail": 14, "organization_detail": 8,
+    "organizations": 6, "contacts": 5, "contact_detail": 3, "activities": 5, "reports": 5,
+    "executive_dashboard": 2,
+}
+WRITE_MIX = {"move_stage": 5, "log_activity": 5}
+
+
+class Stats:
+    def __init__(self):
+        self.pages = {}
+        self.page_errors = {}
+        self.requests = []
+        self.request_errors = 0
+
+    def record_request(self, seconds: float, ok: bool):
+        self.requests.append(seconds)
+        if not ok:
+            self.request_errors += 1
+
+    def record_page(self, page: str, seconds: float, ok: bool):
+        if ok:
+            self.pages.setdefault(page, []).append(seconds)
+        else:
+            self.page_errors[page] = self.page_errors.get(page, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        def ms(values, q):
+            return round(percentile(values, q) * 1000, 1) if values else None
+
+        pages = {}
+        for page in sorted(set(self.pages) | set(self.page_errors)):
+            values = self.pages.get(page, [])
+            pages[page] = {"count": len(values), "errors": self.page_errors.get(page, 0),
+                           "p50_ms": ms(values, 0.5), "p95_ms": ms(values, 0.95), "p99_ms": ms(values, 0.99)}
+        all_pages = [v for values in self.pages.values() for v in values]
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "pages_per_second": round(len(all_pages) / elapsed, 2) if elapsed else None,
+            "requests_per_second": round(len(self.requests) / elapsed, 1) if elapsed else None,
+            "page_latency_ms": {"p50": ms(all_pages, 0.5), "p95": ms(all_pages, 0.95), "p99": ms(all_pages, 0.99)},
+            "request_latency_ms": {"p50": ms(self.requests, 0.5), "p99": ms(self.requests, 0.99)},
+            "page_errors": sum(self.page_errors.values()),
+            "request_errors": self.request_errors,
+            "pages": pages,
+        }
+
+
+async def login(client: httpx.AsyncClient, account: str):
+    """JWT from the session cookie, or None if the account can't log in"""
+    email, password = account.split(":", 1)
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    if response.status_code != 200:
+        print(f"login failed for {email}: {response.status_code}", file=sys.stderr)
+        return None
+    return response.cookies.get("session_token")
+
+
+async def load_pools(client: httpx.AsyncClient, headers: dict) -> dict:
+    """Ids the virtual users pick from, loaded once up front"""
+    async def ids(path, field):
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        return [d[field] for d in response.json()]
+
+    pools = {
+        "org_ids": await ids("/api/organizations", "org_id"),
+        "contact_ids": await ids("/api/contacts", "contact_id"),
+        "opp_ids": await ids("/api/opportunities", "opp_id"),
+        "stage_ids": [],
+    }
+    for pipeline_id in await ids("/api/pipelines", "pipeline_id"):
+        pools["stage_ids"] += await ids(f"/api/pipelines/{pipeline_id}/stages", "stage_id")
+    return pools
+
+
+async def run_step(args, n_users: int, tokens: list, pools: dict) -> dict:
+    stats = Stats()
+    mix = dict(PAGE_MIX)
+    if not args.no_writes:
+        mix.update(WRITE_MIX)
+    actions, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=n_users * 6, max_keepalive_connections=n_users * 6)
+    deadline = time.perf_counter() + args.duration
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+
+        async def virtual_user(i: int):
+            rng = random.Random(args.seed * 100_003 + i)
+            headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+            vu = VirtualUser(ClientWithHeaders(client, headers), rng, pools, stats, args.max_fanout)
+            # Stagger arrivals so every user doesn't hit the dashboard at t=0
+            await asyncio.sleep(rng.uniform(0, min(args.think_time, args.duration / 4)))
+            while time.perf_counter() < deadline:
+                action = rng.choices(actions, weights=weights)[0]
+                started = time.perf_counter()
+                try:
+                    await getattr(vu, action)()
+                    ok = True
+                except (PageError, KeyError, TypeError, AttributeError, IndexError):
+                    ok = False
+                stats.record_page(action, time.perf_counter() - started, ok)
+                await asyncio.sleep(rng.expovariate(1 / args.think_time) if args.think_time > 0 else 0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(i) for i in range(n_users)))
+        result = stats.summary(time.perf_counter() - started)
+    result["virtual_users"] = n_users
+    return result
+
+
+class ClientWithHeaders:
+    """Shares one connection pool across users while sending each user's token"""
+
+    def __init__(self, client: httpx.AsyncClient, headers: dict):
+        self.client = client
+        self.headers = headers
+
+    async def request(self, method, path, **kwargs):
+        return await self.client.request(method, path, headers=self.headers, **kwargs)
+
+
+def find_saturation(steps: list, slo_ms: float) -> dict:
+    """Last step before throughput stops growing (<5%) or page p99 breaks the SLO"""
+    best = None
+    for step in steps:
+        p99 = step["page_latency_ms"]["p99"]
+        if p99 is not None and p99 > slo_ms:
+            break
+        if best and step["pages_per_second"] < best["pages_per_second"] * 1.05:
+            if step["pages_per_second"] > best["pages_per_second"]:
+                best = step
+            break
+        best = step
+    if not best:
+        return {"virtual_users": None, "pages_per_second": None, "requests_per_second": None}
+    return {"virtual_users": best["virtual_users"], "pages_per_second": best["pages_per_second"],
+            "requests_per_second": best["requests_per_second"]}
+
+
+async def main(args) -> dict:
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        tokens = [args.token] if args.token else [t for a in args.accounts if (t := await login(client, a))]
+        if not tokens:
+            sys.exit("No account could log in")
+        pools = await load_pools(client, {"Authorization": f"Bearer {tokens[0]}"})
+    print(f"pools: {', '.join(f'{k}={len(v)}' for k, v in pools.items())}", file=sys.stderr)
+
+    steps = []
+    for n_users in (args.ramp or [args.users]):
+        result = await run_step(args, n_users, tokens, pools)
+        print(f"{n_users:>5} users: {result['pages_per_second']:>8} pages/s  {result['requests_per_second']:>8} req/s  "
+              f"page p50 {result['page_latency_ms']['p50']}ms p99 {result['page_latency_ms']['p99']}ms  "
+              f"errors {result['page_errors']}", file=sys.stderr)
+        steps.append(result)
+
+    report = {
+        "url": args.url,
+        "duration_s": args.duration,
+        "think_time_s": args.think_time,
+        "writes": not args.no_writes,
+        "steps": steps,
+    }
+    if args.ramp:
+        report["saturation"] = find_saturation(steps, args.slo_ms)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.environ.get("BENCH_URL", "http://localhost:8001"))
+    parser.add_argument("--token", default=os.environ.get("BENCH_TOKEN"), help="Use this token instead of logging in")
+    parser.add_argument("--accounts", nargs="+", default=DEFAULT_ACCOUNTS, help="email:password pairs, assigned round-robin")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--ramp", type=int, nargs="+", help="Run one step per user count and report saturation")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds per step")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Mean seconds between actions (exponential)")
+    parser.add_argument("--max-fanout", type=int, default=200,
+                        help="Cap on per-item calls (Organizations page summaries); 0 replays them all")
+    parser.add_argument("--no-writes", action="store_true", help="Read-only page mix")
+    parser.add_argument("--slo-ms", type=float, default=2000, help="Page p99 above this counts as saturated")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    print(text)
@@ -0,0 +1,178 @@
+"""JSON serialization benchmark: FastAPI's default encoder vs orjson vs cached bytes.
+
+Builds sales-dashboard-shaped payloads (opportunities, activities, stages,
+users, metrics) with the synthetic data generator, then times:
+
+- encode: jsonable_encoder + JSONResponse.render (FastAPI's default path)
+  vs responses.dumps (orjson) vs a ResponseCache hit
+- http: the same payload served in-process through httpx's ASGI transport
+  by a default APIRoute, a FastJSONRoute and a cached_response-style
+  endpoint, so routing and ASGI overhead are included
+
+No database or network needed.
+
+    python -m bench.serialization --opportunities 1000 5000 --iterations 50
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "compassx_bench")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("TRACING", "false")
+
+import server  # noqa: E402
+from bench.copilot import percentile  # noqa: E402
+from responses import CollectionVersions, EncodedJSONResponse, FastJSONRoute, ResponseCache, dumps  # noqa: E402
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+BENCH_STAGES = [
+    {"stage_id": f"stage_{order}", "pipeline_id": "pipe_default", "name": name, "order": order, "win_probability": win}
+    for order, (name, win) in enumerate([("Initial Conversation", 10), ("Discovery", 20), ("Value Hypothesis", 40),
+                                         ("Solution Direction", 60), ("Commercials", 75), ("SOW in Progress", 90),
+                                         ("Closed – Won", 100), ("Closed – Lost", 0)], start=1)
+]
+BENCH_USERS = [{"user_id": f"user_bench{i}", "email": f"rep{i}@example.com", "name": f"Rep {i}", "role": "sales_lead"}
+               for i in range(8)]
+
+
+def dashboard_payload(opportunities: int, seed: int = 42) -> dict:
+    """Same shape as GET /api/dashboard/sales"""
+    gen = server.SyntheticDataGenerator([u["user_id"] for u in BENCH_USERS], BENCH_STAGES, seed=seed)
+    list(gen.organizations(max(opportunities // 10, 1)))
+    list(gen.contacts(opportunities // 2))
+    opps = list(gen.opportunities(opportunities))
+    activities = list(gen.activities(opportunities // 2))
+    return {
+        "opportunities": opps,
+        "stages": BENCH_STAGES,
+        "activities": activities,
+        "users": BENCH_USERS,
+        "current_user_id": BENCH_USERS[0]["user_id"],
+        "metrics": {"total_opportunities": len(opps), "total_value": sum(o["estimated_value"] for o in opps)},
+    }
+
+
+def time_calls(fn, iterations: int) -> dict:
+    fn()
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+def summarize(latencies: list) -> dict:
+    return {
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def bench_encode(payload: dict, iterations: int) -> dict:
+    cache = ResponseCache(CollectionVersions())
+    cache.put(("bench",), (0,), dumps(payload))
+    default_response = JSONResponse(None)
+    return {
+        "default": time_calls(lambda: default_response.render(jsonable_encoder(payload)), iterations),
+        "orjson": time_calls(lambda: dumps(payload), iterations),
+        "cached": time_calls(lambda: cache.get(("bench",), (0,))["identity"], iterations),
+    }
+
+
+def build_app(payload: dict) -> FastAPI:
+    """One endpoint per strategy, each returning the same payload"""
+    app = FastAPI()
+    default_router = APIRouter()
+    fast_router = APIRouter(route_class=FastJSONRoute)
+    cache = ResponseCache(CollectionVersions())
+
+    @default_router.get("/default")
+    async def default_endpoint():
+        return payload
+
+    @fast_router.get("/orjson")
+    async def orjson_endpoint():
+        return payload
+
+    @fast_router.get("/cached")
+    async def cached_endpoint():
+        variants = cache.get(("cached",), (0,)) or cache.put(("cached",), (0,), dumps(payload))
+        return EncodedJSONResponse(variants["identity"])
+
+    app.include_router(default_router)
+    app.include_router(fast_router)
+    return app
+
+
+async def bench_http(payload: dict, iterations: int) -> dict:
+    app = build_app(payload)
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name in ("default", "orjson", "cached"):
+            response = await client.get(f"/{name}")
+            size = len(response.content)
+            latencies = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                response = await client.get(f"/{name}")
+                await response.aread()
+                latencies.append(time.perf_counter() - started)
+            results[name] = {**summarize(latencies), "bytes": size}
+    return results
+
+
+def speedup(results: dict) -> dict:
+    base = results["default"]["p50_ms"]
+    return {name: round(base / r["p50_ms"], 1) if r["p50_ms"] else None for name, r in results.items() if name != "default"}
+
+
+async def run(args) -> dict:
+    out = {"iterations": args.iterations, "sizes": {}}
+    for n in args.opportunities:
+        payload = dashboard_payload(n, args.seed)
+        encode = bench_encode(payload, args.iterations)
+        http = await bench_http(payload, args.iterations)
+        out["sizes"][str(n)] = {
+            "encode": encode,
+            "http": http,
+            "speedup_p50": {"encode": speedup(encode), "http": speedup(http)},
+        }
+        for mode, results in (("encode", encode), ("http", http)):
+            line = "  ".join(f"{name} {r['p50_ms']:>8.2f}ms" for name, r in results.items())
+            print(f"[{n} opps] {mode:<6} p50: {line}", file=sys.stderr)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--opportunities", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Durable log of entity changes for downstream consumers (outbox).
+
+Every mutation appends a compact change event to a capped Mongo
+collection, so caches, rollups, search indexes and exports can follow
+what changed with read_since(token, batch) instead of rescanning, and
+from any number of app instances.
+
+Events are ordered by their ObjectId _id, which the writing instance
+generates (timestamp first). Readers only return events from whole
+seconds older than `settle_seconds`: by then every instance has finished
+inserting the events it stamped in those seconds, so resuming with
+`_id > token` never skips one that was still in flight. `settle_seconds`
+must exceed the clock skew between instances plus the slowest insert.
+
+The log is capped at `max_bytes`. The first append creates it (so the
+CLIs that write events get the capped collection too) and converts an
+uncapped collection left by an older version; once a consumer's token is older than
+the oldest retained event it may have missed changes, and read_since
+raises ChangeLogExpired so it can rebuild from scratch.
+
+start() also tails the log with an awaiting cursor and hands every new
+event, whichever process wrote it, to a callback; the server feeds its
+/api/events broker this way.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+logger = logging.getLogger("changelog")
+
+
+class ChangeLogExpired(Exception):
+    """The token is older than the oldest retained event"""
+
+
+class InvalidToken(ValueError):
+    """The token isn't one read_since returned"""
+
+
+class ChangeLog:
+    def __init__(self, db, name: str = "change_events", max_bytes: int = 256 * 1024 * 1024,
+                 settle_seconds: float = 2):
+        self.db = db
+        self.name = name
+        self.max_bytes = max_bytes
+        self.settle_seconds = settle_seconds
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        return self.db[self.name]
+
+    async def ensure_collection(self) -> None:
+        """Create the capped collection, converting an existing uncapped one.
+
+        An uncapped log would grow without bound and never expire tokens;
+        convertToCapped keeps its newest events that fit in `max_bytes`.
+        """
+        try:
+            await self.db.create_collection(self.name, capped=True, size=self.max_bytes)
+        except CollectionInvalid:
+            options = await self.collection.options()
+            if not options.get("capped"):
+                await self.db.command("convertToCapped", self.name, size=self.max_bytes)
+        await self.collection.create_index([("entity", 1), ("_id", 1)])
+        self._ready = True
+
+    async def append(self, events: list) -> None:
+        """Insert events, leaving the caller's dicts untouched"""
+        if not events:
+            return
+        if not self._ready:
+            await self.ensure_collection()
+        await self.collection.insert_many([dict(e) for e in events], ordered=True)
+
+    async def read_since(self, token: Optional[str] = None, batch: int = 500, entities=None):
+        """Events after `token` (from the oldest retained one when None), returns (events, next token).
+
+        The next token equals `token` when nothing new has settled. Each
+        event carries its `event_id`, usable for idempotent processing.
+        """
+        horizon = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(seconds=self.settle_seconds))
+        query = {"_id": {"$lt": horizon}}
+        if token:
+            after = self.decode(token)
+            oldest = await self.collection.find_one({}, {"_id": 1}, sort=[("_id", 1)])
+            if oldest is not None and oldest["_id"] > after:
+                raise ChangeLogExpired(token)
+            query["_id"]["$gt"] = after
+        if entities:
+            query["entity"] = {"$in": list(entities)}
+        docs = await self.collection.find(query).sort("_id", 1).limit(batch).to_list(batch)
+        for doc in docs:
+            doc["event_id"] = str(doc.pop("_id"))
+        return docs, docs[-1]["event_id"] if docs else token
+
+    def start(self, publish: Callable[[dict], None], resync: Callable[[], None], retry_seconds: float = 1) -> None:
+        """Pass events appended from now on to publish(event); resync() when some may have been missed"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._follow(publish, resync, retry_seconds))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _follow(self, publish, resync, retry_seconds: float) -> None:
+        query = {"_id": {"$gte": ObjectId.from_datetime(datetime.now(timezone.utc))}}
+        while True:
+            try:
+                if not self._ready:
+                    await self.ensure_collection()
+                cursor = self.collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for doc in cursor:
+                        query = {"_id": {"$gt": doc.pop("_id")}}
+                        publish(doc)
+            except Exception as e:
+                # E.g. the capped log overwrote events before they were read
+                logger.warning(f"Change log tail failed, subscribers told to resync: {e}")
+                resync()
+                query = {"_id": {"$gte": ObjectId.from_datetime(datetime.now(timezone.utc))}}
+            # A tailable cursor on an empty collection dies at once
+            await asyncio.sleep(retry_seconds)
+
+    @staticmethod
+    def decode(token: str) -> ObjectId:
+        try:
+            return ObjectId(token)
+        except (InvalidId, TypeError):
+            raise InvalidToken(token)
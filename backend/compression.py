@@ -0,0 +1,133 @@
+"""gzip / brotli response compression.
+
+CompressionMiddleware compresses complete responses whose body is at least
+`minimum_size` bytes and whose type is text-like, using the best encoding
+the client accepts (brotli before gzip). Streaming responses (SSE, CSV and
+XLSX exports) pass through untouched, so tokens and rows still flush as
+they are produced. Responses that already carry a Content-Encoding, such
+as precompressed cache entries, also pass through.
+
+Strong ETags of compressed responses get the coding appended ("abc-gzip"),
+since a strong validator must differ between representations.
+
+Compression of bodies above `offload_size` runs on a worker thread so a
+multi-megabyte dashboard doesn't stall the event loop.
+"""
+
+import asyncio
+import gzip
+from typing import Optional
+
+import brotli
+
+# Preference order when the client accepts several with equal q
+ENCODINGS = ("br", "gzip")
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported encoding from an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class Compressor:
+    def __init__(self, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 offload_size: int = 256 * 1024):
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.offload_size = offload_size
+
+    def compress_sync(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def compress(self, body: bytes, encoding: str) -> bytes:
+        if len(body) >= self.offload_size:
+            return await asyncio.to_thread(self.compress_sync, body, encoding)
+        return self.compress_sync(body, encoding)
+
+    def encoding_for(self, accept_encoding: Optional[str], size: int) -> Optional[str]:
+        """Encoding to use for a body of `size` bytes, or None to send it as is"""
+        if size < self.minimum_size:
+            return None
+        return negotiate(accept_encoding)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete (non-streaming) text responses"""
+
+    def __init__(self, app, compressor: Compressor, enabled: bool = True):
+        self.app = app
+        self.compressor = compressor
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        accept_encoding = headers.get(b"accept-encoding", b"").decode("latin-1")
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                response_headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                if b"content-encoding" in response_headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the body shows whether this is a single-chunk response
+                    start = message
+                return
+            if message["type"] == "http.response.body" and start is not None:
+                body = message.get("body", b"")
+                if message.get("more_body", False):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoding = self.compressor.encoding_for(accept_encoding, len(body))
+                response_headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+                if encoding:
+                    body = await self.compressor.compress(body, encoding)
+                    response_headers = [(k, v[:-1] + f'-{encoding}"'.encode()) if k.lower() == b"etag" and v.startswith(b'"') else (k, v)
+                                        for k, v in response_headers]
+                    response_headers.append((b"content-encoding", encoding.encode()))
+                response_headers.append((b"vary", b"Accept-Encoding"))
+                response_headers.append((b"content-length", str(len(body)).encode()))
+                await send({**start, "headers": response_headers})
+                await send({"type": "http.response.body", "body": body})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
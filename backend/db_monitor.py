@@ -0,0 +1,218 @@
+"""Per-request Mongo command monitoring.
+
+A pymongo CommandListener attributes every command to the request that
+issued it through a context variable. Motor runs pymongo calls on executor
+threads with a copy of the caller's context, so the listener sees the
+request's stats object and can update it from those threads.
+
+DBQueryMiddleware adds X-DB-Queries / X-DB-Time (ms) headers to each
+response and logs a warning when a request goes over the query budget or
+repeats the same query shape (an N+1 pattern).
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter as ShapeCounter
+from typing import Optional
+
+from pymongo import monitoring
+
+logger = logging.getLogger("db_monitor")
+
+# Driver housekeeping that isn't a query issued by application code
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue",
+                    "buildInfo", "getLastError", "killCursors"}
+
+# Command name -> key holding the collection name
+COLLECTION_KEYS = {"find": "find", "aggregate": "aggregate", "count": "count", "distinct": "distinct",
+                   "insert": "insert", "update": "update", "delete": "delete", "findAndModify": "findAndModify",
+                   "getMore": "collection", "createIndexes": "createIndexes"}
+
+
+def filter_shape(spec) -> str:
+    """Field names and operators of a query document, without the values"""
+    if isinstance(spec, dict):
+        return "{" + ",".join(f"{k}:{filter_shape(v)}" if k.startswith("$") or isinstance(v, dict) else k
+                              for k, v in sorted(spec.items())) + "}"
+    if isinstance(spec, list):
+        # $in lists collapse to one placeholder; $or/$and branches keep their shapes
+        return "[" + ",".join(filter_shape(v) for v in spec if isinstance(v, dict)) + "]"
+    return "?"
+
+
+def query_shape(command_name: str, command: dict) -> str:
+    """e.g. 'find organizations {org_id}' - identical for queries that differ only in values"""
+    collection = command.get(COLLECTION_KEYS.get(command_name, command_name), "")
+    if command_name in ("find", "count", "delete", "findAndModify"):
+        spec = command.get("filter") or command.get("query") or (command.get("deletes") or [{}])[0].get("q", {})
+    elif command_name == "update":
+        spec = (command.get("updates") or [{}])[0].get("q", {})
+    elif command_name == "aggregate":
+        spec = [next(iter(stage)) for stage in command.get("pipeline", [])]
+        return f"aggregate {collection} {'|'.join(spec)}"
+    else:
+        return f"{command_name} {collection}".strip()
+    return f"{command_name} {collection} {filter_shape(spec)}"
+
+
+def returned_docs(command_name: str, reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if cursor:
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    return int(reply.get("n", 0) or 0)
+
+
+class RequestDBStats:
+    """Commands, time and documents attributed to one request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.time_ms = 0.0
+        self.docs = 0
+        self.shapes = ShapeCounter()
+        self._lock = threading.Lock()
+
+    def record_start(self, shape: str):
+        with self._lock:
+            self.queries += 1
+            self.shapes[shape] += 1
+
+    def record_end(self, duration_ms: float, docs: int):
+        with self._lock:
+            self.time_ms += duration_ms
+            self.docs += docs
+
+
+current_db_stats: contextvars.ContextVar[Optional[RequestDBStats]] = contextvars.ContextVar("current_db_stats", default=None)
+
+
+class DBCommandListener(monitoring.CommandListener):
+    """Feeds command events into the current request's RequestDBStats.
+    
+    `command_seconds` is an optional metrics Family labelled by command name
+    that records the duration of every command, inside a request or not.
+    """
+
+    def __init__(self, command_seconds=None):
+        # (connection, request id) -> stats, so replies land on the request that sent the command
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.command_seconds = command_seconds
+
+    def started(self, event):
+        stats = current_db_stats.get()
+        if stats is None or event.command_name in IGNORED_COMMANDS:
+            return
+        stats.record_start(query_shape(event.command_name, event.command))
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = stats
+
+    def succeeded(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self._finish(event, returned_docs(event.command_name, event.reply))
+
+    def failed(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self._finish(event, 0)
+
+    def _finish(self, event, docs: int):
+        if self.command_seconds is not None:
+            self.command_seconds.labels(event.command_name).observe(event.duration_micros / 1e6)
+        with self._lock:
+            stats = self._inflight.pop((event.connection_id, event.request_id), None)
+        if stats is not None:
+            stats.record_end(event.duration_micros / 1000, docs)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Connection pool occupancy across all servers: open, checked out and waiting"""
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self._lock = threading.Lock()
+
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def connection_created(self, event):
+        self._add(open=1)
+
+    def connection_closed(self, event):
+        self._add(open=-1)
+
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_checked_out(self, event):
+        self._add(waiting=-1, checked_out=1)
+
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1)
+
+    def connection_checked_in(self, event):
+        self._add(checked_out=-1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+class DBQueryMiddleware:
+    """ASGI middleware: per-request stats, response headers and N+1 warnings"""
+
+    def __init__(self, app, query_budget: int = 20, repeat_limit: int = 5, enabled: bool = True):
+        self.app = app
+        self.query_budget = query_budget
+        self.repeat_limit = repeat_limit
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDBStats()
+        token = current_db_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.queries).encode()))
+                headers.append((b"x-db-time", f"{stats.time_ms:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_db_stats.reset(token)
+            self.check(scope, stats, time.perf_counter() - started)
+
+    def check(self, scope, stats: RequestDBStats, elapsed: float):
+        if not stats.queries:
+            return
+        shape, repeats = stats.shapes.most_common(1)[0]
+        where = f"{scope.get('method')} {scope.get('path')}"
+        if stats.queries > self.query_budget:
+            logger.warning(f"{where} issued {stats.queries} Mongo queries (budget {self.query_budget}), "
+                           f"{stats.time_ms:.1f}ms in DB, {stats.docs} docs, {elapsed * 1000:.0f}ms total")
+        if repeats > self.repeat_limit:
+            logger.warning(f"{where} repeated query shape {repeats}x (possible N+1): {shape}")
@@ -0,0 +1,110 @@
+"""In-process fan-out of entity change notifications to SSE subscribers.
+
+The server publishes every change event read from the shared change log
+({entity, op, id, fields, owner_ids, ...}), so writes from other
+instances and the import/generate CLIs arrive too; every subscriber whose filter
+matches gets it on its own bounded queue. publish() never waits: a client
+that stops reading fills its queue, which is then cleared and replaced by
+a single "resync" marker, telling that client to refetch instead of
+holding an ever-growing backlog in memory.
+
+Events carry ids of the form "<broker id>:<sequence>". A reconnecting
+EventSource sends the last one as Last-Event-ID; events still in the
+replay buffer are sent again, otherwise (too old, or another process
+start) the client is told to resync.
+
+Each process has its own broker and sequence, so a client reconnecting to
+a different instance is told to resync.
+"""
+
+import asyncio
+import collections
+import uuid
+from typing import Iterable, Optional
+
+RESYNC = {"op": "resync"}
+
+
+class Subscriber:
+    """One SSE connection: its filter and a bounded queue of pending events"""
+
+    def __init__(self, entities: Optional[Iterable[str]] = None, owner_id: Optional[str] = None, max_queue: int = 256):
+        self.entities = set(entities) if entities else None
+        self.owner_id = owner_id
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.overflows = 0
+
+    def matches(self, event: dict) -> bool:
+        if event is RESYNC:
+            return True
+        if self.entities is not None and event["entity"] not in self.entities:
+            return False
+        # Events without owners (deletes, bulk invalidations) go to everyone
+        owners = event.get("owner_ids")
+        return self.owner_id is None or not owners or self.owner_id in owners
+
+    def offer(self, seq: int, event: dict) -> bool:
+        """Queue without waiting; on overflow swap the backlog for one resync marker"""
+        try:
+            self.queue.put_nowait((seq, event))
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((seq, RESYNC))
+            self.overflows += 1
+            return False
+
+
+class EventBroker:
+    """Sequences published events, keeps the last `replay` and fans them out to subscribers"""
+
+    def __init__(self, max_queue: int = 256, replay: int = 1000, max_subscribers: int = 1000,
+                 published=None, overflows=None):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self.published = published
+        self.overflows = overflows
+        self.broker_id = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self.recent = collections.deque(maxlen=replay)
+        self.subscribers = set()
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.broker_id}:{seq}"
+
+    def publish(self, event: dict) -> None:
+        self.seq += 1
+        self.recent.append((self.seq, event))
+        if self.published is not None:
+            self.published.inc()
+        for subscriber in self.subscribers:
+            if subscriber.matches(event) and not subscriber.offer(self.seq, event) and self.overflows is not None:
+                self.overflows.inc()
+
+    def subscribe(self, entities=None, owner_id: Optional[str] = None, last_event_id: Optional[str] = None) -> Subscriber:
+        """Register a subscriber, pre-loaded with what it missed since `last_event_id`"""
+        if len(self.subscribers) >= self.max_subscribers:
+            raise OverflowError("Too many event subscribers")
+        subscriber = Subscriber(entities, owner_id, self.max_queue)
+        if last_event_id:
+            for seq, event in self.missed(last_event_id):
+                if subscriber.matches(event):
+                    subscriber.offer(seq, event)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def missed(self, last_event_id: str) -> list:
+        """Events after `last_event_id`, or a resync marker if they are no longer all buffered"""
+        broker_id, _, seq = last_event_id.partition(":")
+        if broker_id != self.broker_id or not seq.isdigit():
+            return [(self.seq, RESYNC)]
+        seq = int(seq)
+        if seq >= self.seq:
+            return []
+        if not self.recent or self.recent[0][0] > seq + 1:
+            return [(self.seq, RESYNC)]
+        return [(s, e) for s, e in self.recent if s > seq]
@@ -0,0 +1,58 @@
+"""Generate a large, realistic synthetic CRM dataset for capacity planning.
+
+Uses the same generator as POST /api/seed/synthetic, without the
+per-request size cap. Output is deterministic for a given --seed and
+--anchor-date. Reads MONGO_URL / DB_NAME from backend/.env.
+
+    python generate_data.py --preset large --clear
+    python generate_data.py --organizations 500 --contacts 5000 --opportunities 20000 --activities 100000 --seed 7
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from fastapi import HTTPException
+
+from server import SyntheticDataRequest, client, generate_synthetic_data, write_generations
+
+PRESETS = {
+    "small": {"organizations": 1_000, "contacts": 10_000, "opportunities": 20_000, "activities": 100_000},
+    "medium": {"organizations": 5_000, "contacts": 50_000, "opportunities": 200_000, "activities": 1_000_000},
+    "large": {"organizations": 10_000, "contacts": 100_000, "opportunities": 1_000_000, "activities": 5_000_000},
+}
+
+
+async def main(args) -> int:
+    volumes = dict(PRESETS[args.preset])
+    for entity in volumes:
+        if getattr(args, entity) is not None:
+            volumes[entity] = getattr(args, entity)
+
+    params = SyntheticDataRequest(**volumes, seed=args.seed, anchor_date=args.anchor_date, clear=args.clear)
+    try:
+        report = await generate_synthetic_data(params, batch_size=args.batch_size, concurrency=args.concurrency)
+    except HTTPException as e:
+        print(e.detail, file=sys.stderr)
+        return 1
+    finally:
+        # Let running servers see the new data in their ETags and response cache
+        await write_generations.flush()
+        client.close()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=list(PRESETS), default="small")
+    for entity in PRESETS["small"]:
+        parser.add_argument(f"--{entity}", type=int, help="Overrides the preset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor-date", help="YYYY-MM-DD the data is generated around (default: today)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Documents per insert_many")
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many calls in flight")
+    parser.add_argument("--clear", action="store_true", help="Delete existing orgs, contacts, opportunities and activities first")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,59 @@
+"""Bulk-import organizations, contacts or opportunities from CSV / NDJSON.
+
+Uses the same streaming parser, validation and batched writes as
+POST /api/import/{entity}. Reads MONGO_URL / DB_NAME from backend/.env.
+
+    python import_data.py organizations orgs.csv
+    python import_data.py contacts contacts.ndjson --format ndjson --owner-email rep@compassx.com
+    python import_data.py opportunities opps.csv --dry-run
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from server import BulkImporter, client, db, write_generations
+
+CHUNK_BYTES = 1 << 20
+
+
+async def read_file(path: str):
+    """Yield the file in fixed-size byte chunks"""
+    with (sys.stdin.buffer if path == "-" else open(path, "rb")) as f:
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def main(args) -> int:
+    if args.owner_email:
+        owner = await db.users.find_one({"email": args.owner_email.lower()}, {"_id": 0, "user_id": 1})
+        if not owner:
+            print(f"Unknown owner email: {args.owner_email}", file=sys.stderr)
+            return 1
+    else:
+        owner = await db.users.find_one({"role": "admin"}, {"_id": 0, "user_id": 1})
+    default_owner = owner["user_id"] if owner else "system"
+
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    importer = BulkImporter(args.entity, default_owner=default_owner, dry_run=args.dry_run)
+    report = await importer.run(read_file(args.path), fmt)
+    # Let running servers see the import in their ETags and response cache
+    await write_generations.flush()
+    client.close()
+
+    print(json.dumps(report, indent=2))
+    return 0 if report["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entity", choices=["organizations", "contacts", "opportunities"])
+    parser.add_argument("path", help="CSV or NDJSON file ('-' for stdin)")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults from the file extension")
+    parser.add_argument("--owner-email", help="Owner for rows without owner_id/owner_email (default: first admin)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,381 @@
+"""LLM provider clients used by the AI copilot.
+
+The copilot talks to a provider through two calls: ``complete`` returns the
+whole reply, ``stream`` yields it token by token. ``LLM_PROVIDER`` selects the
+implementation:
+
+- ``emergent`` (default): Emergent LLM gateway via ``LlmChat``; it has no
+  token streaming, so ``stream`` yields the whole reply as one chunk
+- ``openai``: any OpenAI-compatible endpoint over a pooled keep-alive HTTP client
+- ``fake``: deterministic local provider with no network, for tests and benchmarks
+
+``get_llm_provider`` builds one long-lived instance and wraps it in
+``ResilientProvider``, which adds per-call deadlines, a circuit breaker and
+call metrics.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+from metrics import Counter, Histogram
+
+
+class LLMError(Exception):
+    """Base class for provider failures surfaced to the copilot"""
+
+
+class LLMTimeoutError(LLMError):
+    """The provider did not answer within the call deadline"""
+
+
+class CircuitOpenError(LLMError):
+    """The circuit breaker is open; the call was not attempted"""
+
+
+class LLMProvider:
+    """Base class for copilot LLM providers"""
+
+    name = "base"
+    # Whether ``stream`` yields tokens as they are generated; when False, the
+    # stream's time to first token is the whole completion time
+    streams_tokens = False
+
+    async def complete(self, prompt: str, system_message: str, session_id: str) -> str:
+        raise NotImplementedError
+
+    async def stream(self, prompt: str, system_message: str, session_id: str) -> AsyncIterator[str]:
+        """Yield the reply in chunks. Default: one chunk with the full completion."""
+        yield await self.complete(prompt, system_message, session_id)
+
+    async def aclose(self) -> None:
+        """Release pooled connections"""
+
+
+class EmergentProvider(LLMProvider):
+    """Emergent LLM gateway (OpenAI models via LlmChat).
+
+    LlmChat carries per-session message history, so one is created per call;
+    the underlying HTTP client is shared by litellm across calls.
+
+    LlmChat only returns complete replies, so this provider does not stream:
+    ``stream`` falls back to one chunk with the whole completion, and the
+    copilot stream's TTFT equals its total time. Use ``openai`` for
+    incremental tokens.
+    """
+
+    name = "emergent"
+
+    def __init__(self, api_key: str, provider: str = "openai", model: str = "gpt-5.2"):
+        self.api_key = api_key
+        self.provider = provider
+        self.model = model
+
+    async def complete(self, prompt: str, system_message: str, session_id: str) -> str:
+        # Imported here so the other providers work where emergentintegrations isn't installed
+        from emergentintegrations.llm.chat import LlmChat, UserMessage
+
+        chat = LlmChat(
+            api_key=self.api_key,
+            session_id=session_id,
+            system_message=system_message
+        ).with_model(self.provider, self.model)
+        return await chat.send_message(UserMessage(text=prompt))
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """OpenAI-compatible chat completions API over one pooled httpx client.
+
+    Connections are kept alive and reused across calls; ``stream`` uses the
+    API's native server-sent event stream.
+    """
+
+    name = "openai"
+    streams_tokens = True
+
+    def __init__(self, base_url: str, api_key: Optional[str], model: str, max_connections: int = 20):
+        self.model = model
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+
+    def _payload(self, prompt: str, system_message: str, stream: bool) -> dict:
+        return {
+            "model": self.model,
+            "stream": stream,
+            "messages": [
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt},
+            ],
+        }
+
+    async def complete(self, prompt: str, system_message: str, session_id: str) -> str:
+        response = await self.client.post("/chat/completions", json=self._payload(prompt, system_message, False))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def stream(self, prompt: str, system_message: str, session_id: str) -> AsyncIterator[str]:
+        async with self.client.stream("POST", "/chat/completions", json=self._payload(prompt, system_message, True)) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class FakeProvider(LLMProvider):
+    """Deterministic offline provider.
+
+    The reply is derived from a hash of the prompt, so identical prompts always
+    produce identical output. Latency is simulated with a time-to-first-token
+    delay and a per-token delay (both in milliseconds). ``error_rate`` injects
+    failures from a seeded RNG, so a given seed fails the same calls every run.
+    """
+
+    name = "fake"
+    streams_tokens = True
+
+    WORDS = [
+        "pipeline", "stakeholder", "discovery", "value", "roadmap", "budget", "executive",
+        "sponsor", "outcome", "timeline", "scope", "alignment", "data", "platform", "risk",
+        "renewal", "workshop", "proposal", "decision", "next", "step", "follow-up",
+    ]
+
+    def __init__(self, first_token_ms: float = 50, token_ms: float = 5, num_tokens: int = 60,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.num_tokens = num_tokens
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+
+    def _tokens(self, prompt: str) -> List[str]:
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        tokens = []
+        for i in range(self.num_tokens):
+            word = self.WORDS[digest[i % len(digest)] % len(self.WORDS)]
+            tokens.append(word if i == 0 else f" {word}")
+        tokens.append(".")
+        return tokens
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise LLMError("fake provider injected failure")
+
+    async def complete(self, prompt: str, system_message: str, session_id: str) -> str:
+        tokens = self._tokens(prompt)
+        await asyncio.sleep((self.first_token_ms + self.token_ms * (len(tokens) - 1)) / 1000)
+        self._maybe_fail()
+        return "".join(tokens)
+
+    async def stream(self, prompt: str, system_message: str, session_id: str) -> AsyncIterator[str]:
+        await asyncio.sleep(self.first_token_ms / 1000)
+        self._maybe_fail()
+        for i, token in enumerate(self._tokens(prompt)):
+            if i:
+                await asyncio.sleep(self.token_ms / 1000)
+            yield token
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    closed -> open after ``failure_threshold`` consecutive failures; open
+    rejects calls for ``reset_timeout`` seconds, then half-open lets one trial
+    call through, which closes the circuit on success or re-opens it on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            raise CircuitOpenError("LLM provider circuit is open")
+        if state == "half_open":
+            self._trial_in_flight = True
+
+    def release_trial(self) -> None:
+        """Let another call be the half-open trial (the current one was abandoned)"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class ResilientProvider(LLMProvider):
+    """Wrap a provider with call deadlines, a circuit breaker and metrics.
+
+    ``timeout`` bounds a whole ``complete`` call; for ``stream`` it bounds the
+    wait for the first token and ``stream_timeout`` bounds the whole stream.
+    Calls abandoned by the caller (cancellation, early close) do not count as
+    provider failures.
+    """
+
+    def __init__(self, inner: LLMProvider, timeout: float = 30.0, stream_timeout: float = 120.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.inner = inner
+        self.name = inner.name
+        self.streams_tokens = inner.streams_tokens
+        self.timeout = timeout
+        self.stream_timeout = stream_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.latency_seconds = Histogram("llm_call_seconds", "LLM provider call latency")
+        self.ttft_seconds = Histogram("llm_stream_ttft_seconds", "LLM stream time to first token")
+        self.calls = {outcome: Counter(f"llm_calls_{outcome}_total") for outcome in ("ok", "error", "timeout", "rejected")}
+
+    async def complete(self, prompt: str, system_message: str, session_id: str) -> str:
+        self._before_call()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self.inner.complete(prompt, system_message, session_id), self.timeout)
+        except asyncio.TimeoutError:
+            self._failed("timeout")
+            raise LLMTimeoutError(f"LLM call exceeded {self.timeout}s")
+        except asyncio.CancelledError:
+            self._abandoned()
+            raise
+        except Exception:
+            self._failed("error")
+            raise
+        finally:
+            self.latency_seconds.observe(time.perf_counter() - started)
+        self._succeeded()
+        return result
+
+    async def stream(self, prompt: str, system_message: str, session_id: str) -> AsyncIterator[str]:
+        self._before_call()
+        started = time.perf_counter()
+        deadline = started + self.stream_timeout
+        upstream = self.inner.stream(prompt, system_message, session_id)
+        first = True
+        try:
+            while True:
+                remaining = deadline - time.perf_counter()
+                wait = min(self.timeout, remaining) if first else remaining
+                try:
+                    token = await asyncio.wait_for(upstream.__anext__(), max(wait, 0))
+                except StopAsyncIteration:
+                    break
+                if first:
+                    self.ttft_seconds.observe(time.perf_counter() - started)
+                    first = False
+                yield token
+        except asyncio.TimeoutError:
+            self._failed("timeout")
+            raise LLMTimeoutError("LLM stream exceeded its deadline")
+        except (GeneratorExit, asyncio.CancelledError):
+            # Consumer stopped early (client disconnect); not a provider failure
+            self._abandoned()
+            raise
+        except Exception:
+            self._failed("error")
+            raise
+        else:
+            self._succeeded()
+        finally:
+            self.latency_seconds.observe(time.perf_counter() - started)
+            await upstream.aclose()
+
+    def _before_call(self) -> None:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self.calls["rejected"].inc()
+            raise
+
+    def _succeeded(self) -> None:
+        self.calls["ok"].inc()
+        self.breaker.record_success()
+
+    def _failed(self, outcome: str) -> None:
+        self.calls[outcome].inc()
+        self.breaker.record_failure()
+
+    def _abandoned(self) -> None:
+        self.breaker.release_trial()
+
+    def stats(self) -> dict:
+        return {
+            "provider": self.name,
+            "streams_tokens": self.streams_tokens,
+            "timeout": self.timeout,
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "calls": {outcome: counter.value for outcome, counter in self.calls.items()},
+            "latency_seconds": self.latency_seconds.snapshot(),
+            "ttft_seconds": self.ttft_seconds.snapshot(),
+        }
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def get_llm_provider() -> ResilientProvider:
+    """Build the long-lived provider selected by the LLM_PROVIDER environment variable"""
+    name = os.environ.get("LLM_PROVIDER", "emergent").lower()
+    if name == "fake":
+        inner = FakeProvider(
+            first_token_ms=float(os.environ.get("FAKE_LLM_FIRST_TOKEN_MS", "50")),
+            token_ms=float(os.environ.get("FAKE_LLM_TOKEN_MS", "5")),
+            num_tokens=int(os.environ.get("FAKE_LLM_TOKENS", "60")),
+            error_rate=float(os.environ.get("FAKE_LLM_ERROR_RATE", "0")),
+            seed=int(os.environ.get("FAKE_LLM_SEED", "0")),
+        )
+    elif name == "openai":
+        inner = OpenAICompatibleProvider(
+            base_url=os.environ.get("LLM_BASE_URL", "https://api.openai.com/v1"),
+            api_key=os.environ.get("LLM_API_KEY"),
+            model=os.environ.get("LLM_MODEL", "gpt-5.2"),
+            max_connections=int(os.environ.get("LLM_MAX_CONNECTIONS", "20")),
+        )
+    elif name == "emergent":
+        inner = EmergentProvider(api_key=os.environ.get("EMERGENT_LLM_KEY"))
+    else:
+        raise ValueError(f"Unknown LLM_PROVIDER: {name}")
+    return ResilientProvider(
+        inner,
+        timeout=float(os.environ.get("LLM_TIMEOUT", "30")),
+        stream_timeout=float(os.environ.get("LLM_STREAM_TIMEOUT", "120")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.environ.get("LLM_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.environ.get("LLM_BREAKER_RESET", "30")),
+        ),
+    )
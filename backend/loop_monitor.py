@@ -0,0 +1,161 @@
+"""Event-loop lag monitoring and blocking-call detection.
+
+A background task sleeps for a fixed interval and measures how late it
+wakes up. Any delay beyond the interval is time the loop spent running
+something else without yielding, which every concurrent request also waits.
+
+BlockingCallDetector catches the culprit: the loop bumps a heartbeat every
+few milliseconds and a watchdog thread notices when it stops. It then
+grabs the loop thread's current stack (the code that is blocking) and the
+request the running task belongs to, and logs both once the loop recovers.
+"""
+
+import asyncio
+import collections
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from datetime import datetime, timezone
+from typing import Optional
+
+from metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger("loop_monitor")
+
+# Innermost frames kept from a blocking stack
+STACK_DEPTH = 20
+
+# Lag buckets in seconds; anything above ~50ms is user-visible
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class EventLoopLagMonitor:
+    """Samples event-loop scheduling lag every `interval` seconds"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.lag_seconds = Histogram("event_loop_lag_seconds", "Delay of a timer callback beyond its scheduled time",
+                                     buckets=LAG_BUCKETS)
+        self.last_lag = Gauge("event_loop_lag_last_seconds", "Most recent event-loop lag sample")
+        self.max_lag = Gauge("event_loop_lag_max_seconds", "Largest event-loop lag seen since startup")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record(max(time.perf_counter() - started - self.interval, 0.0))
+
+    def record(self, lag: float) -> None:
+        self.lag_seconds.observe(lag)
+        self.last_lag.set(lag)
+        if lag > self.max_lag.value:
+            self.max_lag.set(lag)
+
+
+class BlockingCallDetector:
+    """Logs the stack and request of any callback that holds the loop longer than `threshold`"""
+
+    def __init__(self, threshold: float = 0.1, heartbeat: float = 0.02, max_events: int = 50):
+        self.threshold = threshold
+        self.heartbeat = heartbeat
+        self.blocked_total = Counter("event_loop_blocked_total", f"Callbacks that blocked the event loop longer than {threshold}s")
+        self.block_seconds = Histogram("event_loop_block_seconds", "Duration of event-loop blocking episodes", buckets=LAG_BUCKETS)
+        self.events = collections.deque(maxlen=max_events)
+        # task -> ASGI scope of the request it serves, filled in by the HTTP middleware
+        self.requests = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id = None
+        self._beat = 0.0
+        self._handle = None
+        self._episode = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._handle = self._loop.call_later(self.heartbeat, self._tick)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._handle is not None:
+            self._handle.cancel()
+
+    def track(self, task: Optional[asyncio.Task], scope: dict) -> None:
+        if task is not None:
+            self.requests[task] = scope
+
+    def untrack(self, task: Optional[asyncio.Task]) -> None:
+        if task is not None:
+            self.requests.pop(task, None)
+
+    def _tick(self) -> None:
+        self._beat = time.monotonic()
+        self._handle = self._loop.call_later(self.heartbeat, self._tick)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.heartbeat):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if self._episode is None:
+                # A beat is due every `heartbeat`; anything past that is blocking
+                if stalled - self.heartbeat > self.threshold:
+                    self._episode = (beat, self._capture())
+            elif beat != self._episode[0]:
+                started_beat, (stack, request) = self._episode
+                self._episode = None
+                self._report(max(beat - started_beat - self.heartbeat, 0.0), stack, request)
+
+    def _capture(self):
+        """Stack of the loop thread and the request of its running task, read from the watchdog thread"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-STACK_DEPTH:] if frame is not None else []
+        request = None
+        try:
+            task = asyncio.current_task(self._loop)
+            scope = self.requests.get(task) if task is not None else None
+        except Exception:
+            scope = None
+        if scope is not None:
+            route = scope.get("route")
+            request = f"{scope.get('method')} {route.path if route is not None else scope.get('path')}"
+        return stack, request
+
+    def _report(self, duration: float, stack: list, request: Optional[str]) -> None:
+        self.blocked_total.inc()
+        self.block_seconds.observe(duration)
+        self.events.append({
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration * 1000, 1),
+            "request": request,
+            "stack": [line.rstrip() for line in stack],
+        })
+        logger.warning(f"Event loop blocked for {duration * 1000:.0f}ms"
+                       f"{f' in {request}' if request else ''}:\n{''.join(stack)}")
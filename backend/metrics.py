@@ -0,0 +1,196 @@
+"""In-process metrics primitives.
+
+Histograms use fixed upper-bound buckets (Prometheus style) so recording is a
+bisect plus two additions, cheap enough for the request hot path.
+
+``Family`` adds labels (one child metric per label-value tuple) and
+``Registry.render()`` produces the Prometheus text exposition format.
+Keep label values low-cardinality: route templates, not raw paths.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    pairs = [f'{n}="{escape_label(v)}"' for n, v in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def snapshot(self) -> dict:
+        return {"value": self.value}
+
+    def samples(self, labels: str = "") -> List[str]:
+        return [f"{self.name}{labels} {format_value(self.value)}"]
+
+
+class Gauge:
+    """Value that goes up and down, or is read from `fn` at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str = "", fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.description = description
+        self.fn = fn
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def get(self) -> float:
+        return self.fn() if self.fn else self.value
+
+    def snapshot(self) -> dict:
+        return {"value": self.get()}
+
+    def samples(self, labels: str = "") -> List[str]:
+        return [f"{self.name}{labels} {format_value(self.get())}"]
+
+
+class Histogram:
+    """Fixed-bucket histogram with approximate quantiles"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside the matching bucket"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= rank and c > 0:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets: Dict[str, int] = {}
+        for bound, c in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += c
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+    def samples(self, labels: str = "") -> List[str]:
+        """Cumulative _bucket / _sum / _count lines; `labels` is a rendered {..} label set"""
+        inner = labels[1:-1] + "," if labels else ""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines, cumulative = [], 0
+        for bound, c in zip(list(self.buckets) + [math.inf], counts):
+            cumulative += c
+            lines.append(f'{self.name}_bucket{{{inner}le="{format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum{labels} {format_value(round(total, 6))}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Family:
+    """A labelled metric: one child Counter/Gauge/Histogram per label-value tuple"""
+
+    def __init__(self, metric_cls, name: str, description: str, labelnames: Sequence[str], **kwargs):
+        self.metric_cls = metric_cls
+        self.kind = metric_cls.kind
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.kwargs = kwargs
+        self.children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        child = self.children.get(values)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(values, self.metric_cls(self.name, self.description, **self.kwargs))
+        return child
+
+    def samples(self, labels: str = "") -> List[str]:
+        lines = []
+        for values, child in sorted(self.children.items()):
+            lines.extend(child.samples(format_labels(self.labelnames, values)))
+        return lines
+
+
+class Registry:
+    """Collects metrics for the Prometheus text exposition format"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, *metrics) -> None:
+        self.metrics.extend(metrics)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            if metric.description:
+                lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,163 @@
+"""On-demand CPU and memory profiling of the running process.
+
+SamplingProfiler runs a thread that reads every thread's stack through
+sys._current_frames() at a fixed interval for a bounded duration, and
+folds the samples into collapsed stacks ("a;b;c 42" per line), the input
+format of flamegraph.pl, speedscope and most flamegraph viewers.
+
+MemoryProfiler wraps tracemalloc: tracing starts on request, snapshots
+are kept by id and two snapshots can be diffed to see which lines grew.
+
+Neither costs anything while idle: there is no sampler thread and
+tracemalloc is off until someone asks for it.
+"""
+
+import collections
+import linecache
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+# Frames from these files are profiler overhead, not application work
+PROFILER_FILES = (__file__, tracemalloc.__file__)
+
+
+class ProfilerBusyError(Exception):
+    """A profile is already running"""
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """Collapsed-stack sampling profiler; one run at a time"""
+
+    def __init__(self, max_depth: int = 64):
+        self.max_depth = max_depth
+        self._running = threading.Lock()
+
+    def profile(self, seconds: float, interval: float = 0.005, thread_ids: Optional[set] = None) -> dict:
+        """Sample for `seconds` (blocking, call from a worker thread); returns stack counts and totals"""
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            own = threading.get_ident()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks = collections.Counter()
+            samples = 0
+            started = time.perf_counter()
+            deadline = started + seconds
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own or (thread_ids and thread_id not in thread_ids):
+                        continue
+                    labels = []
+                    while frame is not None and len(labels) < self.max_depth:
+                        labels.append(frame_label(frame))
+                        frame = frame.f_back
+                    if thread_id not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    labels.append(names.get(thread_id, f"thread-{thread_id}"))
+                    stacks[";".join(reversed(labels))] += 1
+                samples += 1
+                time.sleep(interval)
+            return {
+                "duration_s": round(time.perf_counter() - started, 3),
+                "interval_ms": interval * 1000,
+                "samples": samples,
+                "stacks": stacks,
+            }
+        finally:
+            self._running.release()
+
+    @staticmethod
+    def collapsed(stacks: collections.Counter) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots kept by id, with diffs between any two"""
+
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self.snapshots: "collections.OrderedDict[str, dict]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 25) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stop tracing and drop snapshots (tracemalloc slows allocation while on)"""
+        tracemalloc.stop()
+        with self._lock:
+            self.snapshots.clear()
+
+    def take(self) -> dict:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, f) for f in PROFILER_FILES] + [tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        info = {
+            "snapshot_id": f"snap_{uuid.uuid4().hex[:12]}",
+            "taken_at": datetime.now(timezone.utc).isoformat(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "blocks": len(snapshot.traces),
+        }
+        with self._lock:
+            self.snapshots[info["snapshot_id"]] = {"info": info, "snapshot": snapshot}
+            while len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+        return info
+
+    def list(self) -> list:
+        with self._lock:
+            return [s["info"] for s in self.snapshots.values()]
+
+    def get(self, snapshot_id: str):
+        with self._lock:
+            entry = self.snapshots.get(snapshot_id)
+        return entry["snapshot"] if entry else None
+
+    def top(self, snapshot_id: str, group_by: str = "lineno", limit: int = 20) -> Optional[list]:
+        snapshot = self.get(snapshot_id)
+        if snapshot is None:
+            return None
+        return [stat_dict(stat, group_by) for stat in snapshot.statistics(group_by)[:limit]]
+
+    def diff(self, base_id: str, current_id: str, group_by: str = "lineno", limit: int = 20) -> Optional[list]:
+        """Largest allocation growth from base to current"""
+        base, current = self.get(base_id), self.get(current_id)
+        if base is None or current is None:
+            return None
+        stats = current.compare_to(base, group_by)
+        return [stat_dict(stat, group_by) for stat in stats[:limit]]
+
+
+def stat_dict(stat, group_by: str) -> dict:
+    frames = stat.traceback if group_by == "traceback" else stat.traceback[:1]
+    result = {
+        "size_bytes": stat.size,
+        "count": stat.count,
+        "traceback": [
+            {"file": f.filename, "line": f.lineno, "code": linecache.getline(f.filename, f.lineno).strip()}
+            for f in frames
+        ],
+    }
+    if hasattr(stat, "size_diff"):
+        result["size_diff_bytes"] = stat.size_diff
+        result["count_diff"] = stat.count_diff
+    return result
@@ -0,0 +1,333 @@
+"""orjson-encoded responses and a cache of encoded response bodies.
+
+FastAPI's default path runs every returned dict through jsonable_encoder,
+which copies the whole structure in Python, and then json.dumps. For
+dashboards returning thousands of opportunity dicts that is most of the
+request's CPU. FastJSONRoute hands the endpoint's result straight to
+orjson instead, which handles datetimes, dates, UUIDs and enums natively.
+
+ResponseCache keeps encoded bodies, plus their compressed variants once
+requested, so a hit skips the queries, the encoding and the compression. CollectionVersions is a pymongo CommandListener that bumps a
+per-collection counter after every write command; a cached body is only
+served while the counters of the collections it was built from are unchanged.
+The same counters give list endpoints cheap strong ETags.
+
+Those counters only see this process's writes. SharedGenerations persists a
+generation per collection in Mongo: each process $incs the collections it
+wrote, and polls everyone's, so writes from CLIs (import_data.py,
+generate_data.py) and other instances invalidate caches and ETags within
+about a polling interval. Its snapshots are the same on every instance, so
+ETags built from them validate whichever instance a client reaches.
+"""
+
+import asyncio
+import collections
+import functools
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from decimal import Decimal
+from typing import Iterable, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from pymongo import UpdateOne, monitoring
+from starlette.responses import Response
+
+from compression import ENCODINGS
+
+logger = logging.getLogger("responses")
+
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def json_default(obj):
+    """Types orjson doesn't encode natively, converted the way jsonable_encoder would"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=json_default, option=JSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class EncodedJSONResponse(Response):
+    """A body that is already encoded JSON, e.g. from ResponseCache"""
+    media_type = "application/json"
+
+
+class FastJSONRoute(APIRoute):
+    """Encodes plain endpoint results with orjson, skipping jsonable_encoder.
+
+    Routes with a response_model, a non-JSON response class or a `response:
+    Response` parameter (whose headers and cookies FastAPI merges into the
+    response it builds) keep the default path.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        response_class = getattr(self.response_class, "value", self.response_class)
+        endpoint = self.dependant.call
+        if (self.response_model is None and issubclass(response_class, JSONResponse)
+                and self.dependant.response_param_name is None and asyncio.iscoroutinefunction(endpoint)):
+            status_code = self.status_code or 200
+
+            @functools.wraps(endpoint)
+            async def encoded_endpoint(*a, **kw):
+                result = await endpoint(*a, **kw)
+                if isinstance(result, Response):
+                    return result
+                return EncodedJSONResponse(dumps(result), status_code=status_code)
+
+            self.dependant.call = encoded_endpoint
+
+
+def make_etag(*parts, version: Optional[int] = None) -> str:
+    """Strong ETag from anything with a stable repr, prefixed by a document version when given"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{version}.{digest}"' if version is not None else f'"{digest}"'
+
+
+def etag_version(etag: str) -> Optional[int]:
+    """Document version of a strong tag from make_etag(..., version=N); None if it has none"""
+    if not etag.startswith('"'):
+        return None
+    version, dot, _ = etag[1:].partition(".")
+    return int(version) if dot and version.isdigit() else None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as RFC 9110 requires for If-None-Match.
+    
+    CompressionMiddleware suffixes tags of compressed representations with
+    the coding ("...-gzip"), so those suffixes are ignored too.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        for encoding in ENCODINGS:
+            if candidate.endswith(f'-{encoding}"'):
+                candidate = candidate[:-len(encoding) - 2] + '"'
+                break
+        if candidate == etag:
+            return True
+    return False
+
+
+# Commands that modify a collection; the value is the key holding its name
+WRITE_COMMANDS = {"insert": "insert", "update": "update", "delete": "delete", "findAndModify": "findAndModify",
+                  "drop": "drop", "create": "create", "renameCollection": "renameCollection"}
+
+
+class CollectionVersions(monitoring.CommandListener):
+    """Per-collection write counters, bumped when a write command completes"""
+
+    def __init__(self):
+        self.versions = collections.Counter()
+        # Bumped by dropDatabase, invalidating everything
+        self.epoch = 0
+        # Collections written since SharedGenerations last took them
+        self.dirty = set()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, names: Iterable[str]) -> tuple:
+        with self._lock:
+            return (self.epoch,) + tuple(self.versions[n] for n in names)
+
+    def bump(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self.epoch += 1
+            else:
+                self.versions[name] += 1
+                self.dirty.add(name)
+
+    def take_dirty(self) -> set:
+        with self._lock:
+            dirty, self.dirty = self.dirty, set()
+            return dirty
+
+    def mark_dirty(self, names: Iterable[str]) -> None:
+        with self._lock:
+            self.dirty.update(names)
+
+    def dirty_snapshot(self, names: Iterable[str]) -> tuple:
+        """Counters of the `names` written since they were last taken as dirty"""
+        with self._lock:
+            return tuple((n, self.versions[n]) for n in names if n in self.dirty)
+
+    def started(self, event):
+        if event.command_name == "dropDatabase":
+            target = None
+        elif event.command_name in WRITE_COMMANDS:
+            target = event.command.get(WRITE_COMMANDS[event.command_name])
+            if not isinstance(target, str):
+                return
+            # renameCollection names are "db.collection"
+            target = target.split(".", 1)[-1] if event.command_name == "renameCollection" else target
+        else:
+            return
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = target
+
+    def _finish(self, event):
+        key = (event.connection_id, event.request_id)
+        with self._lock:
+            if key not in self._inflight:
+                return
+            target = self._inflight.pop(key)
+        # Bump once the write is applied, so a read that starts afterwards sees new versions
+        self.bump(target)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+
+class SharedGenerations:
+    """Per-collection write generations kept in a Mongo collection, shared by all processes.
+
+    flush() $incs the generation of every collection this process wrote
+    since the last flush; refresh() reloads all generations. run() does both
+    every `interval` seconds; short-lived scripts call flush() before exiting.
+    The EPOCH entry holds a random value created with the collection, so
+    generations restarting at zero after a wipe never repeat old snapshots.
+    """
+
+    EPOCH = "$epoch"  # not a valid collection name, so it can't clash
+
+    def __init__(self, collection, versions: CollectionVersions, interval: float = 1.0):
+        self.collection = collection
+        self.versions = versions
+        self.interval = interval
+        self.generations = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def snapshot(self, names: Iterable[str]) -> tuple:
+        return tuple(self.generations.get(n, 0) for n in names)
+
+    def pending(self, names: Iterable[str]) -> tuple:
+        """This process's counters for the `names` it wrote but hasn't flushed yet"""
+        return self.versions.dirty_snapshot(names)
+
+    async def flush(self) -> None:
+        names = self.versions.take_dirty() - {self.collection.name}
+        if not names:
+            return
+        try:
+            await self.collection.bulk_write([UpdateOne({"_id": n}, {"$inc": {"generation": 1}}, upsert=True)
+                                              for n in sorted(names)], ordered=False)
+        except Exception:
+            self.versions.mark_dirty(names)
+            raise
+        # No longer pending; until the next refresh, keep snapshots moved past the write
+        for n in names:
+            self.generations[n] = self.generations.get(n, 0) + 1
+
+    async def refresh(self) -> None:
+        generations = {d["_id"]: d["generation"] async for d in self.collection.find({})}
+        if self.EPOCH not in generations:
+            await self.collection.update_one({"_id": self.EPOCH},
+                                             {"$setOnInsert": {"generation": uuid.uuid4().hex}}, upsert=True)
+            generations[self.EPOCH] = (await self.collection.find_one({"_id": self.EPOCH}))["generation"]
+        self.generations = generations
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.flush()
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Could not sync write generations: {e}")
+            await asyncio.sleep(self.interval)
+
+
+class ResponseCache:
+    """Encoded response bodies keyed by request, valid while their collection versions hold and for `ttl` seconds.
+    
+    Each entry is a dict of content-coding -> bytes: "identity" is the JSON
+    body, compressed variants ("gzip", "br") are added as clients ask for them.
+    """
+
+    def __init__(self, versions: CollectionVersions, ttl: float = 30, max_entries: int = 512, requests=None):
+        self.versions = versions
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.requests = requests
+        self._entries: "collections.OrderedDict[tuple, tuple]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, snapshot: tuple) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == snapshot and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                variants = entry[2]
+            else:
+                variants = None
+        if self.requests is not None:
+            self.requests.labels("hit" if variants is not None else "miss").inc()
+        return variants
+
+    def put(self, key: tuple, snapshot: tuple, body: bytes) -> dict:
+        variants = {"identity": body}
+        with self._lock:
+            self._entries[key] = (snapshot, time.monotonic(), variants)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return variants
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
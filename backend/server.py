@@ -1,30 +1,176 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
+from starlette.background import BackgroundTask
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
 import os
+import re
+import base64
+import csv
+import io
+import json
+import codecs
+import tempfile
+import time
+import asyncio
+import hashlib
+import functools
+import itertools
+import random
+import threading
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, ValidationError
 from typing import List, Optional, Literal
 import uuid
 from datetime import datetime, timezone, timedelta
 import httpx
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from llm_providers import get_llm_provider, LLMTimeoutError, CircuitOpenError
+from metrics import Counter, Family, Gauge, Histogram, Registry
+from db_monitor import DBCommandListener, DBQueryMiddleware, PoolStatsListener
+from loop_monitor import BlockingCallDetector, EventLoopLagMonitor
+from compression import Compressor, CompressionMiddleware
+from responses import (CollectionVersions, EncodedJSONResponse, FastJSONResponse, FastJSONRoute, ResponseCache,
+                       SharedGenerations, dumps, etag_matches, etag_version, make_etag)
+from changelog import ChangeLog, ChangeLogExpired, InvalidToken
+from events import RESYNC, EventBroker
+from profiler import MemoryProfiler, ProfilerBusyError, SamplingProfiler
+from tracing import JSONLExporter, OTLPExporter, TracedRoute, Tracer, TracingCommandListener, TracingMiddleware, span, traced
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Per-request Mongo command monitoring (X-DB-Queries / X-DB-Time headers, N+1 warnings)
+DB_MONITORING = os.environ.get('DB_MONITORING', 'true').lower() == 'true'
+DB_QUERY_BUDGET = int(os.environ.get('DB_QUERY_BUDGET', '20'))
+DB_REPEAT_LIMIT = int(os.environ.get('DB_REPEAT_LIMIT', '5'))
+
+# Event-loop blocking detector: log the stack of any callback holding the loop this long
+LOOP_BLOCK_DETECTION = os.environ.get('LOOP_BLOCK_DETECTION', 'true').lower() == 'true'
+LOOP_BLOCK_THRESHOLD_MS = float(os.environ.get('LOOP_BLOCK_THRESHOLD_MS', '100'))
+
+# Request tracing: export sampled traces, plus any request slower than TRACE_SLOW_MS
+# (for streamed responses, slower than TRACE_SLOW_MS to start responding)
+TRACING = os.environ.get('TRACING', 'true').lower() == 'true'
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0.01'))
+# Honour the sampled flag of an incoming traceparent; only behind a proxy that strips or sets it
+TRACE_TRUST_PARENT = os.environ.get('TRACE_TRUST_PARENT', 'false').lower() == 'true'
+TRACE_SLOW_MS = float(os.environ.get('TRACE_SLOW_MS', '1000'))
+TRACE_EXPORT = os.environ.get('TRACE_EXPORT', 'jsonl')  # jsonl, otlp or none
+TRACE_FILE = os.environ.get('TRACE_FILE', str(ROOT_DIR / 'traces.jsonl'))
+TRACE_FILE_MAX_MB = float(os.environ.get('TRACE_FILE_MAX_MB', '50'))  # rotated to .1, .2 ... at this size
+TRACE_FILE_BACKUPS = int(os.environ.get('TRACE_FILE_BACKUPS', '2'))
+OTLP_ENDPOINT = os.environ.get('OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+
+trace_exporter = None
+if TRACING and TRACE_EXPORT == 'otlp':
+    trace_exporter = OTLPExporter(OTLP_ENDPOINT)
+elif TRACING and TRACE_EXPORT == 'jsonl':
+    trace_exporter = JSONLExporter(TRACE_FILE, max_bytes=int(TRACE_FILE_MAX_MB * 1024 * 1024), backups=TRACE_FILE_BACKUPS)
+tracer = Tracer(trace_exporter, sample_rate=TRACE_SAMPLE_RATE, slow_ms=TRACE_SLOW_MS, trust_parent=TRACE_TRUST_PARENT)
+
+# Dashboard/analytics responses are cached as encoded JSON until a collection they read is written (0 disables)
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '30'))
+
+# Cache-Control max-age for reference data (pipelines, stages); other GETs revalidate with ETags
+REFERENCE_DATA_MAX_AGE = int(os.environ.get('REFERENCE_DATA_MAX_AGE', '300'))
+# Write generations shared through Mongo are synced this often, so other processes' writes reach ETags and the cache
+WRITE_GENERATION_SYNC_SECONDS = float(os.environ.get('WRITE_GENERATION_SYNC_SECONDS', '1'))
+# List ETags also roll this often, for edits made directly in Mongo that no process counted
+LIST_ETAG_MAX_SECONDS = int(os.environ.get('LIST_ETAG_MAX_SECONDS', '300'))
+
+# gzip/brotli for complete text responses of at least COMPRESSION_MIN_SIZE bytes
+COMPRESSION = os.environ.get('COMPRESSION', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+COMPRESSION_OFFLOAD_SIZE = int(os.environ.get('COMPRESSION_OFFLOAD_SIZE', str(256 * 1024)))  # compress on a thread above this
+compressor = Compressor(COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY, COMPRESSION_OFFLOAD_SIZE)
+
+# Delta sync (GET /api/sync)
+SYNC_PAGE_SIZE = int(os.environ.get('SYNC_PAGE_SIZE', '500'))  # documents per collection per response
+SYNC_SETTLE_SECONDS = float(os.environ.get('SYNC_SETTLE_SECONDS', '2'))  # changes younger than this wait for the next sync
+SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', '30'))  # older sync tokens get 410 and must resync in full
+
+# Organization notes (one document per note in the notes collection)
+NOTES_PAGE_SIZE = int(os.environ.get('NOTES_PAGE_SIZE', '20'))
+NOTE_PREVIEW_CHARS = int(os.environ.get('NOTE_PREVIEW_CHARS', '280'))  # latest_note text kept on the org
+
+# Server-sent change events (GET /api/events)
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', '15'))
+EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', '256'))  # per client; a client further behind is told to resync
+EVENTS_REPLAY = int(os.environ.get('EVENTS_REPLAY', '1000'))  # recent events kept for Last-Event-ID reconnects
+EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', '1000'))
+
+# Change log (capped change_events collection read by downstream consumers, GET /api/changes)
+CHANGE_LOG_MAX_MB = int(os.environ.get('CHANGE_LOG_MAX_MB', '256'))
+CHANGE_LOG_SETTLE_SECONDS = float(os.environ.get('CHANGE_LOG_SETTLE_SECONDS', '2'))  # must exceed clock skew between instances
+
+# On-demand profiling (admin endpoints under /api/debug)
+PROFILE_MAX_SECONDS = float(os.environ.get('PROFILE_MAX_SECONDS', '60'))
+
+# Prometheus metrics (served at /metrics and /api/metrics)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # optional bearer token for scrapes
+metrics_registry = Registry()
+mongo_command_seconds = Family(Histogram, "mongo_command_seconds", "Mongo command latency by command", ["command"])
+mongo_pool = PoolStatsListener()
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Write counters per collection, used to invalidate cached responses
+collection_versions = CollectionVersions()
+mongo_listeners = [mongo_pool, collection_versions]
+if DB_MONITORING:
+    mongo_listeners.append(DBCommandListener(mongo_command_seconds))
+if TRACING:
+    mongo_listeners.append(TracingCommandListener())
+client = AsyncIOMotorClient(mongo_url, event_listeners=mongo_listeners)
 db = client[os.environ['DB_NAME']]
+# The same counters persisted in Mongo, so writes by other processes count too
+write_generations = SharedGenerations(db.write_generations, collection_versions, WRITE_GENERATION_SYNC_SECONDS)
 
-# LLM Key
-EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
+# LLM provider (see llm_providers.py; LLM_PROVIDER=fake runs offline).
+# One long-lived client with call deadlines and a circuit breaker.
+llm_provider = get_llm_provider()
+
+# AI copilot concurrency limits
+COPILOT_MAX_CONCURRENCY = int(os.environ.get('COPILOT_MAX_CONCURRENCY', '8'))
+COPILOT_MAX_QUEUE = int(os.environ.get('COPILOT_MAX_QUEUE', '32'))
+COPILOT_QUEUE_TIMEOUT = float(os.environ.get('COPILOT_QUEUE_TIMEOUT', '10'))
+
+# AI copilot batch jobs
+COPILOT_BATCH_CONCURRENCY = int(os.environ.get('COPILOT_BATCH_CONCURRENCY', '4'))
+COPILOT_BATCH_RATE = float(os.environ.get('COPILOT_BATCH_RATE', '2'))  # LLM calls per second
+COPILOT_BATCH_RETRIES = int(os.environ.get('COPILOT_BATCH_RETRIES', '3'))
+# Running jobs refresh heartbeat_at this often; other instances treat a job silent for 4x as orphaned
+COPILOT_JOB_HEARTBEAT_SECONDS = float(os.environ.get('COPILOT_JOB_HEARTBEAT_SECONDS', '15'))
+
+# AI copilot prompt context (tokens estimated at ~4 characters each)
+COPILOT_CONTEXT_TOKENS = int(os.environ.get('COPILOT_CONTEXT_TOKENS', '800'))
+COPILOT_CONTEXT_ACTIVITIES = int(os.environ.get('COPILOT_CONTEXT_ACTIVITIES', '20'))
+
+# Bulk import
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '1000'))
+IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', '1000'))
+
+# Streaming export
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+EXPORT_LOOKUP_TTL = float(os.environ.get('EXPORT_LOOKUP_TTL', '60'))
+
+# Synthetic data generator (larger volumes: use generate_data.py)
+SYNTHETIC_BATCH_SIZE = int(os.environ.get('SYNTHETIC_BATCH_SIZE', '5000'))
+SYNTHETIC_CONCURRENCY = int(os.environ.get('SYNTHETIC_CONCURRENCY', '4'))
+SYNTHETIC_MAX_DOCS = int(os.environ.get('SYNTHETIC_MAX_DOCS', '500000'))
+
+# bcrypt is deliberately slow (~100-300ms); run it off the event loop
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
 
 # JWT Configuration
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'compassx-crm-secret-key-2026')
@@ -37,11 +183,14 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # Default admin user - seeded on startup
 DEFAULT_ADMIN = {"email": "seth.cushing@compassx.com", "name": "Seth Cushing", "role": "admin"}
 
-# Create the main app
-app = FastAPI()
+# Create the main app; JSON is encoded with orjson
+app = FastAPI(default_response_class=FastJSONResponse)
+
+class CRMRoute(FastJSONRoute, TracedRoute):
+    """Traced route whose results are encoded with orjson (encoding falls in the serialize span)"""
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=CRMRoute)
 
 # Global exception handler to ensure all errors return JSON
 @app.exception_handler(Exception)
@@ -112,12 +261,14 @@ class OrganizationBase(BaseModel):
     strategic_tier: str = "Active"  # Target, Active, Strategic
     primary_exec_sponsor: Optional[str] = None
     notes: Optional[str] = None  # Legacy single note field
-    notes_history: Optional[List[dict]] = None  # Running tally of notes [{text, created_at, created_by}]
+    notes_count: int = 0  # Notes live in the notes collection; see /organizations/{org_id}/notes
+    latest_note: Optional[dict] = None  # {note_id, text (preview), created_at, created_by_name}
     google_drive_link: Optional[str] = None
     owner_id: str  # User who owns this organization
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    version: int = 1  # bumped by every update; checked against If-Match
 
 class OrganizationCreate(BaseModel):
     name: str
@@ -145,6 +296,7 @@ class ContactBase(BaseModel):
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    version: int = 1  # bumped by every update; checked against If-Match
 
 class ContactCreate(BaseModel):
     name: str
@@ -183,6 +335,7 @@ class OpportunityBase(BaseModel):
     calculated_value: Optional[float] = None  # Calculated from deal builder
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    version: int = 1  # bumped by every update; checked against If-Match
     stage_entered_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class OpportunityCreate(BaseModel):
@@ -232,6 +385,16 @@ class OpportunityAtRiskUpdate(BaseModel):
     is_at_risk: bool
     at_risk_reason: Optional[str] = None
 
+class StageEvent(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    event_id: str = Field(default_factory=lambda: f"sev_{uuid.uuid4().hex[:12]}")
+    opp_id: str
+    pipeline_id: Optional[str] = None
+    from_stage_id: Optional[str] = None  # None when the opportunity was created
+    to_stage_id: str
+    changed_by: str
+    changed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
 class ActivityBase(BaseModel):
     model_config = ConfigDict(extra="ignore")
     activity_id: str = Field(default_factory=lambda: f"act_{uuid.uuid4().hex[:12]}")
@@ -245,6 +408,7 @@ class ActivityBase(BaseModel):
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    version: int = 1  # bumped by every update; checked against If-Match
 
 class ActivityCreate(BaseModel):
     activity_type: str
@@ -285,6 +449,26 @@ class AICopilotRequest(BaseModel):
     opp_id: str
     context: Optional[str] = None
 
+class CopilotJobFilter(BaseModel):
+    pipeline_id: Optional[str] = None
+    owner_id: Optional[str] = None
+    stage_ids: Optional[List[str]] = None
+    is_at_risk: Optional[bool] = None
+    open_only: bool = True  # Exclude Closed Won / Closed Lost
+
+class SyntheticDataRequest(BaseModel):
+    organizations: int = Field(default=1000, ge=0)
+    contacts: int = Field(default=10000, ge=0)
+    opportunities: int = Field(default=20000, ge=0)
+    activities: int = Field(default=100000, ge=0)
+    seed: int = Field(default=42, ge=0)
+    anchor_date: Optional[str] = None  # YYYY-MM-DD dates are generated around; defaults to today
+    clear: bool = False  # Delete existing orgs/contacts/opportunities/activities first
+
+class CopilotJobCreate(BaseModel):
+    action: str
+    filter: CopilotJobFilter = Field(default_factory=CopilotJobFilter)
+
 # ============== HELPER FUNCTIONS ==============
 
 def serialize_datetime(obj):
@@ -306,13 +490,38 @@ def parse_datetime(dt_str):
         return dt
     return dt_str
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def record_stage_event(opp_id: str, pipeline_id: Optional[str], from_stage_id: Optional[str], to_stage_id: str, user_id: str):
+    """Append a stage transition to the stage_events history"""
+    event = StageEvent(opp_id=opp_id, pipeline_id=pipeline_id, from_stage_id=from_stage_id, to_stage_id=to_stage_id, changed_by=user_id)
+    doc = event.model_dump()
+    doc["changed_at"] = doc["changed_at"].isoformat()
+    await db.stage_events.insert_one(doc)
+
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+password_hash_queued = Gauge("password_hash_queue_depth", "bcrypt operations waiting for a worker thread")
+password_hash_seconds = Histogram("password_hash_seconds", "bcrypt hash/verify time including queueing")
+
+async def run_password_hash(fn, *args):
+    """Run a bcrypt operation on the dedicated worker pool"""
+    started = time.perf_counter()
+    password_hash_queued.inc()
+    
+    def work():
+        password_hash_queued.dec()
+        return fn(*args)
+    
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, work)
+    finally:
+        password_hash_seconds.observe(time.perf_counter() - started)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await run_password_hash(pwd_context.verify, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return await run_password_hash(pwd_context.hash, password)
 
 def create_access_token(data: dict) -> str:
     """Create JWT access token"""
@@ -330,8 +539,8 @@ def decode_token(token: str) -> dict:
     except JWTError:
         return None
 
-async def get_current_user(request: Request) -> dict:
-    """Get current user from JWT token"""
+def get_token_payload(request: Request) -> dict:
+    """Verified JWT claims of the request's session cookie or bearer token"""
     # Check cookie first
     token = request.cookies.get("session_token")
     
@@ -349,17 +558,220 @@ async def get_current_user(request: Request) -> dict:
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user_id = payload.get("user_id")
-    if not user_id:
+    if not payload.get("user_id"):
         raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
+@traced("get_current_user")
+async def get_current_user(request: Request) -> dict:
+    """Get current user from JWT token (looked up once per request)"""
+    if hasattr(request.state, "user"):
+        return request.state.user
+    
+    user_id = get_token_payload(request)["user_id"]
     
     # Get user
     user = await db.users.find_one({"user_id": user_id}, {"_id": 0, "password_hash": 0})
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
+    request.state.user = user
     return user
 
+# ============== RESPONSE CACHE ==============
+
+response_cache_requests = Family(Counter, "response_cache_requests_total", "Cached dashboard/analytics responses", ["result"])
+response_cache = ResponseCache(collection_versions, RESPONSE_CACHE_TTL, requests=response_cache_requests)
+
+def written_snapshot(collections) -> tuple:
+    """Write counters of `collections`: this process's, then the generations shared by all processes"""
+    return collection_versions.snapshot(collections) + write_generations.snapshot(collections)
+
+def cached_response(*collections: str, per_user: bool = False):
+    """Serve an endpoint's JSON from response_cache as pre-encoded bytes.
+    
+    Keyed by path and query string (and user, for per-user payloads). An
+    entry is dropped when one of `collections` is written or after
+    RESPONSE_CACHE_TTL seconds. Compressed variants are stored on the entry,
+    so repeat hits aren't recompressed. The endpoint must take `request`.
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            request = kwargs["request"]
+            user = await get_current_user(request)
+            if RESPONSE_CACHE_TTL <= 0:
+                return await endpoint(**kwargs)
+            key = (request.url.path, tuple(sorted(request.query_params.multi_items())),
+                   user["user_id"] if per_user else None)
+            # Taken before reading, so a write landing mid-build leaves a stale snapshot
+            snapshot = written_snapshot(collections)
+            variants = response_cache.get(key, snapshot)
+            headers = {"X-Cache": "HIT" if variants is not None else "MISS"}
+            if variants is None:
+                variants = response_cache.put(key, snapshot, dumps(await endpoint(**kwargs)))
+            
+            encoding = compressor.encoding_for(request.headers.get("accept-encoding"), len(variants["identity"])) if COMPRESSION else None
+            if encoding is None:
+                return EncodedJSONResponse(variants["identity"], headers=headers)
+            if encoding not in variants:
+                variants[encoding] = await compressor.compress(variants["identity"], encoding)
+            # Already encoded, so CompressionMiddleware passes it through
+            headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+            return EncodedJSONResponse(variants[encoding], headers=headers)
+        return wrapper
+    return decorator
+
+# ============== CONDITIONAL REQUESTS ==============
+
+# Generation counters restart at zero with the process, so tags built from them carry a boot id
+BOOT_ID = uuid.uuid4().hex
+
+def etag_snapshot(collections) -> tuple:
+    """Write counters that list and dependency ETags are built from.
+    
+    With shared generations syncing, only those (and their epoch), which are
+    the same on every instance, so a client alternating between instances
+    still gets 304s; this process's writes not yet flushed are added until
+    they are. Without the sync task (tests, scripts) this process's counters
+    and boot id.
+    """
+    if not write_generations.running:
+        return (BOOT_ID, written_snapshot(collections))
+    return (write_generations.snapshot((SharedGenerations.EPOCH, *collections)),
+            write_generations.pending(collections))
+
+def conditional_list(*collections: str, max_age: Optional[int] = None, bucket: Optional[int] = None):
+    """Strong ETag for a list endpoint from the write counters of the collections it reads.
+    
+    A matching If-None-Match gets a 304 before any query or serialization;
+    the token is verified but the user isn't looked up, so a deleted user
+    whose token hasn't expired still gets 304s (never a body) until it does.
+    Writes by other processes reach the tag through the shared write
+    generations, and the tag is the same on every instance. `bucket`
+    rolls the tag every N seconds for fields computed from the clock
+    (default LIST_ETAG_MAX_SECONDS, which also bounds how long an edit made
+    directly in Mongo goes unseen). `max_age` lets browsers reuse reference
+    data without revalidating.
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            request = kwargs["request"]
+            get_token_payload(request)
+            parts = (request.url.path, sorted(request.query_params.multi_items()),
+                     etag_snapshot(collections), int(time.time() // (bucket or LIST_ETAG_MAX_SECONDS)))
+            headers = {"ETag": make_etag(*parts),
+                       "Cache-Control": f"private, max-age={max_age}" if max_age else "private, no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+            return EncodedJSONResponse(dumps(await endpoint(**kwargs)), headers=headers)
+        return wrapper
+    return decorator
+
+def document_etag(collection: str, doc: dict, id_field: str, collections=(), bucket: Optional[int] = None) -> str:
+    """ETag of a document: its version (for If-Match) plus a hash of updated_at and any dependencies"""
+    parts = (collection, doc[id_field], doc.get("updated_at"))
+    if collections:
+        parts += etag_snapshot(collections)
+    if bucket:
+        parts += (int(time.time() // bucket),)
+    # Documents written before versioning count as version 0
+    return make_etag(*parts, version=doc.get("version", 0))
+
+def conditional_doc(collection: str, id_field: str, *collections: str, bucket: Optional[int] = None):
+    """Strong ETag for a single document from its version and updated_at.
+    
+    Costs one projected lookup; a match returns 304 without the full read.
+    As with conditional_list the user isn't looked up. `collections` adds the write counters of other collections the response
+    is computed from.
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            request = kwargs["request"]
+            get_token_payload(request)
+            current = await db[collection].find_one({id_field: kwargs[id_field]}, {"_id": 0, id_field: 1, "updated_at": 1, "version": 1})
+            if current is None:
+                return await endpoint(**kwargs)  # the endpoint's 404
+            headers = {"ETag": document_etag(collection, current, id_field, collections, bucket),
+                       "Cache-Control": "private, no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+            return EncodedJSONResponse(dumps(await endpoint(**kwargs)), headers=headers)
+        return wrapper
+    return decorator
+
+def if_match_query(request: Request) -> dict:
+    """Version predicate from If-Match: {} when absent or "*", 412 for tags that can't match"""
+    if_match = request.headers.get("if-match")
+    if not if_match or if_match.strip() == "*":
+        return {}
+    # If-Match uses strong comparison, so weak tags never match
+    versions = {etag_version(tag.strip()) for tag in if_match.split(",") if not tag.strip().startswith("W/")}
+    versions.discard(None)
+    if not versions:
+        raise HTTPException(status_code=412, detail="If-Match does not match the current version")
+    # version 0 is a document that predates versioning (no field)
+    return {"$or": [{"version": v} if v else {"version": None} for v in versions]}
+
+VERSIONED_NAMES = {"organizations": "Organization", "contacts": "Contact", "opportunities": "Opportunity", "activities": "Activity"}
+
+async def update_versioned(collection: str, id_field: str, doc_id: str, fields: dict, request: Request):
+    """$set `fields` and bump the version in one round trip, honouring If-Match.
+    
+    Returns (before, after). Raises 404 for a missing document and 412 when
+    If-Match names a version that is no longer current.
+    """
+    condition = if_match_query(request)
+    # The pre-image gives callers the old values (e.g. the previous stage) without another read
+    before = await db[collection].find_one_and_update(
+        {id_field: doc_id, **condition}, {"$set": fields, "$inc": {"version": 1}},
+        projection={"_id": 0}, return_document=ReturnDocument.BEFORE
+    )
+    if before is None:
+        if condition and await db[collection].count_documents({id_field: doc_id}, limit=1):
+            raise HTTPException(status_code=412, detail="Modified by someone else; reload and retry")
+        raise HTTPException(status_code=404, detail=f"{VERSIONED_NAMES[collection]} not found")
+    after = {**before, **fields, "version": before.get("version", 0) + 1}
+    # The previous owner hears about it too, e.g. to drop a reassigned deal from their pipeline
+    await record_changes(change_event(collection, "update", doc_id, {**fields, "version": after["version"]},
+                                      [before.get("owner_id"), after.get("owner_id")]))
+    return before, after
+
+async def insert_document(collection: str, doc: dict) -> dict:
+    """Insert and return the document as stored, without reading it back"""
+    await db[collection].insert_one(doc)
+    doc.pop("_id", None)  # added by insert_one
+    await record_changes(change_event(collection, "create", doc[SYNC_COLLECTIONS[collection]], doc, [doc.get("owner_id")]))
+    return doc
+
+async def delete_documents(collection: str, id_field: str, ids: List[str], user_id: Optional[str]) -> int:
+    """Delete by id, leaving tombstones so /api/sync clients drop them too"""
+    if not ids:
+        return 0
+    result = await db[collection].delete_many({id_field: {"$in": ids}})
+    if result.deleted_count:
+        now = datetime.now(timezone.utc)
+        await db.tombstones.insert_many([
+            {"tombstone_id": f"tomb_{uuid.uuid4().hex[:12]}", "collection": collection, "doc_id": doc_id,
+             "deleted_at": now.isoformat(), "deleted_by": user_id,
+             "expires_at": now + timedelta(days=SYNC_TOMBSTONE_DAYS)}  # TTL index
+            for doc_id in ids
+        ])
+        await record_changes(*(change_event(collection, "delete", doc_id) for doc_id in ids))
+    return result.deleted_count
+
+async def record_reset() -> None:
+    """Mark a wipe or bulk load whose documents /api/sync can't page through; sync tokens from before it get 410"""
+    now = datetime.now(timezone.utc)
+    await db.tombstones.insert_one({"tombstone_id": f"tomb_{uuid.uuid4().hex[:12]}", "collection": "*", "doc_id": None,
+                                    "deleted_at": now.isoformat(), "expires_at": now + timedelta(days=SYNC_TOMBSTONE_DAYS)})
+
+def versioned_response(collection: str, doc: dict, id_field: str, collections=(), bucket: Optional[int] = None) -> Response:
+    """The written document with the ETag to send as If-Match next time"""
+    return EncodedJSONResponse(dumps(doc), headers={"ETag": document_etag(collection, doc, id_field, collections, bucket)})
+
 # ============== HEALTH ENDPOINT ==============
 
 @api_router.get("/health")
@@ -431,7 +843,7 @@ async def login(data: LoginRequest, response: Response):
         if not user.get("password_hash"):
             raise HTTPException(status_code=401, detail="Account not configured for password login")
         
-        if not verify_password(data.password, user["password_hash"]):
+        if not await verify_password(data.password, user["password_hash"]):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
         # Create JWT token
@@ -478,11 +890,13 @@ async def setup_admin():
         "email": DEFAULT_ADMIN["email"].lower(),
         "name": DEFAULT_ADMIN["name"],
         "role": DEFAULT_ADMIN["role"],
-        "password_hash": get_password_hash(default_password),
+        "password_hash": await get_password_hash(default_password),
         "picture": None,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.users.insert_one(user_doc)
+    await record_changes(change_event("users", "create", user_doc["user_id"],
+                                     {k: v for k, v in user_doc.items() if k not in ("_id", "password_hash")}))
     
     return {"message": "Admin user created", "email": DEFAULT_ADMIN["email"], "default_password": default_password}
 
@@ -495,11 +909,11 @@ async def change_password(data: ChangePasswordRequest, request: Request):
     full_user = await db.users.find_one({"user_id": user["user_id"]}, {"_id": 0})
     
     # Verify current password
-    if not verify_password(data.current_password, full_user.get("password_hash", "")):
+    if not await verify_password(data.current_password, full_user.get("password_hash", "")):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
     # Update password
-    new_hash = get_password_hash(data.new_password)
+    new_hash = await get_password_hash(data.new_password)
     await db.users.update_one(
         {"user_id": user["user_id"]},
         {"$set": {"password_hash": new_hash}}
@@ -514,6 +928,7 @@ async def get_me(request: Request):
     return user
 
 @api_router.get("/auth/users")
+@conditional_list("users")
 async def get_users(request: Request):
     """Get all users from database"""
     user = await get_current_user(request)
@@ -551,11 +966,13 @@ async def create_user(data: UserCreate, request: Request):
         "email": email,
         "name": data.name.strip(),
         "role": data.role,
-        "password_hash": get_password_hash(data.password),
+        "password_hash": await get_password_hash(data.password),
         "picture": None,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.users.insert_one(user_doc)
+    await record_changes(change_event("users", "create", user_doc["user_id"],
+                                     {k: v for k, v in user_doc.items() if k not in ("_id", "password_hash")}))
     
     return {
         "user_id": user_doc["user_id"],
@@ -571,11 +988,6 @@ async def update_user(user_id: str, data: UserUpdate, request: Request):
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Check if user exists
-    user = await db.users.find_one({"user_id": user_id}, {"_id": 0})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     update_data = {}
     
     if data.name:
@@ -594,11 +1006,19 @@ async def update_user(user_id: str, data: UserUpdate, request: Request):
             raise HTTPException(status_code=400, detail="Role must be 'admin' or 'sales_lead'")
         update_data["role"] = data.role
     
+    projection = {"_id": 0, "password_hash": 0}
     if update_data:
         update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-        await db.users.update_one({"user_id": user_id}, {"$set": update_data})
-    
-    return await db.users.find_one({"user_id": user_id}, {"_id": 0, "password_hash": 0})
+        user = await db.users.find_one_and_update(
+            {"user_id": user_id}, {"$set": update_data}, projection=projection, return_document=ReturnDocument.AFTER
+        )
+    else:
+        user = await db.users.find_one({"user_id": user_id}, projection)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if update_data:
+        await record_changes(change_event("users", "update", user_id, update_data))
+    return user
 
 @api_router.post("/auth/users/{user_id}/reset-password")
 async def reset_user_password(user_id: str, data: UserPasswordReset, request: Request):
@@ -617,13 +1037,16 @@ async def reset_user_password(user_id: str, data: UserPasswordReset, request: Re
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
     
     # Update password
+    updated_at = datetime.now(timezone.utc).isoformat()
     await db.users.update_one(
         {"user_id": user_id},
         {"$set": {
-            "password_hash": get_password_hash(data.new_password),
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "password_hash": await get_password_hash(data.new_password),
+            "updated_at": updated_at
         }}
     )
+    # The hash itself never goes into the change log
+    await record_changes(change_event("users", "update", user_id, {"updated_at": updated_at}))
     
     return {"message": "Password reset successfully"}
 
@@ -644,6 +1067,7 @@ async def delete_user(user_id: str, request: Request):
         raise HTTPException(status_code=404, detail="User not found")
     
     await db.users.delete_one({"user_id": user_id})
+    await record_changes(change_event("users", "delete", user_id))
     return {"message": "User deleted"}
 
 @api_router.post("/auth/logout")
@@ -660,6 +1084,7 @@ async def logout(request: Request, response: Response):
 # ============== ORGANIZATION ENDPOINTS ==============
 
 @api_router.get("/organizations")
+@conditional_list("organizations", "activities", "opportunities", bucket=300)
 async def get_organizations(request: Request):
     user = await get_current_user(request)
     orgs = await db.organizations.find({}, {"_id": 0}).to_list(1000)
@@ -694,6 +1119,7 @@ async def get_organizations(request: Request):
     return orgs
 
 @api_router.get("/organizations/{org_id}")
+@conditional_doc("organizations", "org_id", "activities", "opportunities", bucket=300)
 async def get_organization(org_id: str, request: Request):
     user = await get_current_user(request)
     org = await db.organizations.find_one({"org_id": org_id}, {"_id": 0})
@@ -731,26 +1157,31 @@ async def create_organization(data: OrganizationCreate, request: Request):
     doc = org.model_dump()
     doc["created_at"] = doc["created_at"].isoformat()
     doc["updated_at"] = doc["updated_at"].isoformat()
-    await db.organizations.insert_one(doc)
-    return await db.organizations.find_one({"org_id": org.org_id}, {"_id": 0})
+    org = await insert_document("organizations", doc)
+    return versioned_response("organizations", org, "org_id", ("activities", "opportunities"), bucket=300)
 
 @api_router.put("/organizations/{org_id}")
 async def update_organization(org_id: str, data: OrganizationCreate, request: Request):
     user = await get_current_user(request)
     update_data = data.model_dump(exclude_unset=True)
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    await db.organizations.update_one({"org_id": org_id}, {"$set": update_data})
-    return await db.organizations.find_one({"org_id": org_id}, {"_id": 0})
+    _, org = await update_versioned("organizations", "org_id", org_id, update_data, request)
+    return versioned_response("organizations", org, "org_id", ("activities", "opportunities"), bucket=300)
 
 @api_router.delete("/organizations/{org_id}")
 async def delete_organization(org_id: str, request: Request):
     user = await get_current_user(request)
-    await db.organizations.delete_one({"org_id": org_id})
+    await delete_documents("organizations", "org_id", [org_id], user["user_id"])
+    note_ids = [n["note_id"] async for n in db.notes.find({"org_id": org_id}, {"_id": 0, "note_id": 1})]
+    if note_ids:
+        await db.notes.delete_many({"org_id": org_id})
+        await record_changes(*(change_event("notes", "delete", note_id) for note_id in note_ids))
     return {"message": "Deleted"}
 
 # ============== CONTACT ENDPOINTS ==============
 
 @api_router.get("/contacts")
+@conditional_list("contacts")
 async def get_contacts(request: Request, org_id: Optional[str] = None):
     user = await get_current_user(request)
     query = {} if not org_id else {"org_id": org_id}
@@ -758,6 +1189,7 @@ async def get_contacts(request: Request, org_id: Optional[str] = None):
     return contacts
 
 @api_router.get("/contacts/{contact_id}")
+@conditional_doc("contacts", "contact_id")
 async def get_contact(contact_id: str, request: Request):
     user = await get_current_user(request)
     contact = await db.contacts.find_one({"contact_id": contact_id}, {"_id": 0})
@@ -773,21 +1205,21 @@ async def create_contact(data: ContactCreate, request: Request):
     doc = contact.model_dump()
     doc["created_at"] = doc["created_at"].isoformat()
     doc["updated_at"] = doc["updated_at"].isoformat()
-    await db.contacts.insert_one(doc)
-    return await db.contacts.find_one({"contact_id": contact.contact_id}, {"_id": 0})
+    contact = await insert_document("contacts", doc)
+    return versioned_response("contacts", contact, "contact_id")
 
 @api_router.put("/contacts/{contact_id}")
 async def update_contact(contact_id: str, data: ContactCreate, request: Request):
     user = await get_current_user(request)
     update_data = data.model_dump(exclude_unset=True)
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    await db.contacts.update_one({"contact_id": contact_id}, {"$set": update_data})
-    return await db.contacts.find_one({"contact_id": contact_id}, {"_id": 0})
+    _, contact = await update_versioned("contacts", "contact_id", contact_id, update_data, request)
+    return versioned_response("contacts", contact, "contact_id")
 
 @api_router.delete("/contacts/{contact_id}")
 async def delete_contact(contact_id: str, request: Request):
     user = await get_current_user(request)
-    await db.contacts.delete_one({"contact_id": contact_id})
+    await delete_documents("contacts", "contact_id", [contact_id], user["user_id"])
     return {"message": "Deleted"}
 
 @api_router.get("/organizations/{org_id}/summary")
@@ -833,9 +1265,39 @@ async def get_organization_summary(org_id: str, request: Request):
         "pipeline_opportunities": pipeline_opps
     }
 
+def note_preview(note: dict) -> dict:
+    """The slice of a note kept on its organization as latest_note"""
+    text = note["text"]
+    if len(text) > NOTE_PREVIEW_CHARS:
+        text = text[:NOTE_PREVIEW_CHARS - 1].rstrip() + "…"
+    return {"note_id": note["note_id"], "text": text, "created_at": note["created_at"],
+            "created_by_name": note.get("created_by_name")}
+
+@api_router.get("/organizations/{org_id}/notes")
+@conditional_list("notes", "organizations")
+async def get_organization_notes(org_id: str, request: Request, cursor: Optional[str] = None,
+                                 limit: int = Query(NOTES_PAGE_SIZE, ge=1, le=100)):
+    """An organization's notes, newest first; pass next_cursor back as `cursor` for older ones"""
+    user = await get_current_user(request)
+    if not await db.organizations.find_one({"org_id": org_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Organization not found")
+    query = {"org_id": org_id}
+    if cursor:
+        try:
+            created_at, note_id = decode_cursor(cursor)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["$or"] = [{"created_at": {"$lt": created_at}}, {"created_at": created_at, "note_id": {"$lt": note_id}}]
+    notes = await db.notes.find(query, {"_id": 0}).sort([("created_at", -1), ("note_id", -1)]).limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(notes) > limit:
+        notes = notes[:limit]
+        next_cursor = encode_cursor([notes[-1]["created_at"], notes[-1]["note_id"]])
+    return {"notes": notes, "next_cursor": next_cursor}
+
 @api_router.post("/organizations/{org_id}/notes")
 async def add_organization_note(org_id: str, request: Request):
-    """Add a note to the organization's notes history"""
+    """Add a note to the organization; the org keeps only a count and the latest note's preview"""
     user = await get_current_user(request)
     body = await request.json()
     note_text = body.get("text", "").strip()
@@ -844,31 +1306,91 @@ async def add_organization_note(org_id: str, request: Request):
         raise HTTPException(status_code=400, detail="Note text is required")
     
     note_entry = {
+        "note_id": f"note_{uuid.uuid4().hex[:12]}",
+        "org_id": org_id,
         "text": note_text,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "created_by": user["user_id"],
         "created_by_name": user.get("name", "Unknown")
     }
     
-    await db.organizations.update_one(
+    # Note first, so a failed insert never leaves the org counting a note that doesn't exist
+    await db.notes.insert_one(note_entry)
+    note_entry.pop("_id", None)
+    org = await db.organizations.find_one_and_update(
         {"org_id": org_id},
         {
-            "$push": {"notes_history": note_entry},
-            "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
-        }
+            "$set": {"latest_note": note_preview(note_entry), "updated_at": note_entry["created_at"]},
+            "$inc": {"notes_count": 1, "version": 1}
+        },
+        projection={"_id": 0, "latest_note": 1, "updated_at": 1, "notes_count": 1, "version": 1, "owner_id": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not org:
+        await db.notes.delete_one({"note_id": note_entry["note_id"]})
+        raise HTTPException(status_code=404, detail="Organization not found")
+    owner_id = org.pop("owner_id", None)
+    await record_changes(
+        change_event("notes", "create", note_entry["note_id"], note_entry, [user["user_id"]]),
+        change_event("organizations", "update", org_id, org, [owner_id])
     )
     
     return note_entry
 
+async def migrate_notes_history(batch_size: int = 500) -> int:
+    """Move notes_history arrays left on organizations into the notes collection.
+    
+    Idempotent and safe to run from several instances at once: note ids are
+    derived from the org and position, so a re-run inserts nothing new, and
+    only the run that still finds the array updates the org. Returns the
+    number of organizations migrated.
+    """
+    migrated = []
+    cursor = db.organizations.find({"notes_history": {"$exists": True}}, {"_id": 0, "org_id": 1, "notes_history": 1})
+    async for org in cursor.batch_size(batch_size):
+        org_id = org["org_id"]
+        history = [n for n in org.get("notes_history") or [] if isinstance(n, dict) and n.get("text")]
+        notes = [{
+            "note_id": f"note_{hashlib.sha1(f'{org_id}:{i}'.encode()).hexdigest()[:12]}",
+            "org_id": org_id,
+            "text": n["text"],
+            "created_at": n.get("created_at"),
+            "created_by": n.get("created_by"),
+            "created_by_name": n.get("created_by_name"),
+        } for i, n in enumerate(history)]
+        if notes:
+            try:
+                await db.notes.insert_many(notes, ordered=False)
+            except BulkWriteError as e:
+                # Duplicate note ids are notes an earlier run already moved
+                if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                    raise
+        latest = max(notes, key=lambda n: n["created_at"] or "") if notes else None
+        result = await db.organizations.update_one(
+            {"org_id": org_id, "notes_history": {"$exists": True}},
+            {"$unset": {"notes_history": ""}, "$inc": {"notes_count": len(notes), "version": 1},
+             "$set": {"latest_note": note_preview(latest) if latest else None,
+                      "updated_at": datetime.now(timezone.utc).isoformat()}}
+        )
+        if result.modified_count:
+            migrated.append(org_id)
+    if migrated:
+        # notes_count and latest_note changed; consumers refetch these organizations
+        await record_changes(*(change_event("organizations", "invalidate", org_id) for org_id in migrated))
+        logger.info(f"Moved notes_history of {len(migrated)} organizations into the notes collection")
+    return len(migrated)
+
 # ============== PIPELINE & STAGE ENDPOINTS ==============
 
 @api_router.get("/pipelines")
+@conditional_list("pipelines", max_age=REFERENCE_DATA_MAX_AGE)
 async def get_pipelines(request: Request):
     user = await get_current_user(request)
     pipelines = await db.pipelines.find({}, {"_id": 0}).to_list(100)
     return pipelines
 
 @api_router.get("/pipelines/{pipeline_id}/stages")
+@conditional_list("stages", max_age=REFERENCE_DATA_MAX_AGE)
 async def get_stages(pipeline_id: str, request: Request):
     user = await get_current_user(request)
     stages = await db.stages.find({"pipeline_id": pipeline_id}, {"_id": 0}).sort("order", 1).to_list(100)
@@ -877,6 +1399,7 @@ async def get_stages(pipeline_id: str, request: Request):
 # ============== OPPORTUNITY ENDPOINTS ==============
 
 @api_router.get("/opportunities")
+@conditional_list("opportunities")
 async def get_opportunities(request: Request, pipeline_id: Optional[str] = None, owner_id: Optional[str] = None):
     user = await get_current_user(request)
     query = {}
@@ -888,6 +1411,7 @@ async def get_opportunities(request: Request, pipeline_id: Optional[str] = None,
     return opps
 
 @api_router.get("/opportunities/{opp_id}")
+@conditional_doc("opportunities", "opp_id")
 async def get_opportunity(opp_id: str, request: Request):
     user = await get_current_user(request)
     opp = await db.opportunities.find_one({"opp_id": opp_id}, {"_id": 0})
@@ -914,10 +1438,12 @@ async def create_opportunity(data: OpportunityCreate, request: Request):
     if doc["target_close_date"]:
         doc["target_close_date"] = doc["target_close_date"].isoformat()
     
-    await db.opportunities.insert_one(doc)
-    
+    await insert_document("opportunities", doc)
     # Check stage automation
-    stage = await db.stages.find_one({"stage_id": data.stage_id}, {"_id": 0})
+    _, stage = await asyncio.gather(
+        record_stage_event(opp.opp_id, opp.pipeline_id, None, opp.stage_id, user["user_id"]),
+        db.stages.find_one({"stage_id": data.stage_id}, {"_id": 0})
+    )
     if stage and stage.get("auto_activity"):
         activity_doc = {
             "activity_id": f"act_{uuid.uuid4().hex[:12]}",
@@ -930,18 +1456,28 @@ async def create_opportunity(data: OpportunityCreate, request: Request):
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat()
         }
-        await db.activities.insert_one(activity_doc)
+        await insert_document("activities", activity_doc)
     
-    return await db.opportunities.find_one({"opp_id": opp.opp_id}, {"_id": 0})
+    return versioned_response("opportunities", doc, "opp_id")
 
 @api_router.put("/opportunities/{opp_id}")
 async def update_opportunity(opp_id: str, data: OpportunityUpdate, request: Request):
     user = await get_current_user(request)
     update_data = data.model_dump(exclude_unset=True)
     
-    # Handle stage change
     if "stage_id" in update_data:
         update_data["stage_entered_at"] = datetime.now(timezone.utc).isoformat()
+    
+    if "target_close_date" in update_data and update_data["target_close_date"]:
+        update_data["target_close_date"] = parse_datetime(update_data["target_close_date"]).isoformat()
+    
+    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    before, opp = await update_versioned("opportunities", "opp_id", opp_id, update_data, request)
+    
+    # Handle stage change
+    if "stage_id" in update_data:
+        if before.get("stage_id") != update_data["stage_id"]:
+            await record_stage_event(opp_id, before.get("pipeline_id"), before.get("stage_id"), update_data["stage_id"], user["user_id"])
         
         # Check stage automation
         stage = await db.stages.find_one({"stage_id": update_data["stage_id"]}, {"_id": 0})
@@ -957,20 +1493,18 @@ async def update_opportunity(opp_id: str, data: OpportunityUpdate, request: Requ
                 "created_at": datetime.now(timezone.utc).isoformat(),
                 "updated_at": datetime.now(timezone.utc).isoformat()
             }
-            await db.activities.insert_one(activity_doc)
+            await insert_document("activities", activity_doc)
     
-    if "target_close_date" in update_data and update_data["target_close_date"]:
-        update_data["target_close_date"] = parse_datetime(update_data["target_close_date"]).isoformat()
-    
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    await db.opportunities.update_one({"opp_id": opp_id}, {"$set": update_data})
-    return await db.opportunities.find_one({"opp_id": opp_id}, {"_id": 0})
+    return versioned_response("opportunities", opp, "opp_id")
 
 @api_router.delete("/opportunities/{opp_id}")
 async def delete_opportunity(opp_id: str, request: Request):
     user = await get_current_user(request)
-    await db.opportunities.delete_one({"opp_id": opp_id})
-    await db.activities.delete_many({"opp_id": opp_id})
+    activity_ids = [a["activity_id"] async for a in db.activities.find({"opp_id": opp_id}, {"_id": 0, "activity_id": 1})]
+    await asyncio.gather(
+        delete_documents("opportunities", "opp_id", [opp_id], user["user_id"]),
+        delete_documents("activities", "activity_id", activity_ids, user["user_id"])
+    )
     return {"message": "Deleted"}
 
 @api_router.put("/opportunities/{opp_id}/at-risk")
@@ -978,23 +1512,19 @@ async def update_opportunity_at_risk(opp_id: str, data: OpportunityAtRiskUpdate,
     """Update opportunity at-risk status with reason"""
     user = await get_current_user(request)
     
-    # Verify opportunity exists
-    opp = await db.opportunities.find_one({"opp_id": opp_id}, {"_id": 0})
-    if not opp:
-        raise HTTPException(status_code=404, detail="Opportunity not found")
-    
     update_data = {
         "is_at_risk": data.is_at_risk,
         "at_risk_reason": data.at_risk_reason if data.is_at_risk else None,
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.opportunities.update_one({"opp_id": opp_id}, {"$set": update_data})
-    return await db.opportunities.find_one({"opp_id": opp_id}, {"_id": 0})
+    _, opp = await update_versioned("opportunities", "opp_id", opp_id, update_data, request)
+    return versioned_response("opportunities", opp, "opp_id")
 
 # ============== ACTIVITY ENDPOINTS ==============
 
 @api_router.get("/activities")
+@conditional_list("activities", "opportunities")
 async def get_activities(request: Request, opp_id: Optional[str] = None, org_id: Optional[str] = None, owner_id: Optional[str] = None, status: Optional[str] = None):
     user = await get_current_user(request)
     query = {}
@@ -1015,6 +1545,7 @@ async def get_activities(request: Request, opp_id: Optional[str] = None, org_id:
     return activities
 
 @api_router.get("/activities/{activity_id}")
+@conditional_doc("activities", "activity_id")
 async def get_activity(activity_id: str, request: Request):
     user = await get_current_user(request)
     activity = await db.activities.find_one({"activity_id": activity_id}, {"_id": 0})
@@ -1034,16 +1565,15 @@ async def create_activity(data: ActivityCreate, request: Request):
     doc["updated_at"] = doc["updated_at"].isoformat()
     doc["due_date"] = doc["due_date"].isoformat()
     
-    await db.activities.insert_one(doc)
-    
+    writes = [insert_document("activities", doc)]
     # Update opportunity at-risk status if linked to opp
     if data.opp_id:
-        await db.opportunities.update_one(
-            {"opp_id": data.opp_id},
-            {"$set": {"is_at_risk": False, "updated_at": datetime.now(timezone.utc).isoformat()}}
-        )
-    
-    return await db.activities.find_one({"activity_id": activity.activity_id}, {"_id": 0})
+        at_risk_update = {"is_at_risk": False, "updated_at": datetime.now(timezone.utc).isoformat()}
+        writes.append(db.opportunities.update_one({"opp_id": data.opp_id}, {"$set": at_risk_update, "$inc": {"version": 1}}))
+    activity, *_ = await asyncio.gather(*writes)
+    if data.opp_id:
+        await record_changes(change_event("opportunities", "update", data.opp_id, at_risk_update))
+    return versioned_response("activities", activity, "activity_id")
 
 @api_router.put("/activities/{activity_id}")
 async def update_activity(activity_id: str, data: ActivityUpdate, request: Request):
@@ -1054,18 +1584,216 @@ async def update_activity(activity_id: str, data: ActivityUpdate, request: Reque
         update_data["due_date"] = parse_datetime(update_data["due_date"]).isoformat()
     
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    await db.activities.update_one({"activity_id": activity_id}, {"$set": update_data})
-    return await db.activities.find_one({"activity_id": activity_id}, {"_id": 0})
+    _, activity = await update_versioned("activities", "activity_id", activity_id, update_data, request)
+    return versioned_response("activities", activity, "activity_id")
 
 @api_router.delete("/activities/{activity_id}")
 async def delete_activity(activity_id: str, request: Request):
     user = await get_current_user(request)
-    await db.activities.delete_one({"activity_id": activity_id})
+    await delete_documents("activities", "activity_id", [activity_id], user["user_id"])
     return {"message": "Deleted"}
 
+# ============== DELTA SYNC ==============
+
+SYNC_COLLECTIONS = {"organizations": "org_id", "contacts": "contact_id", "opportunities": "opp_id", "activities": "activity_id"}
+
+def encode_cursor(value) -> str:
+    """Opaque URL-safe pagination token for any JSON value"""
+    return base64.urlsafe_b64encode(dumps(value)).decode().rstrip("=")
+
+def decode_cursor(token: str):
+    """Inverse of encode_cursor; raises ValueError for anything else"""
+    return json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+
+def encode_sync_token(cursors: dict) -> str:
+    return encode_cursor(cursors)
+
+def decode_sync_token(token: str) -> dict:
+    """{stream: [time, last id or None]} for each collection plus "tombstones" """
+    try:
+        cursors = decode_cursor(token)
+        if set(cursors) != set(SYNC_COLLECTIONS) | {"tombstones"}:
+            raise ValueError(token)
+        for t, last_id in cursors.values():
+            if not isinstance(t, str) or not isinstance(last_id, (str, type(None))):
+                raise ValueError(token)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    return cursors
+
+async def sync_page(collection: str, time_field: str, id_field: str, cursor: Optional[list], horizon: str, limit: int):
+    """Documents changed after `cursor` up to `horizon`, in (time, id) order; returns (docs, next cursor, more)"""
+    query = {time_field: {"$lte": horizon}}
+    if cursor and cursor[1] is None:
+        query[time_field]["$gt"] = cursor[0]
+    elif cursor:
+        # Resume inside a run of documents sharing the cursor's timestamp
+        query["$or"] = [{time_field: {"$gt": cursor[0]}}, {time_field: cursor[0], id_field: {"$gt": cursor[1]}}]
+    docs = await db[collection].find(query, {"_id": 0, "expires_at": 0}).sort([(time_field, 1), (id_field, 1)]).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, [docs[-1][time_field], docs[-1][id_field]], True
+    return docs, [max(horizon, cursor[0]) if cursor else horizon, None], False
+
+@api_router.get("/sync")
+async def sync(request: Request, since: Optional[str] = None, limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=5000)):
+    """Changes since a sync token: new/updated documents and deleted ids for every CRM collection.
+    
+    Without `since` this is a full download (no tombstones needed). Keep
+    calling with the returned sync_token while has_more is true, then
+    periodically to pick up later changes. Documents may be sent more than
+    once, so clients should upsert by id and apply `deleted` last. A 410 means the token predates
+    kept tombstones, a data wipe or a synthetic load; start again without `since`.
+    
+    Changes younger than SYNC_SETTLE_SECONDS are left for the next call, so
+    a write whose updated_at was taken just before a slower write committed
+    isn't skipped.
+    """
+    user = await get_current_user(request)
+    now = datetime.now(timezone.utc)
+    horizon = (now - timedelta(seconds=SYNC_SETTLE_SECONDS)).isoformat()
+    if since:
+        cursors = decode_sync_token(since)
+        if cursors["tombstones"][0] < (now - timedelta(days=SYNC_TOMBSTONE_DAYS)).isoformat():
+            raise HTTPException(status_code=410, detail="Sync token expired; do a full sync")
+    else:
+        # A full sync has nothing to delete; only deletes from here on matter
+        cursors = {**{name: None for name in SYNC_COLLECTIONS}, "tombstones": [horizon, None]}
+    
+    streams = [(name, "updated_at", id_field) for name, id_field in SYNC_COLLECTIONS.items()]
+    streams.append(("tombstones", "deleted_at", "tombstone_id"))
+    pages = await asyncio.gather(*(sync_page(name, time_field, id_field, cursors[name], horizon, limit)
+                                   for name, time_field, id_field in streams))
+    
+    response = {"changes": {}, "deleted": {name: [] for name in SYNC_COLLECTIONS}, "has_more": False, "full": not since}
+    next_cursors = {}
+    for (name, _, _), (docs, cursor, more) in zip(streams, pages):
+        next_cursors[name] = cursor
+        response["has_more"] |= more
+        if name != "tombstones":
+            response["changes"][name] = docs
+            continue
+        for tombstone in docs:
+            if tombstone["collection"] == "*":
+                raise HTTPException(status_code=410, detail="Data was reset; do a full sync")
+            response["deleted"][tombstone["collection"]].append(tombstone["doc_id"])
+    response["sync_token"] = encode_sync_token(next_cursors)
+    return response
+
+# ============== CHANGE EVENTS ==============
+
+# Entities that appear in change events: the synced CRM collections plus notes and users
+CHANGE_ENTITIES = [*SYNC_COLLECTIONS, "notes", "users"]
+
+events_published_total = Counter("events_published_total", "Change events published to /api/events subscribers")
+events_overflows_total = Counter("events_overflows_total", "Subscriber queues that overflowed and were told to resync")
+event_broker = EventBroker(EVENTS_QUEUE_SIZE, EVENTS_REPLAY, EVENTS_MAX_SUBSCRIBERS,
+                           published=events_published_total, overflows=events_overflows_total)
+
+change_log = ChangeLog(db, max_bytes=CHANGE_LOG_MAX_MB * 1024 * 1024, settle_seconds=CHANGE_LOG_SETTLE_SECONDS)
+change_log_append_failures = Counter("change_log_append_failures_total", "Change events that could not be written to change_events")
+
+def change_event(entity: str, op: str, doc_id: Optional[str] = None, fields: Optional[dict] = None, owner_ids=()) -> dict:
+    """A compact description of a committed write.
+    
+    op is create (fields = the document), update (fields = what changed),
+    delete or invalidate (bulk writes; refetch the document, or the whole
+    entity when there's no id).
+    """
+    return {
+        "entity": entity,
+        "op": op,
+        "id": doc_id,
+        "fields": fields,
+        "owner_ids": sorted({o for o in owner_ids if o}),
+        "at": datetime.now(timezone.utc).isoformat()
+    }
+
+async def record_changes(*events: dict) -> None:
+    """Append committed writes to the change log; every instance's tail of
+    the log pushes them to its /api/events subscribers"""
+    try:
+        await change_log.append(list(events))
+    except Exception as e:
+        # The write itself succeeded; failing the request now would only invite a retry
+        change_log_append_failures.inc(len(events))
+        logger.error(f"Change log append failed for {len(events)} events: {e}")
+        # Not in the log, so at least this instance's subscribers hear about it
+        for event in events:
+            event_broker.publish(event)
+
+@api_router.get("/changes")
+async def read_changes(request: Request, since: Optional[str] = None, limit: int = Query(500, ge=1, le=5000),
+                       entities: Optional[str] = None):
+    """Change log for downstream consumers (admin only).
+    
+    Resume with the returned next_token; without `since` reading starts at
+    the oldest retained event. Events appear once they are older than
+    CHANGE_LOG_SETTLE_SECONDS. 410 means events were dropped from the
+    capped log since the token, so the consumer must rebuild.
+    """
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    wanted = [e.strip() for e in entities.split(",") if e.strip()] if entities else None
+    try:
+        events, next_token = await change_log.read_since(since, limit, wanted)
+    except InvalidToken:
+        raise HTTPException(status_code=400, detail="Invalid change log token")
+    except ChangeLogExpired:
+        raise HTTPException(status_code=410, detail="Token is older than the change log; rebuild from scratch")
+    return {"events": events, "next_token": next_token, "has_more": len(events) == limit}
+
+@api_router.get("/events")
+async def stream_events(request: Request, entities: Optional[str] = None, mine: bool = False):
+    """Entity changes pushed as server-sent events.
+    
+    `entities` is a comma-separated subset of organizations, contacts,
+    opportunities, activities, notes and users; `mine=true` keeps only changes to records
+    the user owns or owned (deletes and invalidations always come through).
+    Events: `change` ({entity, op, id, fields, owner_ids, at}) and `resync`
+    when the client fell too far behind or reconnected after events were
+    dropped, meaning it should refetch. Changes arrive through the shared
+    change log, so writes made by other instances and the CLIs are included.
+    A comment line is sent every EVENTS_HEARTBEAT_SECONDS to keep proxies
+    from closing an idle stream.
+    """
+    user = await get_current_user(request)
+    wanted = {e.strip() for e in entities.split(",") if e.strip()} if entities else None
+    if wanted and not wanted <= set(CHANGE_ENTITIES):
+        raise HTTPException(status_code=400, detail=f"entities must be among: {', '.join(CHANGE_ENTITIES)}")
+    try:
+        subscriber = event_broker.subscribe(wanted, user["user_id"] if mine else None,
+                                            request.headers.get("last-event-id") or request.query_params.get("last_event_id"))
+    except OverflowError:
+        raise HTTPException(status_code=503, detail="Too many event subscribers")
+    
+    async def event_stream():
+        try:
+            # Sent at once so headers (and EventSource.onopen) don't wait for the first change
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    seq, event = await asyncio.wait_for(subscriber.queue.get(), EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                name = "resync" if event is RESYNC else "change"
+                yield f"id: {event_broker.event_id(seq)}\nevent: {name}\ndata: {dumps(event).decode()}\n\n"
+        finally:
+            event_broker.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ============== DASHBOARD ENDPOINTS ==============
 
 @api_router.get("/dashboard/sales")
+@cached_response("opportunities", "pipelines", "stages", "activities", "users", per_user=True)
 async def get_sales_dashboard(request: Request):
     """Main dashboard - shows ALL opportunities and activities"""
     user = await get_current_user(request)
@@ -1120,6 +1848,7 @@ async def get_sales_dashboard(request: Request):
     }
 
 @api_router.get("/dashboard/my-pipeline")
+@cached_response("opportunities", "pipelines", "stages", "activities", per_user=True)
 async def get_my_pipeline(request: Request):
     """My Pipeline - shows only opportunities owned by current user"""
     user = await get_current_user(request)
@@ -1175,6 +1904,7 @@ async def get_my_pipeline(request: Request):
     }
 
 @api_router.get("/dashboard/executive")
+@cached_response("opportunities", "pipelines", "stages", "users")
 async def get_executive_dashboard(request: Request):
     """Executive dashboard data"""
     user = await get_current_user(request)
@@ -1242,36 +1972,133 @@ async def get_executive_dashboard(request: Request):
 
 # ============== AI COPILOT ENDPOINTS ==============
 
-@api_router.post("/ai/copilot")
-async def ai_copilot(data: AICopilotRequest, request: Request):
-    """AI-powered sales assistance"""
-    user = await get_current_user(request)
+COPILOT_SYSTEM_MESSAGE = "You are an expert sales advisor for a Tech, Data, and AI Consulting firm. You provide concise, actionable, executive-level guidance."
+
+async def load_copilot_context(opp_id: str) -> Optional[dict]:
+    """Fetch an opportunity with its org, contact, stage and most recent
+    activities in a single aggregation round trip"""
+    pipeline = [
+        {"$match": {"opp_id": opp_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "organizations", "localField": "org_id", "foreignField": "org_id", "as": "org",
+            "pipeline": [{"$project": {"_id": 0, "name": 1, "industry": 1, "company_size": 1, "region": 1, "strategic_tier": 1}}]
+        }},
+        {"$lookup": {
+            "from": "contacts", "localField": "primary_contact_id", "foreignField": "contact_id", "as": "contact",
+            "pipeline": [{"$project": {"_id": 0, "name": 1, "title": 1, "buying_role": 1}}]
+        }},
+        {"$lookup": {
+            "from": "stages", "localField": "stage_id", "foreignField": "stage_id", "as": "stage",
+            "pipeline": [{"$project": {"_id": 0, "name": 1, "order": 1, "win_probability": 1}}]
+        }},
+        {"$lookup": {
+            "from": "activities", "localField": "opp_id", "foreignField": "opp_id", "as": "activities",
+            "pipeline": [
+                {"$sort": {"due_date": -1, "activity_id": 1}},
+                {"$limit": COPILOT_CONTEXT_ACTIVITIES},
+                {"$project": {"_id": 0, "activity_type": 1, "title": 1, "status": 1, "due_date": 1, "notes": 1}}
+            ]
+        }},
+        {"$project": {"_id": 0}}
+    ]
+    docs = await db.opportunities.aggregate(pipeline).to_list(1)
+    if not docs:
+        return None
+    opp = docs[0]
+    for key in ("org", "contact", "stage"):
+        opp[key] = opp[key][0] if opp.get(key) else None
+    return opp
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return (len(text) + 3) // 4
+
+def build_copilot_context(opp: dict, extra_context: Optional[str] = None, token_budget: int = COPILOT_CONTEXT_TOKENS) -> str:
+    """Pack the most useful opportunity facts into a token budget.
+    
+    Sections are added in priority order; the first one that does not fit is
+    cut at the remaining budget and everything after it is dropped, so the
+    same input always yields the same context.
+    """
+    org = opp.get("org") or {}
+    contact = opp.get("contact") or {}
+    stage = opp.get("stage") or {}
+    now = datetime.now(timezone.utc)
     
-    # Get opportunity data
-    opp = await db.opportunities.find_one({"opp_id": data.opp_id}, {"_id": 0})
+    facts = [
+        f"Opportunity: {opp.get('name')}",
+        f"Organization: {org.get('name', 'Unknown')}",
+        f"Engagement Type: {opp.get('engagement_type')}",
+        f"Estimated Value: ${opp.get('estimated_value', 0) or 0:,.0f}",
+        f"Confidence: {opp.get('confidence_level', 0)}%",
+    ]
+    if stage:
+        stage_line = f"Stage: {stage.get('name')} (step {stage.get('order')}, {stage.get('win_probability', 0)}% typical win rate)"
+        if opp.get("stage_entered_at"):
+            stage_line += f", in stage {(now - parse_datetime(opp['stage_entered_at'])).days} days"
+        facts.append(stage_line)
+    if opp.get("target_close_date"):
+        facts.append(f"Target Close: {parse_datetime(opp['target_close_date']).date().isoformat()}")
+    if opp.get("is_at_risk"):
+        facts.append(f"At Risk: yes{' - ' + opp['at_risk_reason'] if opp.get('at_risk_reason') else ''}")
+    
+    sections = ["\n".join(facts)]
+    if extra_context:
+        sections.append(f"Additional Context: {extra_context}")
+    if opp.get("value_hypothesis"):
+        sections.append(f"Value Hypothesis: {opp['value_hypothesis']}")
+    if contact:
+        role = f", {contact['buying_role']}" if contact.get("buying_role") else ""
+        sections.append(f"Primary Contact: {contact.get('name')} ({contact.get('title') or 'no title'}{role})")
+    if opp.get("notes"):
+        sections.append(f"Notes: {opp['notes']}")
+    
+    activities = opp.get("activities") or []
+    if activities:
+        lines = ["Recent Activities (newest first):"]
+        for act in activities:
+            due = parse_datetime(act["due_date"]).date().isoformat() if act.get("due_date") else "no date"
+            line = f"- {due} {act.get('activity_type')} [{act.get('status')}]"
+            if act.get("title"):
+                line += f" {act['title']}"
+            if act.get("notes"):
+                line += f": {act['notes']}"
+            lines.append(line)
+        sections.append("\n".join(lines))
+    else:
+        sections.append("Recent Activities: none logged")
+    
+    if org:
+        profile = ", ".join(f"{label} {org[key]}" for key, label in (
+            ("industry", "industry"), ("company_size", "size"), ("region", "region"), ("strategic_tier", "tier")
+        ) if org.get(key))
+        if profile:
+            sections.append(f"Organization Profile: {profile}")
+    
+    packed = []
+    remaining = token_budget
+    for section in sections:
+        cost = estimate_tokens(section) + 1
+        if cost <= remaining:
+            packed.append(section)
+            remaining -= cost
+            continue
+        if remaining > 8:
+            cut = section[:(remaining - 2) * 4]
+            if "\n" in cut:
+                cut = cut[:cut.rindex("\n")]  # Keep whole lines (e.g. activities)
+            packed.append(cut.rstrip() + " …")
+        break
+    return "\n".join(packed)
+
+async def build_copilot_prompt(data: AICopilotRequest) -> str:
+    """Load the opportunity context and build the prompt for a copilot action"""
+    opp = await load_copilot_context(data.opp_id)
     if not opp:
         raise HTTPException(status_code=404, detail="Opportunity not found")
     
-    # Get related data
-    org = await db.organizations.find_one({"org_id": opp.get("org_id")}, {"_id": 0})
-    contact = None
-    if opp.get("primary_contact_id"):
-        contact = await db.contacts.find_one({"contact_id": opp["primary_contact_id"]}, {"_id": 0})
-    activities = await db.activities.find({"opp_id": data.opp_id}, {"_id": 0}).to_list(50)
-    
-    # Build context
-    context = f"""
-Opportunity: {opp.get('name')}
-Organization: {org.get('name') if org else 'Unknown'}
-Engagement Type: {opp.get('engagement_type')}
-Estimated Value: ${opp.get('estimated_value', 0):,.0f}
-Confidence: {opp.get('confidence_level', 0)}%
-Notes: {opp.get('notes', 'None')}
-Value Hypothesis: {opp.get('value_hypothesis', 'None')}
-Contact: {contact.get('name') if contact else 'None'} ({contact.get('title', '') if contact else ''})
-Recent Activities: {len(activities)} activities logged
-Additional Context: {data.context or 'None'}
-"""
+    context = build_copilot_context(opp, data.context)
     
     prompts = {
         "summarize": f"""You are an executive sales advisor. Provide a concise, professional summary of this opportunity for a busy executive. Focus on key facts, current status, and what matters most.
@@ -1307,58 +2134,955 @@ Keep it concise and compelling."""
     prompt = prompts.get(data.action)
     if not prompt:
         raise HTTPException(status_code=400, detail=f"Unknown action: {data.action}")
+    return prompt
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto one in-flight task.
+    
+    Callers await a shielded task, so one caller disconnecting does not cancel
+    the upstream call for the others.
+    """
+    
+    def __init__(self):
+        self._inflight = {}
+    
+    async def do(self, key: str, fn):
+        task = self._inflight.get(key)
+        if task is not None:
+            copilot_coalesced_total.inc()
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+class CopilotLimiter:
+    """Global bound on concurrent copilot LLM calls.
+    
+    Waits up to `queue_timeout` seconds for a slot; when the queue is full or
+    the wait times out the request is shed with 429.
+    """
+    
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self.active = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    def _shed(self):
+        copilot_shed_total.inc()
+        return HTTPException(
+            status_code=429,
+            detail="AI copilot is busy. Please retry shortly.",
+            headers={"Retry-After": str(max(1, int(self.queue_timeout)))}
+        )
+    
+    def check_admission(self):
+        """Shed immediately if the wait queue is already full"""
+        if self.waiting >= self.max_queue:
+            raise self._shed()
+    
+    @asynccontextmanager
+    async def slot(self):
+        self.check_admission()
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._shed()
+        finally:
+            self.waiting -= 1
+            copilot_queue_wait_seconds.observe(time.perf_counter() - started)
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+copilot_queue_wait_seconds = Histogram("copilot_queue_wait_seconds", "Time copilot calls wait for a concurrency slot")
+copilot_upstream_seconds = Histogram("copilot_upstream_seconds", "Copilot LLM upstream latency")
+copilot_coalesced_total = Counter("copilot_coalesced_total", "Copilot calls served by an identical in-flight call")
+copilot_shed_total = Counter("copilot_shed_total", "Copilot calls rejected with 429")
+copilot_flight = SingleFlight()
+copilot_limiter = CopilotLimiter(COPILOT_MAX_CONCURRENCY, COPILOT_MAX_QUEUE, COPILOT_QUEUE_TIMEOUT)
+
+# Batch jobs wait for their own slots, so a long job never takes capacity from interactive requests
+copilot_batch_slots = asyncio.Semaphore(max(1, COPILOT_BATCH_CONCURRENCY))
+
+async def run_copilot_completion(prompt: str, session_id: str, batch: bool = False) -> str:
+    """Call the LLM inside a limiter slot (a batch slot for jobs), recording upstream latency"""
+    async with copilot_batch_slots if batch else copilot_limiter.slot():
+        started = time.perf_counter()
+        try:
+            with span("llm complete", "client", **{"llm.provider": type(llm_provider).__name__}):
+                return await llm_provider.complete(prompt, system_message=COPILOT_SYSTEM_MESSAGE, session_id=session_id)
+        finally:
+            copilot_upstream_seconds.observe(time.perf_counter() - started)
+
+async def save_copilot_result(opp_id: str, action: str, result: str, job_id: Optional[str] = None, user_id: Optional[str] = None):
+    """Store the latest copilot result for an opportunity/action pair"""
+    await db.copilot_results.update_one(
+        {"opp_id": opp_id, "action": action},
+        {"$set": {
+            "opp_id": opp_id,
+            "action": action,
+            "result": result,
+            "job_id": job_id,
+            "created_by": user_id,
+            "provider": llm_provider.name,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }},
+        upsert=True
+    )
+
+def copilot_http_error(exc: Exception) -> HTTPException:
+    """Map a provider failure to the HTTP error returned by copilot endpoints"""
+    if isinstance(exc, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail="AI service temporarily unavailable",
+            headers={"Retry-After": str(int(llm_provider.breaker.reset_timeout))}
+        )
+    if isinstance(exc, LLMTimeoutError):
+        logger.warning(f"AI Copilot timeout: {exc}")
+        return HTTPException(status_code=504, detail="AI service timed out")
+    logger.error(f"AI Copilot error: {exc}")
+    return HTTPException(status_code=500, detail="AI service temporarily unavailable")
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@api_router.post("/ai/copilot")
+async def ai_copilot(data: AICopilotRequest, request: Request):
+    """AI-powered sales assistance"""
+    user = await get_current_user(request)
+    prompt = await build_copilot_prompt(data)
+    
+    # Identical prompts (same action, opportunity state and context) share one upstream call
+    key = hashlib.sha256(f"{data.action}\0{prompt}".encode()).hexdigest()
+    session_id = f"copilot_{user['user_id']}_{data.opp_id}"
     
     try:
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"copilot_{user['user_id']}_{data.opp_id}",
-            system_message="You are an expert sales advisor for a Tech, Data, and AI Consulting firm. You provide concise, actionable, executive-level guidance."
-        ).with_model("openai", "gpt-5.2")
+        async def complete_and_store():
+            result = await run_copilot_completion(prompt, session_id)
+            await save_copilot_result(data.opp_id, data.action, result, user_id=user["user_id"])
+            return result
         
-        response = await chat.send_message(UserMessage(text=prompt))
+        response = await copilot_flight.do(key, complete_and_store)
         
         return {
             "action": data.action,
             "opp_id": data.opp_id,
             "result": response
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"AI Copilot error: {e}")
-        raise HTTPException(status_code=500, detail="AI service temporarily unavailable")
+        raise copilot_http_error(e)
 
-# ============== SEED DATA ENDPOINT ==============
+@api_router.post("/ai/copilot/stream")
+async def ai_copilot_stream(data: AICopilotRequest, request: Request):
+    """AI copilot with tokens streamed as server-sent events.
+    
+    Events: `token` ({text}) per chunk, then `done` ({ttft_ms, total_ms, tokens})
+    or `error` ({detail, status}). If the client disconnects, the response task
+    is cancelled and the upstream generation is closed. The stream holds a
+    copilot limiter slot; ttft_ms includes any time spent queued for it.
+    Providers that can't stream (see `streams_tokens` in /ai/copilot/metrics)
+    send the whole reply as one token event.
+    """
+    user = await get_current_user(request)
+    prompt = await build_copilot_prompt(data)
+    session_id = f"copilot_{user['user_id']}_{data.opp_id}"
+    copilot_limiter.check_admission()
+    
+    async def event_stream():
+        started = time.perf_counter()
+        ttft_ms = None
+        tokens = 0
+        chunks = []
+        try:
+            async with copilot_limiter.slot():
+                upstream_started = time.perf_counter()
+                upstream = llm_provider.stream(prompt, system_message=COPILOT_SYSTEM_MESSAGE, session_id=session_id)
+                with span("llm stream", "client", **{"llm.provider": type(llm_provider).__name__}) as llm_span:
+                    try:
+                        async for token in upstream:
+                            if ttft_ms is None:
+                                ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                            tokens += 1
+                            chunks.append(token)
+                            yield sse_event("token", {"text": token})
+                    finally:
+                        await upstream.aclose()
+                        copilot_upstream_seconds.observe(time.perf_counter() - upstream_started)
+                        if llm_span is not None:
+                            llm_span.attributes.update({"llm.ttft_ms": ttft_ms, "llm.tokens": tokens})
+            await save_copilot_result(data.opp_id, data.action, "".join(chunks), user_id=user["user_id"])
+            total_ms = round((time.perf_counter() - started) * 1000, 1)
+            logger.info(f"AI Copilot stream {data.action} {data.opp_id}: ttft={ttft_ms}ms total={total_ms}ms tokens={tokens}")
+            yield sse_event("done", {"action": data.action, "opp_id": data.opp_id, "ttft_ms": ttft_ms, "total_ms": total_ms, "tokens": tokens})
+        except asyncio.CancelledError:
+            logger.info(f"AI Copilot stream {data.action} {data.opp_id} cancelled by client after {tokens} tokens")
+            raise
+        except HTTPException as e:
+            yield sse_event("error", {"detail": e.detail, "status": e.status_code})
+        except Exception as e:
+            error = copilot_http_error(e)
+            yield sse_event("error", {"detail": error.detail, "status": error.status_code})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-@api_router.api_route("/seed", methods=["GET", "POST"])
-async def seed_data(request: Request):
-    """Seed sample data for demo - call this after setup-admin"""
-    # Get current user if authenticated
-    try:
-        user = await get_current_user(request)
-        default_owner = user["user_id"]
-    except Exception:
-        # Fallback to first admin user
-        first_user = await db.users.find_one(
-            {"role": "admin"}, 
-            {"_id": 0}
+@api_router.get("/ai/copilot/metrics")
+async def ai_copilot_metrics(request: Request):
+    """Copilot concurrency state and latency histograms"""
+    user = await get_current_user(request)
+    return {
+        "max_concurrency": copilot_limiter.max_concurrency,
+        "max_queue": copilot_limiter.max_queue,
+        "queue_timeout": copilot_limiter.queue_timeout,
+        "active": copilot_limiter.active,
+        "waiting": copilot_limiter.waiting,
+        "coalesced_total": copilot_coalesced_total.value,
+        "shed_total": copilot_shed_total.value,
+        "queue_wait_seconds": copilot_queue_wait_seconds.snapshot(),
+        "upstream_seconds": copilot_upstream_seconds.snapshot(),
+        "provider": llm_provider.stats()
+    }
+
+# ============== AI COPILOT BATCH JOBS ==============
+
+COPILOT_ACTIONS = ("summarize", "suggest_activity", "draft_email", "value_hypothesis")
+
+class RateLimiter:
+    """Space calls evenly at `rate` per second across concurrent workers"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# Job tasks running in this process by job_id; other instances cancel them through cancel_requested
+copilot_job_tasks = {}
+
+def copilot_job_stale_before() -> str:
+    """Running jobs whose heartbeat_at is older than this lost their instance"""
+    return (datetime.now(timezone.utc) - timedelta(seconds=4 * COPILOT_JOB_HEARTBEAT_SECONDS)).isoformat()
+
+def build_copilot_job_query(job_filter: CopilotJobFilter) -> dict:
+    """Translate a job filter into an opportunities query"""
+    query = {}
+    if job_filter.pipeline_id:
+        query["pipeline_id"] = job_filter.pipeline_id
+    if job_filter.owner_id:
+        query["owner_id"] = job_filter.owner_id
+    if job_filter.is_at_risk is not None:
+        query["is_at_risk"] = job_filter.is_at_risk
+    if job_filter.stage_ids:
+        query["stage_id"] = {"$in": job_filter.stage_ids}
+    elif job_filter.open_only:
+        query["stage_id"] = {"$not": re.compile("won|lost", re.IGNORECASE)}
+    return query
+
+async def interrupt_orphaned_copilot_jobs() -> int:
+    """Mark jobs whose heartbeat stopped (their process died) as interrupted; returns how many"""
+    result = await db.copilot_jobs.update_many(
+        {"status": {"$in": ["queued", "running"]},
+         "$or": [{"heartbeat_at": {"$lt": copilot_job_stale_before()}}, {"heartbeat_at": {"$exists": False}}]},
+        {"$set": {"status": "interrupted", "finished_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    return result.modified_count
+
+async def run_copilot_job(job_id: str, action: str, opp_ids: List[str]):
+    """Run a copilot action over many opportunities with bounded parallelism,
+    a shared rate limit and per-opportunity retries.
+    
+    A heartbeat keeps heartbeat_at fresh so other instances leave the job
+    alone, and stops the job when cancel_requested is set on it.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    await db.copilot_jobs.update_one(
+        {"job_id": job_id},
+        {"$set": {"status": "running", "started_at": now, "heartbeat_at": now}}
+    )
+    queue = asyncio.Queue()
+    for opp_id in opp_ids:
+        queue.put_nowait(opp_id)
+    rate_limiter = RateLimiter(COPILOT_BATCH_RATE)
+    
+    async def process(opp_id: str):
+        error = None
+        for attempt in range(COPILOT_BATCH_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(min(2 ** attempt, 30))
+            try:
+                prompt = await build_copilot_prompt(AICopilotRequest(action=action, opp_id=opp_id))
+                await rate_limiter.wait()
+                result = await run_copilot_completion(prompt, f"copilot_job_{job_id}_{opp_id}", batch=True)
+                await save_copilot_result(opp_id, action, result, job_id=job_id)
+                await db.copilot_jobs.update_one({"job_id": job_id}, {"$inc": {"completed": 1}})
+                return
+            except HTTPException as e:
+                error = e.detail
+                if e.status_code != 429:
+                    break  # Opportunity gone or bad action - retrying won't help
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        await db.copilot_jobs.update_one(
+            {"job_id": job_id},
+            {"$inc": {"failed": 1}, "$push": {"errors": {"$each": [{"opp_id": opp_id, "error": error}], "$slice": -100}}}
         )
-        default_owner = first_user["user_id"] if first_user else "system"
     
-    # Check if already seeded
-    existing = await db.pipelines.find_one({}, {"_id": 0})
-    if existing:
-        return {"message": "Data already seeded"}
+    async def worker():
+        while not queue.empty():
+            await process(queue.get_nowait())
+    
+    async def heartbeat(workers: asyncio.Future):
+        while True:
+            await asyncio.sleep(COPILOT_JOB_HEARTBEAT_SECONDS)
+            try:
+                job = await db.copilot_jobs.find_one_and_update(
+                    {"job_id": job_id},
+                    {"$set": {"heartbeat_at": datetime.now(timezone.utc).isoformat()}},
+                    projection={"_id": 0, "cancel_requested": 1}
+                )
+            except Exception as e:
+                logger.warning(f"Copilot job {job_id} heartbeat failed: {e}")
+                continue
+            if not job or job.get("cancel_requested"):
+                workers.cancel()
+                return
+    
+    workers = asyncio.gather(*(worker() for _ in range(max(1, COPILOT_BATCH_CONCURRENCY))))
+    beat = asyncio.create_task(heartbeat(workers))
+    try:
+        await workers
+        status = "completed"
+    except asyncio.CancelledError:
+        status = "cancelled"
+    except Exception as e:
+        logger.error(f"Copilot job {job_id} failed: {e}", exc_info=True)
+        status = "failed"
+    finally:
+        beat.cancel()
+        copilot_job_tasks.pop(job_id, None)
+    await db.copilot_jobs.update_one(
+        {"job_id": job_id},
+        {"$set": {"status": status, "finished_at": datetime.now(timezone.utc).isoformat()}}
+    )
+
+@api_router.post("/ai/copilot/jobs")
+async def create_copilot_job(data: CopilotJobCreate, request: Request):
+    """Start a batch copilot run over all opportunities matching a filter (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if data.action not in COPILOT_ACTIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown action: {data.action}")
+    
+    query = build_copilot_job_query(data.filter)
+    opp_ids = [o["opp_id"] async for o in db.opportunities.find(query, {"_id": 0, "opp_id": 1})]
+    
+    job = {
+        "job_id": f"job_{uuid.uuid4().hex[:12]}",
+        "action": data.action,
+        "filter": data.filter.model_dump(),
+        "status": "queued",
+        "total": len(opp_ids),
+        "completed": 0,
+        "failed": 0,
+        "errors": [],
+        "created_by": user["user_id"],
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "started_at": None,
+        "finished_at": None,
+        "instance_id": BOOT_ID,
+        "heartbeat_at": datetime.now(timezone.utc).isoformat(),
+        "cancel_requested": False
+    }
+    await db.copilot_jobs.insert_one(job)
+    job.pop("_id", None)
+    
+    copilot_job_tasks[job["job_id"]] = asyncio.create_task(run_copilot_job(job["job_id"], data.action, opp_ids))
+    return job
+
+@api_router.get("/ai/copilot/jobs")
+async def get_copilot_jobs(request: Request):
+    """Recent copilot batch jobs"""
+    user = await get_current_user(request)
+    jobs = await db.copilot_jobs.find({}, {"_id": 0, "errors": 0}).sort("created_at", -1).to_list(50)
+    return jobs
+
+@api_router.get("/ai/copilot/jobs/{job_id}")
+async def get_copilot_job(job_id: str, request: Request):
+    """Copilot batch job progress"""
+    user = await get_current_user(request)
+    job = await db.copilot_jobs.find_one({"job_id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@api_router.post("/ai/copilot/jobs/{job_id}/cancel")
+async def cancel_copilot_job(job_id: str, request: Request):
+    """Cancel a running copilot batch job (admin only).
+    
+    A job running on another instance stops at its next heartbeat.
+    """
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    result = await db.copilot_jobs.update_one(
+        {"job_id": job_id, "status": {"$in": ["queued", "running"]}, "heartbeat_at": {"$gte": copilot_job_stale_before()}},
+        {"$set": {"cancel_requested": True}}
+    )
+    if not result.matched_count:
+        raise HTTPException(status_code=404, detail="Job not running")
+    task = copilot_job_tasks.get(job_id)
+    if task:
+        task.cancel()
+    return {"message": "Cancelling", "job_id": job_id}
+
+@api_router.get("/ai/copilot/results/{opp_id}")
+async def get_copilot_results(opp_id: str, request: Request, action: Optional[str] = None):
+    """Latest stored copilot results for an opportunity, one per action"""
+    user = await get_current_user(request)
+    query = {"opp_id": opp_id}
+    if action:
+        query["action"] = action
+    results = await db.copilot_results.find(query, {"_id": 0}).sort("created_at", -1).to_list(len(COPILOT_ACTIONS))
+    return results
+
+# ============== BULK IMPORT ==============
+
+IMPORT_ENTITIES = {
+    "organizations": (OrganizationBase, "org_id"),
+    "contacts": (ContactBase, "contact_id"),
+    "opportunities": (OpportunityBase, "opp_id"),
+}
+
+def csv_ends_in_quotes(line: str, in_quotes: bool = False) -> bool:
+    """Whether a CSV record is still inside a quoted field (a newline in the
+    value) after `line`. As in the csv module, a quote only opens a quoted
+    field at the start of a field; elsewhere it's a literal character."""
+    if '"' not in line:
+        return in_quotes
+    field_start = not in_quotes
+    after_quote = False
+    for c in line:
+        if in_quotes:
+            if c == '"':
+                in_quotes, after_quote = False, True
+            continue
+        if c == '"' and (field_start or after_quote):
+            in_quotes = True  # opening quote, or the second half of an escaped ""
+        field_start = c == ","
+        after_quote = False
+    return in_quotes
+
+async def iter_import_rows(chunks, fmt: str):
+    """Stream-parse CSV (with header row) or NDJSON from an async iterator of
+    byte chunks. Yields, per incoming chunk, a list of (row_number, row) where
+    row is a dict or an error message string."""
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    pending = ""  # CSV record continued across lines (newline inside quotes)
+    header = None
+    row_number = 0
+    
+    def parse(lines):
+        nonlocal pending, header, row_number
+        rows = []
+        if fmt == "ndjson":
+            for line in lines:
+                if not line.strip():
+                    continue
+                row_number += 1
+                try:
+                    row = json.loads(line)
+                    rows.append((row_number, row if isinstance(row, dict) else "Row must be a JSON object"))
+                except ValueError as e:
+                    rows.append((row_number, f"Invalid JSON: {e}"))
+            return rows
+        records = []
+        for line in lines:
+            if csv_ends_in_quotes(line, bool(pending)):
+                pending += line + "\n"
+                if len(pending) > csv.field_size_limit():
+                    # A stray opening quote; don't buffer the rest of the file behind it
+                    read_records(records, rows)
+                    records = []
+                    row_number += 1
+                    rows.append((row_number, "Unterminated quoted field"))
+                    pending = ""
+                continue
+            records.append(pending + line + "\n")
+            pending = ""
+        read_records(records, rows)
+        return rows
+    
+    def read_records(records, rows):
+        nonlocal header, row_number
+        reader = csv.reader(records)
+        while True:
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                row_number += 1
+                rows.append((row_number, f"Invalid CSV: {e}"))
+                continue
+            if not any(values):
+                continue
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+            row_number += 1
+            if len(values) != len(header):
+                rows.append((row_number, f"Expected {len(header)} columns, got {len(values)}"))
+            else:
+                rows.append((row_number, dict(zip(header, values))))
+    
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        rows = parse(lines)
+        if rows:
+            yield rows
+    rows = parse([tail + decoder.decode(b"", final=True)])
+    if pending.strip():
+        # The quoted field never closed; report it instead of dropping it
+        row_number += 1
+        rows.append((row_number, "Unterminated quoted field"))
+    if rows:
+        yield rows
+
+class BulkImporter:
+    """Validate rows against the entity's Pydantic model and write them with
+    unordered insert_many batches, collecting a per-row error report.
+    
+    Rows may reference organizations by `org_name` (or `organization`),
+    owners by `owner_email` and opportunity stages by `stage` name instead
+    of ids. Opportunities default to the first stage of the default pipeline.
+    """
+    
+    def __init__(self, entity: str, default_owner: str, dry_run: bool = False):
+        if entity not in IMPORT_ENTITIES:
+            raise HTTPException(status_code=404, detail=f"Cannot import {entity}")
+        self.entity = entity
+        self.model, self.id_field = IMPORT_ENTITIES[entity]
+        self.collection = db[entity]
+        self.default_owner = default_owner
+        self.dry_run = dry_run
+        self.org_ids_by_name = {}
+        self.user_ids_by_email = {}
+        self.stage_ids_by_name = {}
+        self.first_stage_ids = {}
+        self.default_pipeline_id = None
+        self.total = 0
+        self.inserted = 0
+        self.errors = []
+        self.failed = 0
+    
+    async def load_lookups(self):
+        """Load the small reference maps once, instead of a query per row"""
+        async for u in db.users.find({}, {"_id": 0, "user_id": 1, "email": 1}):
+            self.user_ids_by_email[u["email"].lower()] = u["user_id"]
+        if self.entity != "organizations":
+            async for o in db.organizations.find({}, {"_id": 0, "org_id": 1, "name": 1}):
+                self.org_ids_by_name.setdefault(o["name"].strip().lower(), o["org_id"])
+        if self.entity == "opportunities":
+            pipelines = await db.pipelines.find({}, {"_id": 0}).to_list(10)
+            default_pipeline = next((p for p in pipelines if p.get("is_default")), pipelines[0] if pipelines else None)
+            self.default_pipeline_id = default_pipeline["pipeline_id"] if default_pipeline else None
+            async for st in db.stages.find({}, {"_id": 0, "stage_id": 1, "name": 1, "pipeline_id": 1}).sort("order", 1):
+                self.stage_ids_by_name.setdefault((st["pipeline_id"], st["name"].strip().lower()), st["stage_id"])
+                self.first_stage_ids.setdefault(st["pipeline_id"], st["stage_id"])
+    
+    def prepare(self, row: dict) -> dict:
+        """Turn one raw row into a document ready for insert (raises ValueError)"""
+        row = {k.strip(): v.strip() if isinstance(v, str) else v for k, v in row.items() if k and k.strip()}
+        row = {k: v for k, v in row.items() if v not in ("", None)}
+        
+        owner_email = row.pop("owner_email", None)
+        if owner_email:
+            owner_id = self.user_ids_by_email.get(owner_email.lower())
+            if not owner_id:
+                raise ValueError(f"Unknown owner_email: {owner_email}")
+            row["owner_id"] = owner_id
+        row.setdefault("owner_id", self.default_owner)
+        if self.entity != "opportunities":
+            row.setdefault("created_by", self.default_owner)
+        
+        org_name = row.pop("org_name", None) or row.pop("organization", None)
+        if self.entity != "organizations" and "org_id" not in row and org_name:
+            org_id = self.org_ids_by_name.get(org_name.lower())
+            if not org_id:
+                raise ValueError(f"Unknown organization: {org_name}")
+            row["org_id"] = org_id
+        
+        if self.entity == "opportunities":
+            row.setdefault("pipeline_id", self.default_pipeline_id)
+            stage_name = row.pop("stage", None)
+            if "stage_id" not in row and stage_name:
+                stage_id = self.stage_ids_by_name.get((row["pipeline_id"], stage_name.lower()))
+                if not stage_id:
+                    raise ValueError(f"Unknown stage: {stage_name}")
+                row["stage_id"] = stage_id
+            if "stage_id" not in row and row["pipeline_id"] in self.first_stage_ids:
+                row["stage_id"] = self.first_stage_ids[row["pipeline_id"]]
+        
+        try:
+            doc = self.model(**row).model_dump()
+        except ValidationError as e:
+            raise ValueError("; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()))
+        for key, value in doc.items():
+            if isinstance(value, datetime):
+                doc[key] = parse_datetime(value).isoformat()
+        return doc
+    
+    def record_error(self, row_number: int, message: str):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+    
+    async def write(self, docs: List[dict], row_numbers: List[int]):
+        if self.dry_run or not docs:
+            self.inserted += len(docs)
+            return
+        # An imported updated_at (e.g. from an export) would sort behind existing sync cursors
+        written_at = datetime.now(timezone.utc).isoformat()
+        for doc in docs:
+            doc["updated_at"] = written_at
+        try:
+            result = await self.collection.insert_many(docs, ordered=False)
+            self.inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            self.inserted += len(docs) - len(write_errors)
+            for err in write_errors:
+                self.record_error(row_numbers[err["index"]], err.get("errmsg", "Write failed"))
+    
+    async def run(self, chunks, fmt: str) -> dict:
+        started = time.perf_counter()
+        await self.load_lookups()
+        docs, row_numbers = [], []
+        pending_write = None
+        
+        async def flush():
+            nonlocal docs, row_numbers, pending_write
+            # Keep one insert in flight while the next chunk is validated
+            if pending_write:
+                await pending_write
+            pending_write = asyncio.ensure_future(self.write(docs, row_numbers))
+            docs, row_numbers = [], []
+        
+        try:
+            async for rows in iter_import_rows(chunks, fmt):
+                for row_number, row in rows:
+                    self.total += 1
+                    if isinstance(row, str):
+                        self.record_error(row_number, row)
+                        continue
+                    try:
+                        doc = self.prepare(row)
+                    except ValueError as e:
+                        self.record_error(row_number, str(e))
+                        continue
+                    docs.append(doc)
+                    row_numbers.append(row_number)
+                if len(docs) >= IMPORT_CHUNK_SIZE:
+                    await flush()
+            await flush()
+            await pending_write
+        finally:
+            if pending_write and not pending_write.done():
+                pending_write.cancel()
+        if self.inserted and not self.dry_run:
+            await record_changes(change_event(self.entity, "invalidate"))
+        
+        elapsed = time.perf_counter() - started
+        return {
+            "entity": self.entity,
+            "dry_run": self.dry_run,
+            "total_rows": self.total,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.total / elapsed, 1) if elapsed else None
+        }
+
+@api_router.post("/import/{entity}")
+async def bulk_import(entity: str, request: Request, fmt: str = Query("csv", alias="format"), dry_run: bool = False):
+    """Stream-import organizations, contacts or opportunities from a CSV or
+    NDJSON request body (admin only). Returns a per-row error report."""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    importer = BulkImporter(entity, default_owner=user["user_id"], dry_run=dry_run)
+    return await importer.run(request.stream(), fmt)
+
+# ============== EXPORT ==============
+
+# Exportable collections: columns (model field order) and allowed filter fields
+EXPORT_COLLECTIONS = {
+    "organizations": {
+        "columns": [f for f in OrganizationBase.model_fields if f != "latest_note"],
+        "filters": ["owner_id", "industry", "region", "strategic_tier"],
+    },
+    "contacts": {
+        "columns": list(ContactBase.model_fields),
+        "filters": ["owner_id", "org_id", "function", "buying_role"],
+    },
+    "opportunities": {
+        "columns": list(OpportunityBase.model_fields),
+        "filters": ["owner_id", "org_id", "pipeline_id", "stage_id", "engagement_type", "source", "is_at_risk"],
+    },
+    "activities": {
+        "columns": list(ActivityBase.model_fields),
+        "filters": ["owner_id", "org_id", "opp_id", "activity_type", "status"],
+    },
+}
+
+# Resolved-name columns: (id field, lookup map, output column)
+EXPORT_NAME_COLUMNS = [
+    ("owner_id", "users", "owner_name"),
+    ("org_id", "organizations", "org_name"),
+    ("stage_id", "stages", "stage_name"),
+]
+
+lookup_cache_requests = Family(Counter, "export_lookup_cache_requests_total", "Export name-lookup cache requests", ["result"])
+
+class LookupCache:
+    """id -> name maps for users, organizations and stages, refreshed after a TTL"""
+    
+    SOURCES = {
+        "users": ("user_id", "name"),
+        "organizations": ("org_id", "name"),
+        "stages": ("stage_id", "name"),
+    }
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._maps = {}
+        self._loaded_at = {}
+    
+    async def get(self, source: str) -> dict:
+        now = time.monotonic()
+        if source in self._maps and now - self._loaded_at[source] <= self.ttl:
+            lookup_cache_requests.labels("hit").inc()
+        else:
+            lookup_cache_requests.labels("miss").inc()
+            id_field, name_field = self.SOURCES[source]
+            self._maps[source] = {
+                d[id_field]: d.get(name_field)
+                async for d in db[source].find({}, {"_id": 0, id_field: 1, name_field: 1})
+            }
+            self._loaded_at[source] = now
+        return self._maps[source]
+
+export_lookups = LookupCache(EXPORT_LOOKUP_TTL)
+
+# Leading characters spreadsheets read as a formula; such cells are prefixed with '
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def export_cell(value):
+    """Flatten a document value into a CSV/XLSX cell"""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, default=str)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+async def iter_export_rows(collection: str, query: dict, resolve_names: bool):
+    """Yield export documents from a Mongo cursor, batch by batch, with
+    resolved names added from cached lookup maps"""
+    name_maps = []
+    if resolve_names:
+        columns = EXPORT_COLLECTIONS[collection]["columns"]
+        for id_field, source, out_field in EXPORT_NAME_COLUMNS:
+            if id_field in columns and source != collection:
+                name_maps.append((id_field, out_field, await export_lookups.get(source)))
+    cursor = db[collection].find(query, {"_id": 0, "latest_note": 0}).batch_size(EXPORT_BATCH_SIZE)
+    async for doc in cursor:
+        for id_field, out_field, names in name_maps:
+            doc[out_field] = names.get(doc.get(id_field))
+        yield doc
+
+def export_columns(collection: str, resolve_names: bool) -> List[str]:
+    columns = list(EXPORT_COLLECTIONS[collection]["columns"])
+    if resolve_names:
+        columns += [out for id_field, source, out in EXPORT_NAME_COLUMNS if id_field in columns and source != collection]
+    return columns
+
+async def stream_csv(rows, columns: List[str], buffer_bytes: int = 64 * 1024):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for doc in rows:
+        writer.writerow([export_cell(doc.get(c)) for c in columns])
+        if buffer.tell() >= buffer_bytes:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+async def stream_ndjson(rows, buffer_bytes: int = 64 * 1024):
+    parts = []
+    size = 0
+    async for doc in rows:
+        line = json.dumps(doc, default=str)
+        parts.append(line)
+        size += len(line) + 1
+        if size >= buffer_bytes:
+            yield ("\n".join(parts) + "\n").encode("utf-8")
+            parts, size = [], 0
+    if parts:
+        yield ("\n".join(parts) + "\n").encode("utf-8")
+
+async def build_xlsx(rows, columns: List[str], sheet_name: str) -> str:
+    """Write rows to a write-only workbook in a temp file, returning its path.
+    openpyxl work runs in a thread, one batch at a time."""
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    
+    def xlsx_cell(value):
+        # Control characters aren't allowed in XLSX and make openpyxl raise
+        value = export_cell(value)
+        return ILLEGAL_CHARACTERS_RE.sub("", value) if isinstance(value, str) else value
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(columns)
+    
+    def append_batch(batch):
+        for row in batch:
+            sheet.append(row)
+    
+    batch = []
+    async for doc in rows:
+        batch.append([xlsx_cell(doc.get(c)) for c in columns])
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            await asyncio.to_thread(append_batch, batch)
+            batch = []
+    if batch:
+        await asyncio.to_thread(append_batch, batch)
+    
+    handle, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(handle)
+    try:
+        await asyncio.to_thread(workbook.save, path)
+    except BaseException:
+        remove_file(path)
+        raise
+    return path
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+async def stream_file(path: str, chunk_bytes: int = 256 * 1024):
+    """Stream a file and delete it afterwards"""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, chunk_bytes)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        remove_file(path)
+
+@api_router.get("/export/{collection}")
+async def export_collection(
+    collection: str,
+    request: Request,
+    fmt: str = Query("csv", alias="format"),
+    resolve_names: bool = True
+):
+    """Stream a full collection export as CSV, NDJSON or XLSX.
+    
+    Any allowed filter field can be passed as a query parameter (e.g.
+    ?owner_id=...&stage_id=...). Rows are read from a cursor and written
+    batch by batch, so memory stays flat regardless of result size.
+    """
+    user = await get_current_user(request)
+    if collection not in EXPORT_COLLECTIONS:
+        raise HTTPException(status_code=404, detail=f"Cannot export {collection}")
+    if fmt not in ("csv", "ndjson", "xlsx"):
+        raise HTTPException(status_code=400, detail="format must be 'csv', 'ndjson' or 'xlsx'")
+    
+    query = {}
+    for field in EXPORT_COLLECTIONS[collection]["filters"]:
+        value = request.query_params.get(field)
+        if value is not None:
+            query[field] = value.lower() == "true" if field == "is_at_risk" else value
+    
+    columns = export_columns(collection, resolve_names)
+    rows = iter_export_rows(collection, query, resolve_names)
+    filename = f"{collection}-{datetime.now(timezone.utc).strftime('%Y%m%d')}.{fmt}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    
+    if fmt == "csv":
+        return StreamingResponse(stream_csv(rows, columns), media_type="text/csv", headers=headers)
+    if fmt == "ndjson":
+        return StreamingResponse(stream_ndjson(rows), media_type="application/x-ndjson", headers=headers)
+    
+    # XLSX needs the zip directory at the end, so the workbook is built on disk first
+    if await db[collection].count_documents(query) >= 1048575:
+        raise HTTPException(status_code=400, detail="Too many rows for XLSX; use csv or ndjson")
+    path = await build_xlsx(rows, columns, collection)
+    # The background task also removes the file when the client leaves before streaming starts
+    return StreamingResponse(
+        stream_file(path),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers=headers,
+        background=BackgroundTask(remove_file, path)
+    )
+
+# ============== SEED DATA ENDPOINT ==============
+
+async def ensure_default_pipeline():
+    """Create the default consulting pipeline and its stages if none exist"""
+    if await db.pipelines.find_one({}, {"_id": 0, "pipeline_id": 1}):
+        return
     
-    # Create default pipeline
-    pipeline = {
+    now = datetime.now(timezone.utc).isoformat()
+    await db.pipelines.insert_one({
         "pipeline_id": "pipe_default",
         "name": "Consulting Sales Pipeline",
         "description": "Default sales pipeline for consulting engagements",
         "is_default": True,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.pipelines.insert_one(pipeline)
+        "created_at": now
+    })
     
-    # Create stages
     stages_data = [
         {"name": "Initial Conversation", "order": 1, "win_probability": 10, "auto_activity": None},
         {"name": "Discovery / Problem Framing", "order": 2, "win_probability": 20, "auto_activity": "Schedule discovery session"},
@@ -1369,18 +3093,40 @@ async def seed_data(request: Request):
         {"name": "Closed – Won", "order": 7, "win_probability": 100, "auto_activity": None},
         {"name": "Closed – Lost", "order": 8, "win_probability": 0, "auto_activity": None},
     ]
-    
-    for s in stages_data:
-        stage = {
+    await db.stages.insert_many([
+        {
             "stage_id": f"stage_{s['name'].lower().replace(' ', '_').replace('/', '_').replace('–', '')}",
             "pipeline_id": "pipe_default",
             "name": s["name"],
             "order": s["order"],
             "win_probability": s["win_probability"],
             "auto_activity": s["auto_activity"],
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": now
         }
-        await db.stages.insert_one(stage)
+        for s in stages_data
+    ])
+
+@api_router.api_route("/seed", methods=["GET", "POST"])
+async def seed_data(request: Request):
+    """Seed sample data for demo - call this after setup-admin"""
+    # Get current user if authenticated
+    try:
+        user = await get_current_user(request)
+        default_owner = user["user_id"]
+    except Exception:
+        # Fallback to first admin user
+        first_user = await db.users.find_one(
+            {"role": "admin"}, 
+            {"_id": 0}
+        )
+        default_owner = first_user["user_id"] if first_user else "system"
+    
+    # Check if already seeded
+    existing = await db.pipelines.find_one({}, {"_id": 0})
+    if existing:
+        return {"message": "Data already seeded"}
+    
+    await ensure_default_pipeline()
     
     # Create sample organizations
     orgs_data = [
@@ -1391,8 +3137,9 @@ async def seed_data(request: Request):
         {"org_id": "org_wayne", "name": "Wayne Enterprises", "industry": "Technology", "company_size": "Enterprise", "region": "North America", "strategic_tier": "Active"},
     ]
     
+    organizations = []
     for org_data in orgs_data:
-        org = {
+        organizations.append({
             **org_data,
             "primary_exec_sponsor": None,
             "notes": None,
@@ -1400,8 +3147,8 @@ async def seed_data(request: Request):
             "created_by": default_owner,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }
-        await db.organizations.insert_one(org)
+        })
+    await db.organizations.insert_many(organizations)
     
     # Create sample contacts
     contacts_data = [
@@ -1412,8 +3159,9 @@ async def seed_data(request: Request):
         {"contact_id": "contact_5", "name": "Lisa Kumar", "title": "Head of Digital Transformation", "function": "Ops", "email": "lkumar@umbrella.com", "buying_role": "Champion", "org_id": "org_umbrella"},
     ]
     
+    contacts = []
     for contact_data in contacts_data:
-        contact = {
+        contacts.append({
             **contact_data,
             "phone": None,
             "notes": None,
@@ -1421,8 +3169,8 @@ async def seed_data(request: Request):
             "created_by": default_owner,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }
-        await db.contacts.insert_one(contact)
+        })
+    await db.contacts.insert_many(contacts)
     
     # Create sample opportunities
     opps_data = [
@@ -1463,8 +3211,9 @@ async def seed_data(request: Request):
         },
     ]
     
+    opportunities = []
     for opp_data in opps_data:
-        opp = {
+        opportunities.append({
             **opp_data,
             "owner_id": default_owner,
             "pipeline_id": "pipe_default",
@@ -1474,8 +3223,8 @@ async def seed_data(request: Request):
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat(),
             "stage_entered_at": datetime.now(timezone.utc).isoformat()
-        }
-        await db.opportunities.insert_one(opp)
+        })
+    await db.opportunities.insert_many(opportunities)
     
     # Create sample activities
     activities_data = [
@@ -1486,20 +3235,387 @@ async def seed_data(request: Request):
         {"activity_id": "act_5", "activity_type": "Demo", "opp_id": "opp_2", "due_date": (datetime.now(timezone.utc) - timedelta(days=3)).isoformat(), "status": "Completed", "notes": "AI prototype demonstration - went well"},
     ]
     
+    activities = []
     for act_data in activities_data:
-        activity = {
+        activities.append({
             **act_data,
             "owner_id": default_owner,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }
-        await db.activities.insert_one(activity)
+        })
+    await db.activities.insert_many(activities)
+    await record_changes(*(change_event(collection, "invalidate") for collection in SYNC_COLLECTIONS))
     
     return {"message": "Sample data seeded successfully", "owner_id": default_owner}
 
+# ============== SYNTHETIC DATA ==============
+
+SYNTHETIC_ORG_WORDS = (
+    ["Acme", "Globex", "Initech", "Umbrella", "Wayne", "Stark", "Northwind", "Contoso", "Fabrikam", "Tyrell",
+     "Cyberdyne", "Soylent", "Hooli", "Vandelay", "Massive", "Pied Piper", "Aperture", "Gringotts", "Oscorp", "Wonka"],
+    ["Financial", "Health", "Retail", "Energy", "Logistics", "Media", "Insurance", "Foods", "Motors", "Labs",
+     "Capital", "Pharma", "Telecom", "Systems", "Analytics"],
+    ["Inc", "Group", "Holdings", "Corp", "Partners", "LLC", "International", "Co"],
+)
+SYNTHETIC_FIRST_NAMES = ["Sarah", "Michael", "Emily", "James", "Lisa", "David", "Priya", "Carlos", "Aisha", "Tom",
+                         "Mei", "Robert", "Fatima", "Daniel", "Olga", "Kenji", "Grace", "Luis", "Hannah", "Omar"]
+SYNTHETIC_LAST_NAMES = ["Chen", "Torres", "Watson", "Park", "Kumar", "Smith", "Patel", "Garcia", "Okafor", "Müller",
+                        "Nguyen", "Johnson", "Haddad", "Kim", "Ivanova", "Sato", "Brown", "Rossi", "Cohen", "Silva"]
+SYNTHETIC_TITLES = {
+    "IT": ["CIO", "VP of Engineering", "Director of IT", "Enterprise Architect"],
+    "Data": ["Chief Data Officer", "Head of Analytics", "Data Platform Lead"],
+    "AI": ["Director of AI Initiatives", "Head of Machine Learning", "AI Program Manager"],
+    "Finance": ["CFO", "VP Finance", "FP&A Director"],
+    "Ops": ["COO", "Head of Digital Transformation", "VP Operations"],
+}
+
+# (value, weight) pairs
+SYNTHETIC_WEIGHTS = {
+    "industry": [("Financial Services", 22), ("Healthcare", 18), ("Technology", 16), ("Manufacturing", 14),
+                 ("Retail", 12), ("Energy", 8), ("Public Sector", 6), ("Media", 4)],
+    "company_size": [("Enterprise", 30), ("Mid-Market", 45), ("SMB", 25)],
+    "region": [("North America", 50), ("Europe", 28), ("APAC", 15), ("LATAM", 7)],
+    "strategic_tier": [("Target", 50), ("Active", 35), ("Strategic", 15)],
+    "function": [("IT", 30), ("Data", 25), ("AI", 15), ("Finance", 15), ("Ops", 15)],
+    "buying_role": [("Influencer", 45), ("Champion", 25), ("Decision Maker", 20), (None, 10)],
+    "engagement_type": [("Advisory", 15), ("Strategy", 15), ("AI Enablement", 25), ("Data Modernization", 20),
+                        ("Platform / Architecture", 15), ("Transformation", 10)],
+    "source": [("Inbound", 30), ("Referral", 25), ("Exec Intro", 15), ("Expansion", 25), (None, 5)],
+    "activity_type": [("Call", 35), ("Meeting", 25), ("Follow-up", 20), ("Demo", 10), ("Workshop", 6), ("Exec Readout", 4)],
+}
+# Typical deal size by company size; actual values are log-normal around these
+SYNTHETIC_DEAL_SIZE = {"Enterprise": 350000, "Mid-Market": 150000, "SMB": 60000}
+SYNTHETIC_AT_RISK_REASONS = ["Champion left the company", "Budget frozen until next fiscal year",
+                             "Competing vendor in late stage", "No response in 30 days", "Scope keeps changing"]
+
+
+class SyntheticDataGenerator:
+    """Generate and bulk-load CRM data with realistic distributions.
+    
+    Output is deterministic for a given seed, anchor date and owner list:
+    documents come from one seeded RNG in a fixed order and ids are derived
+    from the seed and row number. Batches are written with unordered
+    insert_many, keeping up to `concurrency` writes in flight while the
+    next batch is generated.
+    """
+    
+    def __init__(self, owner_ids: List[str], stages: List[dict], seed: int = 42, anchor: Optional[datetime] = None,
+                 batch_size: int = SYNTHETIC_BATCH_SIZE, concurrency: int = SYNTHETIC_CONCURRENCY):
+        if not owner_ids:
+            raise ValueError("At least one owner is required")
+        if not stages:
+            raise ValueError("No pipeline stages found")
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.anchor = anchor or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.owner_ids = sorted(owner_ids)
+        # A few reps own most of the book (Zipf-like)
+        self.owner_weights = self._cumulative([1 / (rank + 1) ** 0.8 for rank in range(len(self.owner_ids))])
+        self.stages = sorted(stages, key=lambda s: s.get("order", 0))
+        self.stage_weights = self._cumulative([self._stage_weight(s) for s in self.stages])
+        self.weights = {field: ([v for v, _ in pairs], self._cumulative([w for _, w in pairs]))
+                        for field, pairs in SYNTHETIC_WEIGHTS.items()}
+        # Per-row state later entities depend on
+        self.org_owner = []
+        self.org_size = []
+        self.contacts_by_org = {}
+        self.opp_owner = []
+    
+    @staticmethod
+    def _cumulative(weights: List[float]) -> List[float]:
+        total, out = 0.0, []
+        for w in weights:
+            total += w
+            out.append(total)
+        return out
+    
+    @staticmethod
+    def _stage_weight(stage: dict) -> float:
+        """Funnel shape: early stages hold most open deals, a share of deals are closed"""
+        name = stage.get("name", "").lower()
+        if "won" in name:
+            return 10
+        if "lost" in name:
+            return 14
+        return max(30 - 4 * stage.get("order", 1), 4)
+    
+    def _id(self, prefix: str, n: int) -> str:
+        # The row number is fixed-width, so ids of different seeds can't collide
+        return f"{prefix}_{self.seed:04x}{n:08x}"
+    
+    def _pick(self, field: str):
+        values, cum = self.weights[field]
+        return self.rng.choices(values, cum_weights=cum)[0]
+    
+    def _owner(self) -> int:
+        return self.rng.choices(range(len(self.owner_ids)), cum_weights=self.owner_weights)[0]
+    
+    def _skewed(self, n: int) -> int:
+        """Index in [0, n) biased towards low numbers, so some accounts are much busier than others"""
+        return min(int(n * self.rng.random() ** 2), n - 1)
+    
+    def _date(self, days: float) -> datetime:
+        return self.anchor + timedelta(days=days)
+    
+    def organizations(self, count: int):
+        rng = self.rng
+        for i in range(count):
+            owner = self._owner()
+            size = self._pick("company_size")
+            self.org_owner.append(owner)
+            self.org_size.append(size)
+            created = self._date(-rng.uniform(30, 1095)).isoformat()
+            yield {
+                "org_id": self._id("org", i),
+                "name": " ".join(rng.choice(words) for words in SYNTHETIC_ORG_WORDS),
+                "industry": self._pick("industry"),
+                "company_size": size,
+                "region": self._pick("region"),
+                "strategic_tier": self._pick("strategic_tier"),
+                "primary_exec_sponsor": None,
+                "notes": None,
+                "owner_id": self.owner_ids[owner],
+                "created_by": self.owner_ids[owner],
+                "created_at": created,
+                "updated_at": created
+            }
+    
+    def contacts(self, count: int):
+        rng = self.rng
+        n_orgs = len(self.org_owner)
+        for i in range(count):
+            org = self._skewed(n_orgs)
+            self.contacts_by_org.setdefault(org, []).append(i)
+            first, last = rng.choice(SYNTHETIC_FIRST_NAMES), rng.choice(SYNTHETIC_LAST_NAMES)
+            function = self._pick("function")
+            created = self._date(-rng.uniform(0, 900)).isoformat()
+            yield {
+                "contact_id": self._id("contact", i),
+                "name": f"{first} {last}",
+                "title": rng.choice(SYNTHETIC_TITLES[function]),
+                "function": function,
+                "email": f"{first.lower()}.{last.lower()}{i}@example.com",
+                "phone": f"+1-555-{rng.randint(0, 9999):04d}" if rng.random() < 0.6 else None,
+                "buying_role": self._pick("buying_role"),
+                "org_id": self._id("org", org),
+                "notes": None,
+                "owner_id": self.owner_ids[self.org_owner[org]],
+                "created_by": self.owner_ids[self.org_owner[org]],
+                "created_at": created,
+                "updated_at": created
+            }
+    
+    def opportunities(self, count: int):
+        rng = self.rng
+        n_orgs = len(self.org_owner)
+        for i in range(count):
+            org = self._skewed(n_orgs)
+            owner = self.org_owner[org] if rng.random() < 0.85 else self._owner()
+            self.opp_owner.append(owner)
+            stage = rng.choices(self.stages, cum_weights=self.stage_weights)[0]
+            name = stage.get("name", "").lower()
+            closed = "won" in name or "lost" in name
+            
+            age = rng.uniform(0, 730)
+            created = self._date(-age)
+            stage_entered = self._date(-age * rng.random())
+            target_close = stage_entered if closed else self._date(rng.uniform(7, 180))
+            win = stage.get("win_probability", 50)
+            confidence = win if closed else max(0, min(100, int(rng.gauss(win, 10))))
+            value = round(SYNTHETIC_DEAL_SIZE[self.org_size[org]] * rng.lognormvariate(0, 0.6), -3)
+            at_risk = not closed and rng.random() < 0.08
+            org_contacts = self.contacts_by_org.get(org)
+            engagement = self._pick("engagement_type")
+            
+            yield {
+                "opp_id": self._id("opp", i),
+                "name": f"{engagement} engagement #{i}",
+                "org_id": self._id("org", org),
+                "primary_contact_id": self._id("contact", rng.choice(org_contacts)) if org_contacts and rng.random() < 0.7 else None,
+                "engagement_type": engagement,
+                "estimated_value": value,
+                "confidence_level": confidence,
+                "owner_id": self.owner_ids[owner],
+                "pipeline_id": stage["pipeline_id"],
+                "stage_id": stage["stage_id"],
+                "target_close_date": target_close.isoformat(),
+                "source": self._pick("source"),
+                "notes": None,
+                "value_hypothesis": None,
+                "is_at_risk": at_risk,
+                "at_risk_reason": rng.choice(SYNTHETIC_AT_RISK_REASONS) if at_risk else None,
+                "created_at": created.isoformat(),
+                "updated_at": stage_entered.isoformat(),
+                "stage_entered_at": stage_entered.isoformat()
+            }
+    
+    def activities(self, count: int):
+        rng = self.rng
+        n_opps, n_orgs = len(self.opp_owner), len(self.org_owner)
+        for i in range(count):
+            due = self._date(rng.triangular(-180, 60, -7))
+            if due > self.anchor:
+                status = "Planned"
+            else:
+                status = "Completed" if rng.random() < 0.8 else "Overdue"
+            activity_type = self._pick("activity_type")
+            doc = {
+                "activity_id": self._id("act", i),
+                "activity_type": activity_type,
+                "title": f"{activity_type} #{i}",
+                "opp_id": None,
+                "org_id": None,
+                "due_date": due.isoformat(),
+                "status": status,
+                "notes": None,
+                "created_at": self._date(min(0, (due - self.anchor).days) - rng.uniform(1, 30)).isoformat(),
+            }
+            if n_opps and rng.random() < 0.9:
+                opp = self._skewed(n_opps)
+                doc["opp_id"] = self._id("opp", opp)
+                doc["owner_id"] = self.owner_ids[self.opp_owner[opp]]
+            elif n_orgs:
+                org = self._skewed(n_orgs)
+                doc["org_id"] = self._id("org", org)
+                doc["owner_id"] = self.owner_ids[self.org_owner[org]]
+            else:
+                doc["owner_id"] = self.owner_ids[self._owner()]
+            doc["updated_at"] = doc["created_at"]
+            yield doc
+    
+    async def load(self, collection: str, docs) -> int:
+        """Insert generated docs in batches with a bounded number of writes in flight.
+        
+        Batches are generated in a worker thread so the event loop keeps
+        serving other requests. If a write fails, no further batches start and
+        the writes already in flight are awaited before the error propagates,
+        so nothing is still inserting once the caller sees it.
+        """
+        pending = set()
+        inserted = 0
+        
+        async def write(batch: List[dict]) -> int:
+            try:
+                result = await db[collection].insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                    raise
+                raise HTTPException(status_code=409, detail=f"Synthetic {collection} for seed {self.seed} already exist")
+            return len(result.inserted_ids)
+        
+        def written(done) -> int:
+            # Check every finished write, so none of their errors goes unretrieved
+            errors = [t.exception() for t in done if t.exception()]
+            if errors:
+                raise errors[0]
+            return sum(t.result() for t in done)
+        
+        try:
+            while True:
+                # One generator, advanced by one thread at a time, so output stays deterministic
+                batch = await asyncio.to_thread(lambda: list(itertools.islice(docs, self.batch_size)))
+                if not batch:
+                    break
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    inserted += written(done)
+                pending.add(asyncio.create_task(write(batch)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                inserted += written(done)
+        finally:
+            # Cancelling wouldn't stop an insert the driver already sent; wait for them and retrieve their errors
+            await asyncio.gather(*pending, return_exceptions=True)
+        return inserted
+    
+    async def run(self, organizations: int, contacts: int, opportunities: int, activities: int) -> dict:
+        started = time.perf_counter()
+        report = {"seed": self.seed, "anchor_date": self.anchor.date().isoformat(), "collections": {}}
+        for collection, count, docs in [
+            ("organizations", organizations, self.organizations),
+            ("contacts", contacts, self.contacts),
+            ("opportunities", opportunities, self.opportunities),
+            ("activities", activities, self.activities),
+        ]:
+            t0 = time.perf_counter()
+            inserted = await self.load(collection, docs(count))
+            elapsed = time.perf_counter() - t0
+            report["collections"][collection] = {
+                "inserted": inserted,
+                "seconds": round(elapsed, 3),
+                "docs_per_second": round(inserted / elapsed) if elapsed > 0 else None
+            }
+            logger.info(f"Synthetic data: {inserted} {collection} in {elapsed:.1f}s")
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        return report
+
+
+async def generate_synthetic_data(params: SyntheticDataRequest, batch_size: int = SYNTHETIC_BATCH_SIZE,
+                                  concurrency: int = SYNTHETIC_CONCURRENCY) -> dict:
+    """Shared by POST /api/seed/synthetic and generate_data.py"""
+    if (params.contacts or params.opportunities) and not params.organizations:
+        raise HTTPException(status_code=400, detail="Contacts and opportunities need at least one organization")
+    anchor = None
+    if params.anchor_date:
+        try:
+            anchor = datetime.fromisoformat(params.anchor_date).replace(tzinfo=timezone.utc)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="anchor_date must be YYYY-MM-DD")
+    
+    await ensure_default_pipeline()
+    pipeline = await db.pipelines.find_one({"is_default": True}, {"_id": 0}) or await db.pipelines.find_one({}, {"_id": 0})
+    stages = await db.stages.find({"pipeline_id": pipeline["pipeline_id"]}, {"_id": 0}).to_list(100)
+    owners = [u["user_id"] async for u in db.users.find({}, {"_id": 0, "user_id": 1})]
+    if not owners:
+        raise HTTPException(status_code=400, detail="Create at least one user before generating data")
+    
+    await ensure_id_indexes()
+    if params.clear:
+        for collection in ["organizations", "notes", "contacts", "opportunities", "activities", "stage_events", "copilot_results"]:
+            await db[collection].delete_many({})
+        # No per-document tombstones for a wipe
+        await record_reset()
+    
+    generator = SyntheticDataGenerator(owners, stages, seed=params.seed, anchor=anchor,
+                                       batch_size=batch_size, concurrency=concurrency)
+    # Ids depend only on the seed and row number, so a rerun would collide with the first run's documents
+    for collection, prefix, count in [("organizations", "org", params.organizations), ("contacts", "contact", params.contacts),
+                                      ("opportunities", "opp", params.opportunities), ("activities", "act", params.activities)]:
+        if count and await db[collection].find_one({SYNC_COLLECTIONS[collection]: generator._id(prefix, 0)}, {"_id": 1}):
+            raise HTTPException(
+                status_code=409,
+                detail=f"Data for seed {params.seed} already exists; use another seed or clear first"
+            )
+    result = await generator.run(params.organizations, params.contacts, params.opportunities, params.activities)
+    # Generated updated_at values lie in the past, behind existing sync cursors
+    await record_reset()
+    await record_changes(*(change_event(collection, "invalidate") for collection in SYNC_COLLECTIONS))
+    return result
+
+@api_router.post("/seed/synthetic")
+async def seed_synthetic_data(params: SyntheticDataRequest, request: Request):
+    """Bulk-generate a realistic dataset for capacity planning (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    total = params.organizations + params.contacts + params.opportunities + params.activities
+    if total > SYNTHETIC_MAX_DOCS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {SYNTHETIC_MAX_DOCS} documents per request; use generate_data.py for larger volumes"
+        )
+    
+    report = await generate_synthetic_data(params)
+    logger.info(f"Synthetic dataset (seed {params.seed}) generated by {user['email']}: {total} docs in {report['seconds']}s")
+    return report
+
 # ============== ANALYTICS ENDPOINTS ==============
 
 @api_router.get("/analytics/pipeline")
+@cached_response("opportunities", "stages")
 async def get_pipeline_analytics(request: Request, owner_id: Optional[str] = None):
     """Pipeline value by stage"""
     user = await get_current_user(request)
@@ -1522,6 +3638,7 @@ async def get_pipeline_analytics(request: Request, owner_id: Optional[str] = Non
     return result
 
 @api_router.get("/analytics/engagement-types")
+@cached_response("opportunities")
 async def get_engagement_analytics(request: Request, owner_id: Optional[str] = None):
     """Win rate by engagement type"""
     user = await get_current_user(request)
@@ -1552,6 +3669,7 @@ async def get_engagement_analytics(request: Request, owner_id: Optional[str] = N
     return result
 
 @api_router.get("/analytics/by-owner")
+@cached_response("opportunities", "users")
 async def get_owner_analytics(request: Request):
     """Pipeline value by owner"""
     user = await get_current_user(request)
@@ -1600,6 +3718,7 @@ async def get_owner_analytics(request: Request):
     return result
 
 @api_router.get("/reports/summary")
+@cached_response("opportunities")
 async def get_reports_summary(request: Request, owner_id: Optional[str] = None):
     """Dashboard reports summary - Won vs Lost, Active, Pipeline counts and values"""
     user = await get_current_user(request)
@@ -1642,6 +3761,7 @@ async def get_reports_summary(request: Request, owner_id: Optional[str] = None):
     }
 
 @api_router.get("/analytics/summary")
+@cached_response("opportunities", "activities")
 async def get_analytics_summary(request: Request, owner_id: Optional[str] = None):
     """Overall analytics summary"""
     user = await get_current_user(request)
@@ -1696,6 +3816,236 @@ async def get_analytics_summary(request: Request, owner_id: Optional[str] = None
         "overdue_activities": len(overdue_activities)
     }
 
+# ============== PROFILING ==============
+
+cpu_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
+
+@api_router.post("/debug/profile")
+async def run_cpu_profile(
+    request: Request,
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    loop_only: bool = False,
+    format: Literal["collapsed", "json"] = "collapsed"
+):
+    """Sample all thread stacks for N seconds; collapsed stacks feed flamegraph.pl or speedscope (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if seconds > PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {PROFILE_MAX_SECONDS:g}")
+    
+    # This handler runs on the event loop thread, the one that matters for latency
+    thread_ids = {threading.get_ident()} if loop_only else None
+    try:
+        result = await asyncio.to_thread(cpu_profiler.profile, seconds, interval_ms / 1000, thread_ids)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(f"CPU profile: {result['samples']} samples over {result['duration_s']}s")
+    
+    if format == "json":
+        return {
+            "duration_s": result["duration_s"],
+            "interval_ms": result["interval_ms"],
+            "samples": result["samples"],
+            "stacks": [{"stack": stack, "count": count} for stack, count in result["stacks"].most_common(200)],
+        }
+    filename = f"profile-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}.collapsed"
+    return Response(
+        content=SamplingProfiler.collapsed(result["stacks"]),
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@api_router.post("/debug/tracemalloc/start")
+async def start_tracemalloc(request: Request, frames: int = Query(25, ge=1, le=100)):
+    """Start tracing allocations; slows allocation until stopped (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    memory_profiler.start(frames)
+    return {"tracing": True, "snapshot": await asyncio.to_thread(memory_profiler.take)}
+
+@api_router.post("/debug/tracemalloc/stop")
+async def stop_tracemalloc(request: Request):
+    """Stop tracing allocations and discard snapshots (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    memory_profiler.stop()
+    return {"tracing": False}
+
+@api_router.post("/debug/tracemalloc/snapshots")
+async def take_tracemalloc_snapshot(request: Request):
+    """Take an allocation snapshot to diff against another (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if not memory_profiler.tracing:
+        raise HTTPException(status_code=409, detail="tracemalloc is not running; POST /api/debug/tracemalloc/start first")
+    return await asyncio.to_thread(memory_profiler.take)
+
+@api_router.get("/debug/tracemalloc/snapshots")
+async def list_tracemalloc_snapshots(request: Request):
+    """Snapshots kept in memory, oldest first (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {"tracing": memory_profiler.tracing, "snapshots": memory_profiler.list()}
+
+@api_router.get("/debug/tracemalloc/snapshots/{snapshot_id}")
+async def get_tracemalloc_top(
+    snapshot_id: str,
+    request: Request,
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Largest allocation sites in one snapshot (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    stats = await asyncio.to_thread(memory_profiler.top, snapshot_id, group_by, limit)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return {"snapshot_id": snapshot_id, "stats": stats}
+
+@api_router.get("/debug/tracemalloc/diff")
+async def diff_tracemalloc_snapshots(
+    request: Request,
+    base: str,
+    current: str,
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Allocation growth between two snapshots, largest change first (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    stats = await asyncio.to_thread(memory_profiler.diff, base, current, group_by, limit)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return {"base": base, "current": current, "stats": stats}
+
+# ============== METRICS ==============
+
+http_requests_total = Family(Counter, "http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"])
+http_request_seconds = Family(Histogram, "http_request_duration_seconds", "HTTP request latency by route template", ["method", "route", "status"])
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+loop_lag_monitor = EventLoopLagMonitor()
+loop_block_detector = BlockingCallDetector(threshold=LOOP_BLOCK_THRESHOLD_MS / 1000)
+
+class HTTPMetricsMiddleware:
+    """Counts requests and records latency per route template (not raw path)"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = "500"
+        started = time.perf_counter()
+        http_requests_in_flight.inc()
+        task = asyncio.current_task()
+        loop_block_detector.track(task, scope)
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            loop_block_detector.untrack(task)
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched", status)
+            http_requests_total.labels(*labels).inc()
+            http_request_seconds.labels(*labels).observe(time.perf_counter() - started)
+
+metrics_registry.register(
+    http_requests_total,
+    http_request_seconds,
+    http_requests_in_flight,
+    mongo_command_seconds,
+    Gauge("mongo_pool_connections_open", "Open Mongo connections", fn=lambda: mongo_pool.open),
+    Gauge("mongo_pool_connections_checked_out", "Mongo connections in use", fn=lambda: mongo_pool.checked_out),
+    Gauge("mongo_pool_wait_queue", "Operations waiting for a Mongo connection", fn=lambda: mongo_pool.waiting),
+    password_hash_queued,
+    password_hash_seconds,
+    lookup_cache_requests,
+    response_cache_requests,
+    copilot_queue_wait_seconds,
+    copilot_upstream_seconds,
+    copilot_coalesced_total,
+    copilot_shed_total,
+    events_published_total,
+    events_overflows_total,
+    change_log_append_failures,
+    Gauge("events_subscribers", "Open /api/events streams", fn=lambda: len(event_broker.subscribers)),
+    Gauge("copilot_active", "Copilot calls holding a concurrency slot", fn=lambda: copilot_limiter.active),
+    Gauge("copilot_waiting", "Copilot calls queued for a slot", fn=lambda: copilot_limiter.waiting),
+    llm_provider.latency_seconds,
+    llm_provider.ttft_seconds,
+    *llm_provider.calls.values(),
+    Gauge("llm_circuit_open", "1 while the LLM circuit breaker is open", fn=lambda: float(llm_provider.breaker.state == "open")),
+    loop_lag_monitor.lag_seconds,
+    loop_lag_monitor.last_lag,
+    loop_lag_monitor.max_lag,
+    loop_block_detector.blocked_total,
+    loop_block_detector.block_seconds,
+)
+
+@api_router.get("/debug/blocking")
+async def get_blocking_events(request: Request):
+    """Recent event-loop blocking episodes with their stacks (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {
+        "enabled": LOOP_BLOCK_DETECTION,
+        "threshold_ms": LOOP_BLOCK_THRESHOLD_MS,
+        "lag": loop_lag_monitor.lag_seconds.snapshot(),
+        "blocked_total": loop_block_detector.blocked_total.value,
+        "events": list(reversed(loop_block_detector.events)),
+    }
+
+@api_router.get("/debug/traces/{trace_id}")
+async def get_trace(trace_id: str, request: Request):
+    """Spans of a recently exported trace, by the X-Trace-Id of its response (admin only)"""
+    user = await get_current_user(request)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    spans = tracer.get(trace_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="Trace not found (not sampled, or no longer buffered)")
+    return {"trace_id": trace_id, "spans": spans}
+
+async def render_metrics(request: Request):
+    """Prometheus text exposition of all registered metrics"""
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# /metrics for scrapers hitting the backend directly, /api/metrics through the ingress
+app.add_api_route("/metrics", render_metrics, methods=["GET"], include_in_schema=False)
+api_router.add_api_route("/metrics", render_metrics, methods=["GET"])
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -1707,6 +4057,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(DBQueryMiddleware, query_budget=DB_QUERY_BUDGET, repeat_limit=DB_REPEAT_LIMIT, enabled=DB_MONITORING)
+app.add_middleware(HTTPMetricsMiddleware)
+app.add_middleware(CompressionMiddleware, compressor=compressor, enabled=COMPRESSION)
+app.add_middleware(TracingMiddleware, tracer=tracer, enabled=TRACING)
+
+async def ensure_id_indexes():
+    """Unique indexes on entity ids (also used by the copilot context lookups).
+    
+    Earlier versions created these without `unique`; such an index is
+    replaced. If existing duplicates prevent that, it is logged and the old
+    index is kept.
+    """
+    for collection, id_field in SYNC_COLLECTIONS.items():
+        name = f"{id_field}_1"
+        existing = (await db[collection].index_information()).get(name)
+        if existing is not None and existing.get("unique"):
+            continue
+        try:
+            if existing is not None:
+                await db[collection].drop_index(name)
+            await db[collection].create_index(id_field, unique=True)
+        except OperationFailure as e:
+            logger.error(f"Could not create unique index on {collection}.{id_field}: {e}")
+            await db[collection].create_index(id_field)
+
+@app.on_event("startup")
+async def startup_tasks():
+    loop_lag_monitor.start()
+    write_generations.start()
+    if LOOP_BLOCK_DETECTION:
+        loop_block_detector.start()
+    await db.copilot_results.create_index([("opp_id", 1), ("action", 1)], unique=True)
+    await db.copilot_jobs.create_index("job_id", unique=True)
+    # Lookups used by the copilot context aggregation
+    await ensure_id_indexes()
+    await db.stages.create_index("stage_id")
+    await db.activities.create_index([("opp_id", 1), ("due_date", -1)])
+    await db.stage_events.create_index([("opp_id", 1), ("changed_at", 1)])
+    # Delta sync walks each collection in (updated_at, id) order
+    for collection, id_field in SYNC_COLLECTIONS.items():
+        await db[collection].create_index([("updated_at", 1), (id_field, 1)])
+    await db.tombstones.create_index([("deleted_at", 1), ("tombstone_id", 1)])
+    await db.tombstones.create_index("expires_at", expireAfterSeconds=0)
+    await change_log.ensure_collection()
+    change_log.start(event_broker.publish, lambda: event_broker.publish(RESYNC))
+    await db.notes.create_index("note_id", unique=True)
+    await db.notes.create_index([("org_id", 1), ("created_at", -1), ("note_id", -1)])
+    await migrate_notes_history()
+    await interrupt_orphaned_copilot_jobs()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await loop_lag_monitor.stop()
+    loop_block_detector.stop()
+    await write_generations.stop()
+    await change_log.stop()
     client.close()
+    await llm_provider.aclose()
+    password_executor.shutdown(wait=False)
+    if trace_exporter is not None:
+        trace_exporter.close()
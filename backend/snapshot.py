@@ -0,0 +1,264 @@
+"""Write Parquet snapshots of the CRM collections for BI / warehouse loads.
+
+One file per collection (<out>/<collection>.parquet) with typed columns:
+ISO date strings become UTC timestamps and low-cardinality fields are
+dictionary-encoded. Documents are streamed from Mongo and written in
+row groups of --chunk-size rows, so memory stays flat on large collections.
+
+A content hash per collection is kept in <out>/_manifest.json; collections
+whose hash hasn't changed since the last run are skipped. The hash comes
+from the dbHash command when the Mongo user is allowed to run it, otherwise
+it's computed while streaming (the unchanged file is then left in place).
+
+    python snapshot.py write --out /data/snapshots
+    python snapshot.py write --out /data/snapshots --collections opportunities stage_events --force
+    python snapshot.py read --out /data/snapshots opportunities
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import typing
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from server import ActivityBase, ContactBase, OpportunityBase, OrganizationBase, StageEvent, client, db
+
+# Bump when the column mapping changes so existing snapshots are rewritten.
+# 2: organizations replaced notes_history with notes_count and latest_note
+SCHEMA_VERSION = 2
+MANIFEST = "_manifest.json"
+DEFAULT_CHUNK_SIZE = 50_000
+
+SNAPSHOT_COLLECTIONS = {
+    "organizations": {
+        "model": OrganizationBase,
+        "categories": ["industry", "company_size", "region", "strategic_tier"],
+    },
+    "contacts": {
+        "model": ContactBase,
+        "categories": ["function", "buying_role"],
+    },
+    "opportunities": {
+        "model": OpportunityBase,
+        "categories": ["engagement_type", "source", "pipeline_id", "stage_id"],
+    },
+    "activities": {
+        "model": ActivityBase,
+        "categories": ["activity_type", "status"],
+    },
+    "stage_events": {
+        "model": StageEvent,
+        "categories": ["pipeline_id", "from_stage_id", "to_stage_id"],
+    },
+}
+
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+SCALAR_TYPES = {str: pa.string(), int: pa.int64(), float: pa.float64(), bool: pa.bool_(), datetime: TIMESTAMP}
+
+
+def arrow_type(annotation):
+    """Map a model field annotation to an Arrow type; lists/dicts are stored as JSON text"""
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    if typing.get_origin(annotation) is typing.Union and len(args) == 1:
+        annotation = args[0]
+    return SCALAR_TYPES.get(annotation, pa.string())
+
+
+def snapshot_schema(collection: str) -> pa.Schema:
+    spec = SNAPSHOT_COLLECTIONS[collection]
+    fields = []
+    for name, info in spec["model"].model_fields.items():
+        fields.append(pa.field(name, CATEGORY if name in spec["categories"] else arrow_type(info.annotation)))
+    return pa.schema(fields, metadata={"collection": collection, "schema_version": str(SCHEMA_VERSION)})
+
+
+def to_timestamp(value):
+    """ISO string (or naive/aware datetime) -> aware UTC datetime; unparseable values become null"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def convert(value, field_type):
+    if value is None:
+        return None
+    if field_type == TIMESTAMP:
+        return to_timestamp(value)
+    if pa.types.is_string(field_type) or pa.types.is_dictionary(field_type):
+        return value if isinstance(value, str) else json.dumps(value, default=str)
+    if pa.types.is_floating(field_type):
+        return float(value) if isinstance(value, (int, float)) else None
+    if pa.types.is_integer(field_type):
+        return int(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    if pa.types.is_boolean(field_type):
+        return bool(value)
+    return value
+
+
+def build_table(docs: list, schema: pa.Schema) -> pa.Table:
+    arrays = [
+        pa.array([convert(doc.get(field.name), field.type) for doc in docs], type=field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def doc_digest(doc: dict) -> bytes:
+    return json.dumps(doc, sort_keys=True, default=str, separators=(",", ":")).encode()
+
+
+async def server_hash(collection: str):
+    """Collection md5 from the server, or None when dbHash isn't available/permitted"""
+    try:
+        result = await db.command("dbHash", collections=[collection])
+    except Exception:
+        return None
+    md5 = (result.get("collections") or {}).get(collection)
+    return f"md5:{md5}" if md5 else None
+
+
+def load_manifest(out_dir: str) -> dict:
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(out_dir: str, manifest: dict):
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST))
+
+
+async def write_snapshot(collection: str, out_dir: str, previous: dict, chunk_size: int, force: bool) -> dict:
+    """Stream one collection into a Parquet file; returns its manifest entry"""
+    schema = snapshot_schema(collection)
+    path = os.path.join(out_dir, f"{collection}.parquet")
+    unchanged = (
+        not force
+        and previous.get("schema_version") == SCHEMA_VERSION
+        and os.path.exists(path)
+    )
+
+    started = time.perf_counter()
+    content_hash = await server_hash(collection)
+    if unchanged and content_hash and previous.get("hash") == content_hash:
+        return {**previous, "status": "skipped"}
+
+    streaming_hash = hashlib.sha256() if content_hash is None else None
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".parquet.tmp")
+    os.close(fd)
+    rows = row_groups = 0
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+            cursor = db[collection].find({}, {"_id": 0, **{f: 1 for f in schema.names}}).sort("_id", 1).batch_size(chunk_size)
+            docs = []
+            async for doc in cursor:
+                docs.append(doc)
+                if streaming_hash is not None:
+                    streaming_hash.update(doc_digest(doc))
+                if len(docs) >= chunk_size:
+                    writer.write_table(build_table(docs, schema), row_group_size=chunk_size)
+                    rows += len(docs)
+                    row_groups += 1
+                    docs = []
+            if docs or rows == 0:
+                writer.write_table(build_table(docs, schema), row_group_size=chunk_size)
+                rows += len(docs)
+                row_groups += 1
+
+        if streaming_hash is not None:
+            content_hash = f"sha256:{streaming_hash.hexdigest()}"
+            if unchanged and previous.get("hash") == content_hash:
+                os.unlink(tmp_path)
+                return {**previous, "status": "skipped"}
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return {
+        "status": "written",
+        "hash": content_hash,
+        "schema_version": SCHEMA_VERSION,
+        "rows": rows,
+        "row_groups": row_groups,
+        "bytes": os.path.getsize(path),
+        "seconds": round(time.perf_counter() - started, 3),
+        "written_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def write_all(args) -> int:
+    os.makedirs(args.out, exist_ok=True)
+    manifest = load_manifest(args.out)
+    for collection in args.collections:
+        entry = await write_snapshot(collection, args.out, manifest.get(collection, {}), args.chunk_size, args.force)
+        manifest[collection] = {k: v for k, v in entry.items() if k != "status"}
+        save_manifest(args.out, manifest)
+        if entry["status"] == "skipped":
+            print(f"{collection}: unchanged, skipped")
+        else:
+            print(f"{collection}: {entry['rows']} rows, {entry['row_groups']} row groups, "
+                  f"{entry['bytes']} bytes in {entry['seconds']}s")
+    client.close()
+    return 0
+
+
+def read_snapshot(args) -> int:
+    """Load a snapshot back and report how long it took"""
+    path = os.path.join(args.out, f"{args.collection}.parquet")
+    started = time.perf_counter()
+    table = pq.read_table(path)
+    elapsed = time.perf_counter() - started
+    metadata = pq.ParquetFile(path).metadata
+    print(json.dumps({
+        "collection": args.collection,
+        "rows": table.num_rows,
+        "row_groups": metadata.num_row_groups,
+        "bytes": os.path.getsize(path),
+        "read_ms": round(elapsed * 1000, 2),
+        "rows_per_second": round(table.num_rows / elapsed) if elapsed else None,
+        "schema": {field.name: str(field.type) for field in table.schema},
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    write = sub.add_parser("write", help="Write snapshots for changed collections")
+    write.add_argument("--out", required=True, help="Snapshot directory")
+    write.add_argument("--collections", nargs="+", choices=list(SNAPSHOT_COLLECTIONS), default=list(SNAPSHOT_COLLECTIONS))
+    write.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per row group")
+    write.add_argument("--force", action="store_true", help="Rewrite even if the content hash is unchanged")
+
+    read = sub.add_parser("read", help="Time loading a snapshot")
+    read.add_argument("--out", required=True, help="Snapshot directory")
+    read.add_argument("collection", choices=list(SNAPSHOT_COLLECTIONS))
+
+    args = parser.parse_args()
+    if args.command == "write":
+        sys.exit(asyncio.run(write_all(args)))
+    sys.exit(read_snapshot(args))
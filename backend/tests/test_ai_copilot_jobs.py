@@ -0,0 +1,186 @@
+"""
+AI Copilot Batch Job Tests
+Tests for:
+1. POST /api/ai/copilot/jobs starts a batch run over filtered opportunities (admin only)
+2. GET /api/ai/copilot/jobs/{job_id} reports progress until the job finishes
+3. GET /api/ai/copilot/results/{opp_id} returns the stored per-opportunity results
+4. Invalid actions and unknown jobs are rejected
+5. In-process: cancel_requested set by another instance stops a job; only jobs with a stale heartbeat are interrupted
+
+Run the backend with LLM_PROVIDER=fake to exercise these without network access.
+The in-process tests use a throwaway database on MONGO_URL and skip when no mongod is reachable.
+"""
+
+import asyncio
+import time
+import uuid
+import pytest
+import requests
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "compassx_test")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+def wait_for_job(session, job_id, timeout=120):
+    """Poll a job until it leaves the queued/running states"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = session.get(f"{BASE_URL}/api/ai/copilot/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(1)
+    pytest.fail(f"Job {job_id} did not finish in {timeout}s")
+
+class TestCopilotJobs:
+    """Test batch copilot job API"""
+
+    def test_at_risk_job_runs_to_completion(self, admin_session):
+        """Suggest-activity job over at-risk deals should finish and store results"""
+        response = admin_session.post(
+            f"{BASE_URL}/api/ai/copilot/jobs",
+            json={"action": "suggest_activity", "filter": {"is_at_risk": True}}
+        )
+        assert response.status_code == 200
+        job = response.json()
+        assert job["job_id"].startswith("job_")
+        assert job["status"] == "queued"
+        assert job["total"] >= 0
+
+        job = wait_for_job(admin_session, job["job_id"])
+        assert job["status"] == "completed"
+        assert job["completed"] + job["failed"] == job["total"]
+        print(f"SUCCESS: job {job['job_id']} completed {job['completed']}/{job['total']}")
+
+        if job["completed"]:
+            opps = admin_session.get(f"{BASE_URL}/api/opportunities").json()
+            at_risk = [o for o in opps if o.get("is_at_risk")]
+            results = admin_session.get(
+                f"{BASE_URL}/api/ai/copilot/results/{at_risk[0]['opp_id']}",
+                params={"action": "suggest_activity"}
+            ).json()
+            assert len(results) == 1
+            assert results[0]["action"] == "suggest_activity"
+            assert results[0]["result"]
+            print("SUCCESS: precomputed result stored for at-risk opportunity")
+
+    def test_jobs_list(self, admin_session):
+        """Jobs list should include recent jobs without error details"""
+        response = admin_session.get(f"{BASE_URL}/api/ai/copilot/jobs")
+        assert response.status_code == 200
+        jobs = response.json()
+        assert isinstance(jobs, list)
+        for job in jobs:
+            assert "errors" not in job
+        print(f"SUCCESS: {len(jobs)} jobs listed")
+
+    def test_invalid_action_rejected(self, admin_session):
+        """Unknown actions should return 400"""
+        response = admin_session.post(f"{BASE_URL}/api/ai/copilot/jobs", json={"action": "not_an_action"})
+        assert response.status_code == 400
+        print("SUCCESS: invalid action rejected")
+
+    def test_unknown_job_404(self, admin_session):
+        """Unknown job ids should return 404"""
+        response = admin_session.get(f"{BASE_URL}/api/ai/copilot/jobs/job_does_not_exist")
+        assert response.status_code == 404
+        print("SUCCESS: unknown job returns 404")
+
+    def test_results_for_unknown_opportunity_empty(self, admin_session):
+        """Results for an opportunity with no runs should be an empty list"""
+        response = admin_session.get(f"{BASE_URL}/api/ai/copilot/results/opp_does_not_exist")
+        assert response.status_code == 200
+        assert response.json() == []
+        print("SUCCESS: no results for unknown opportunity")
+
+def run_with_temp_db(monkeypatch, scenario):
+    """Run `scenario(server, db)` against a fresh database bound into server.py, dropping it afterwards"""
+    import server
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000)
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            pytest.skip("No mongod reachable at MONGO_URL")
+        db = client[f"compassx_jobs_test_{uuid.uuid4().hex[:8]}"]
+        monkeypatch.setattr(server, "db", db)
+        try:
+            return await scenario(server, db)
+        finally:
+            await client.drop_database(db.name)
+            client.close()
+    return asyncio.run(main())
+
+def job_doc(job_id: str, status: str, heartbeat_at) -> dict:
+    doc = {"job_id": job_id, "status": status, "total": 0, "completed": 0, "failed": 0, "errors": [],
+           "created_at": datetime.now(timezone.utc).isoformat(), "instance_id": "other", "cancel_requested": False}
+    if heartbeat_at:
+        doc["heartbeat_at"] = heartbeat_at.isoformat()
+    return doc
+
+class TestCopilotJobsAcrossInstances:
+    """Test job ownership through heartbeats and the persisted cancel flag"""
+
+    def test_only_stale_jobs_interrupted(self, monkeypatch):
+        """A starting instance leaves jobs with a fresh heartbeat running"""
+        async def scenario(server, db):
+            now = datetime.now(timezone.utc)
+            await db.copilot_jobs.insert_many([
+                job_doc("job_fresh", "running", now),
+                job_doc("job_stale", "running", now - timedelta(hours=1)),
+                job_doc("job_legacy", "queued", None),
+                job_doc("job_done", "completed", now - timedelta(hours=1)),
+            ])
+            interrupted = await server.interrupt_orphaned_copilot_jobs()
+            statuses = {j["job_id"]: j["status"] async for j in db.copilot_jobs.find({}, {"_id": 0})}
+            return interrupted, statuses
+
+        interrupted, statuses = run_with_temp_db(monkeypatch, scenario)
+        assert interrupted == 2
+        assert statuses == {"job_fresh": "running", "job_stale": "interrupted",
+                            "job_legacy": "interrupted", "job_done": "completed"}
+        print("SUCCESS: only jobs with a stale heartbeat interrupted")
+
+    def test_cancel_flag_stops_job(self, monkeypatch):
+        """cancel_requested written by another instance stops the job at its next heartbeat"""
+        from llm_providers import FakeProvider
+        import server
+        monkeypatch.setattr(server, "COPILOT_JOB_HEARTBEAT_SECONDS", 0.05)
+        monkeypatch.setattr(server, "COPILOT_BATCH_RATE", 0)
+        monkeypatch.setattr(server, "llm_provider", FakeProvider(first_token_ms=100, token_ms=0))
+
+        async def prompt(data):
+            return f"prompt for {data.opp_id}"
+        monkeypatch.setattr(server, "build_copilot_prompt", prompt)
+
+        async def scenario(server, db):
+            await db.copilot_jobs.insert_one(job_doc("job_cancel", "queued", datetime.now(timezone.utc)))
+            job = asyncio.create_task(server.run_copilot_job("job_cancel", "summarize", [f"opp_{i}" for i in range(100)]))
+            await asyncio.sleep(0.15)
+            await db.copilot_jobs.update_one({"job_id": "job_cancel"}, {"$set": {"cancel_requested": True}})
+            await asyncio.wait_for(job, 5)
+            return await db.copilot_jobs.find_one({"job_id": "job_cancel"}, {"_id": 0})
+
+        job = run_with_temp_db(monkeypatch, scenario)
+        assert job["status"] == "cancelled"
+        assert job["completed"] < 100
+        print(f"SUCCESS: job cancelled after {job['completed']} opportunities")
@@ -0,0 +1,119 @@
+"""
+AI Copilot Streaming Tests
+Tests for:
+1. POST /api/ai/copilot/stream returns text/event-stream with token and done events
+2. done event reports time-to-first-token (ttft_ms)
+3. Unknown opportunity / action are rejected before streaming starts
+4. Endpoint requires authentication
+
+Run the backend with LLM_PROVIDER=fake to exercise these without network access.
+"""
+
+import json
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def auth_session():
+    """Create authenticated session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "brian.clements@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+@pytest.fixture(scope="module")
+def test_opportunity(auth_session):
+    """Get an existing opportunity to test with"""
+    response = auth_session.get(f"{BASE_URL}/api/opportunities")
+    assert response.status_code == 200
+    opps = response.json()
+    assert len(opps) > 0, "No opportunities found for testing"
+    return opps[0]
+
+def read_events(response):
+    """Parse a server-sent event stream into a list of (event, data) tuples"""
+    events = []
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+class TestCopilotStream:
+    """Test SSE streaming of AI copilot responses"""
+
+    def test_stream_returns_tokens_and_done(self, auth_session, test_opportunity):
+        """Stream should emit token events followed by a done event"""
+        response = auth_session.post(
+            f"{BASE_URL}/api/ai/copilot/stream",
+            json={"action": "summarize", "opp_id": test_opportunity["opp_id"]},
+            stream=True
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = read_events(response)
+        names = [e for e, _ in events]
+        assert "token" in names, f"No token events received: {names}"
+        assert names[-1] in ("done", "error")
+
+        if names[-1] == "done":
+            done = events[-1][1]
+            assert done["opp_id"] == test_opportunity["opp_id"]
+            assert done["tokens"] == names.count("token")
+            assert done["ttft_ms"] is not None and done["ttft_ms"] <= done["total_ms"]
+            text = "".join(d["text"] for e, d in events if e == "token")
+            assert len(text) > 0
+            print(f"SUCCESS: streamed {done['tokens']} tokens, ttft={done['ttft_ms']}ms")
+
+    def test_stream_unknown_opportunity(self, auth_session):
+        """Unknown opportunity should return 404 before streaming"""
+        response = auth_session.post(
+            f"{BASE_URL}/api/ai/copilot/stream",
+            json={"action": "summarize", "opp_id": "opp_does_not_exist"}
+        )
+        assert response.status_code == 404
+        print("SUCCESS: unknown opportunity returns 404")
+
+    def test_stream_unknown_action(self, auth_session, test_opportunity):
+        """Unknown action should return 400 before streaming"""
+        response = auth_session.post(
+            f"{BASE_URL}/api/ai/copilot/stream",
+            json={"action": "not_an_action", "opp_id": test_opportunity["opp_id"]}
+        )
+        assert response.status_code == 400
+        print("SUCCESS: unknown action returns 400")
+
+    def test_stream_requires_auth(self, test_opportunity):
+        """Unauthenticated requests should be rejected"""
+        response = requests.post(
+            f"{BASE_URL}/api/ai/copilot/stream",
+            json={"action": "summarize", "opp_id": test_opportunity["opp_id"]}
+        )
+        assert response.status_code == 401
+        print("SUCCESS: stream requires authentication")
+
+    def test_client_disconnect_mid_stream(self, auth_session, test_opportunity):
+        """Closing the connection after the first token should not break the server"""
+        response = auth_session.post(
+            f"{BASE_URL}/api/ai/copilot/stream",
+            json={"action": "draft_email", "opp_id": test_opportunity["opp_id"]},
+            stream=True
+        )
+        assert response.status_code == 200
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("data: "):
+                break
+        response.close()
+
+        health = requests.get(f"{BASE_URL}/api/health")
+        assert health.status_code == 200
+        print("SUCCESS: server healthy after client disconnect")
@@ -0,0 +1,230 @@
+"""
+Change Log Tests
+Tests for:
+1. GET /api/changes returns events and a resumable next_token
+2. A write shows up as one compact event after the settle window
+3. The entities filter and limit/has_more paging
+4. Invalid tokens return 400; non-admins get 403
+5. Writes outside the CRM endpoints (users, bulk import) are logged too, and a note as notes create + org update
+6. In-process: the first append creates the capped collection, and an uncapped one is converted
+7. In-process: tailing the log delivers events appended by another writer (another process or a CLI)
+   (uses a throwaway database on MONGO_URL; skipped when no mongod is reachable)
+"""
+
+import asyncio
+import pytest
+import requests
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Events become readable once older than CHANGE_LOG_SETTLE_SECONDS (default 2), rounded up to whole seconds
+SETTLE_SECONDS = 3.5
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+@pytest.fixture(scope="module")
+def sales_session():
+    """Create authenticated sales lead session"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "brian.clements@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+def latest_token(session):
+    """Read to the end of the settled log"""
+    token = None
+    while True:
+        params = {"limit": 5000, **({"since": token} if token else {})}
+        data = session.get(f"{BASE_URL}/api/changes", params=params).json()
+        token = data["next_token"]
+        if not data["has_more"]:
+            return token
+
+class TestChangeLog:
+    """Test the change log consumer API"""
+
+    def test_write_is_logged(self, admin_session):
+        """An organization update appears once, with the changed fields"""
+        time.sleep(SETTLE_SECONDS)
+        token = latest_token(admin_session)
+        org = admin_session.get(f"{BASE_URL}/api/organizations").json()[0]
+        admin_session.put(f"{BASE_URL}/api/organizations/{org['org_id']}", json={"name": org["name"]})
+        time.sleep(SETTLE_SECONDS)
+
+        params = {"entities": "organizations", **({"since": token} if token else {})}
+        response = admin_session.get(f"{BASE_URL}/api/changes", params=params)
+        assert response.status_code == 200
+        events = [e for e in response.json()["events"] if e["id"] == org["org_id"]]
+        assert len(events) == 1
+        event = events[0]
+        assert event["op"] == "update"
+        assert event["fields"]["name"] == org["name"]
+        print(f"SUCCESS: logged {event['op']} {event['id']} as {event['event_id']}")
+
+    def test_user_and_import_writes_logged(self, admin_session):
+        """User create/delete and a bulk import leave events; no password hash is logged"""
+        time.sleep(SETTLE_SECONDS)
+        token = latest_token(admin_session)
+        suffix = int(time.time())
+        user = admin_session.post(
+            f"{BASE_URL}/api/auth/users",
+            json={"email": f"test_changes_{suffix}@example.com", "name": "TEST_Changes", "password": "TestPass123!", "role": "sales_lead"}
+        ).json()
+        admin_session.delete(f"{BASE_URL}/api/auth/users/{user['user_id']}")
+        response = admin_session.post(f"{BASE_URL}/api/import/organizations?format=csv",
+                                      data=f"name\nTEST_ChangesImport {suffix}\n".encode())
+        assert response.json()["inserted"] == 1
+        time.sleep(SETTLE_SECONDS)
+
+        params = {"entities": "users,organizations", **({"since": token} if token else {})}
+        events = admin_session.get(f"{BASE_URL}/api/changes", params=params).json()["events"]
+        user_ops = [e["op"] for e in events if e["entity"] == "users" and e["id"] == user["user_id"]]
+        assert user_ops == ["create", "delete"]
+        assert all("password_hash" not in (e["fields"] or {}) for e in events)
+        assert any(e["entity"] == "organizations" and e["op"] == "invalidate" for e in events)
+        print(f"SUCCESS: user and import writes logged ({len(events)} events)")
+
+    def test_note_logged(self, admin_session):
+        """A new note is a notes create event plus the org's notes_count/latest_note update"""
+        time.sleep(SETTLE_SECONDS)
+        token = latest_token(admin_session)
+        org = admin_session.get(f"{BASE_URL}/api/organizations").json()[0]
+        note = admin_session.post(f"{BASE_URL}/api/organizations/{org['org_id']}/notes", json={"text": "TEST_Changes note"}).json()
+        time.sleep(SETTLE_SECONDS)
+
+        params = {"entities": "notes,organizations", **({"since": token} if token else {})}
+        events = admin_session.get(f"{BASE_URL}/api/changes", params=params).json()["events"]
+        created = [e for e in events if e["entity"] == "notes" and e["id"] == note["note_id"]]
+        assert [e["op"] for e in created] == ["create"]
+        assert created[0]["fields"]["text"] == "TEST_Changes note"
+        updates = [e for e in events if e["entity"] == "organizations" and e["id"] == org["org_id"]]
+        assert updates and updates[-1]["op"] == "update"
+        assert updates[-1]["fields"]["latest_note"]["note_id"] == note["note_id"]
+        assert "notes_count" in updates[-1]["fields"] and "version" in updates[-1]["fields"]
+        print("SUCCESS: note logged as notes create and organizations update")
+
+    def test_resume_returns_nothing_new(self, admin_session):
+        """Resuming from the latest token returns no events and the same token"""
+        time.sleep(SETTLE_SECONDS)
+        token = latest_token(admin_session)
+        if not token:
+            pytest.skip("Change log is empty")
+        data = admin_session.get(f"{BASE_URL}/api/changes", params={"since": token, "entities": "nothing"}).json()
+        assert data["events"] == []
+        assert data["next_token"] == token
+        print("SUCCESS: resume from the latest token is empty")
+
+    def test_paging(self, admin_session):
+        """limit caps the batch and has_more says when to continue"""
+        data = admin_session.get(f"{BASE_URL}/api/changes", params={"limit": 1}).json()
+        assert len(data["events"]) <= 1
+        if data["events"]:
+            assert data["has_more"] is True
+            assert data["next_token"] == data["events"][0]["event_id"]
+        print("SUCCESS: change log paging")
+
+    def test_invalid_token(self, admin_session):
+        """Tokens must be event ids"""
+        response = admin_session.get(f"{BASE_URL}/api/changes", params={"since": "not-a-token"})
+        assert response.status_code == 400
+        print("SUCCESS: invalid token returns 400")
+
+    def test_admin_only(self, sales_session):
+        """Sales leads can't read the change log"""
+        response = sales_session.get(f"{BASE_URL}/api/changes")
+        assert response.status_code == 403
+        print("SUCCESS: change log is admin only")
+
+def run_with_temp_db(scenario):
+    """Run `scenario(db)` against a fresh database, dropping it afterwards"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000)
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            pytest.skip("No mongod reachable at MONGO_URL")
+        db = client[f"compassx_changelog_test_{uuid.uuid4().hex[:8]}"]
+        try:
+            return await scenario(db)
+        finally:
+            await client.drop_database(db.name)
+            client.close()
+    return asyncio.run(main())
+
+class TestChangeLogCollection:
+    """Test that writers outside the server still get a capped log"""
+
+    def test_first_append_creates_capped_collection(self):
+        """A CLI appending to a fresh database gets the capped collection, not an implicit one"""
+        from changelog import ChangeLog
+
+        async def scenario(db):
+            await ChangeLog(db, max_bytes=1024 * 1024).append([{"entity": "organizations", "op": "invalidate"}])
+            return await db.change_events.options()
+
+        options = run_with_temp_db(scenario)
+        assert options.get("capped") is True
+        print("SUCCESS: first append created a capped collection")
+
+    def test_uncapped_collection_converted(self):
+        """An uncapped change_events left by an older version is converted, keeping its events"""
+        from changelog import ChangeLog
+
+        async def scenario(db):
+            await db.change_events.insert_one({"entity": "contacts", "op": "invalidate"})
+            log = ChangeLog(db, max_bytes=1024 * 1024)
+            await log.ensure_collection()
+            return await db.change_events.options(), await db.change_events.count_documents({})
+
+        options, count = run_with_temp_db(scenario)
+        assert options.get("capped") is True
+        assert count == 1
+        print("SUCCESS: uncapped change log converted")
+
+    def test_tail_delivers_other_writers_events(self):
+        """Events appended through a separate ChangeLog reach the tailing one's callback"""
+        from changelog import ChangeLog
+
+        async def scenario(db):
+            follower, writer = ChangeLog(db, max_bytes=1024 * 1024), ChangeLog(db, max_bytes=1024 * 1024)
+            await follower.ensure_collection()
+            await writer.append([{"entity": "contacts", "op": "invalidate"}])
+            await asyncio.sleep(1.1)  # the tail starts at the current second, after that event
+            received, resyncs = [], []
+            follower.start(received.append, lambda: resyncs.append(True), retry_seconds=0.1)
+            await asyncio.sleep(0.5)
+            await writer.append([{"entity": "organizations", "op": "delete", "id": "org_tail"}])
+            for _ in range(50):
+                if received:
+                    break
+                await asyncio.sleep(0.1)
+            await follower.stop()
+            return received, resyncs
+
+        received, resyncs = run_with_temp_db(scenario)
+        assert [(e["entity"], e["id"]) for e in received] == [("organizations", "org_tail")]
+        assert "_id" not in received[0]
+        assert not resyncs
+        print("SUCCESS: tail delivered another writer's event")
@@ -0,0 +1,85 @@
+"""
+Response Compression Tests
+Tests for:
+1. gzip / brotli negotiation from Accept-Encoding
+2. Small responses are sent uncompressed
+3. Cached dashboard responses reuse their compressed bytes
+4. Streaming exports are not compressed
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+class TestCompression:
+    """Test content-coding negotiation"""
+
+    def test_gzip_dashboard(self, admin_session):
+        """Large JSON is gzipped when the client accepts gzip"""
+        response = admin_session.get(f"{BASE_URL}/api/dashboard/executive", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers.get("Content-Encoding") == "gzip"
+        assert "Accept-Encoding" in response.headers.get("Vary", "")
+        assert "opportunities" in response.json()
+        print(f"SUCCESS: dashboard gzipped to {response.headers.get('Content-Length')} bytes")
+
+    def test_brotli_preferred(self, admin_session):
+        """Brotli wins when both are accepted"""
+        response = admin_session.get(
+            f"{BASE_URL}/api/organizations",
+            headers={"Accept-Encoding": "gzip, br"},
+            stream=True
+        )
+        assert response.status_code == 200
+        if len(response.raw.read(decode_content=False)) >= 1024 or response.headers.get("Content-Encoding"):
+            assert response.headers.get("Content-Encoding") == "br"
+        print(f"SUCCESS: Content-Encoding {response.headers.get('Content-Encoding')}")
+
+    def test_identity(self, admin_session):
+        """No Accept-Encoding means no compression"""
+        response = admin_session.get(f"{BASE_URL}/api/dashboard/executive", headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+        print("SUCCESS: identity response uncompressed")
+
+    def test_small_response_uncompressed(self, admin_session):
+        """Bodies below the size threshold are sent as is"""
+        response = admin_session.get(f"{BASE_URL}/api/auth/me", headers={"Accept-Encoding": "gzip, br"})
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+        print("SUCCESS: small response not compressed")
+
+    def test_cached_compressed_hit(self, admin_session):
+        """A cache hit returns the same compressed bytes"""
+        url = f"{BASE_URL}/api/analytics/by-owner"
+        headers = {"Accept-Encoding": "gzip"}
+        first = admin_session.get(url, headers=headers, stream=True)
+        first_bytes = first.raw.read(decode_content=False)
+        second = admin_session.get(url, headers=headers, stream=True)
+        second_bytes = second.raw.read(decode_content=False)
+        assert second.headers.get("X-Cache") == "HIT"
+        assert first_bytes == second_bytes
+        print(f"SUCCESS: cached response reused ({len(second_bytes)} bytes)")
+
+    def test_export_stream_not_compressed(self, admin_session):
+        """Streaming exports flush rows uncompressed"""
+        response = admin_session.get(
+            f"{BASE_URL}/api/export/organizations?format=csv",
+            headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+        print("SUCCESS: export stream not compressed")
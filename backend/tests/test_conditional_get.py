@@ -0,0 +1,182 @@
+"""
+Conditional GET Tests
+Tests for:
+1. List endpoints return strong ETags and 304 for a current If-None-Match
+2. Detail endpoints derive ETags from updated_at and change after an update
+3. Pipelines/stages carry Cache-Control max-age
+4. Write generations shared through Mongo carry one process's writes to another
+5. Instances see identical snapshots (so identical ETags); unflushed writes and a wiped collection still change them
+"""
+
+import asyncio
+import pytest
+import requests
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from responses import CollectionVersions, SharedGenerations  # noqa: E402
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+class TestListETags:
+    """Test ETags on list endpoints"""
+
+    @pytest.mark.parametrize("path", ["/api/organizations", "/api/auth/users", "/api/pipelines", "/api/contacts"])
+    def test_not_modified(self, admin_session, path):
+        """Replaying the ETag returns 304 with no body"""
+        first = admin_session.get(f"{BASE_URL}{path}")
+        assert first.status_code == 200
+        etag = first.headers.get("ETag")
+        assert etag and etag.startswith('"')
+
+        second = admin_session.get(f"{BASE_URL}{path}", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        print(f"SUCCESS: {path} returned 304 for {etag}")
+
+    def test_write_changes_etag(self, admin_session):
+        """Creating a contact changes the contacts list ETag"""
+        etag = admin_session.get(f"{BASE_URL}/api/contacts").headers["ETag"]
+        org_id = admin_session.get(f"{BASE_URL}/api/organizations").json()[0]["org_id"]
+        created = admin_session.post(
+            f"{BASE_URL}/api/contacts",
+            json={"name": f"TEST_ETag {int(time.time())}", "email": "etag@example.com", "org_id": org_id}
+        )
+        assert created.status_code == 200
+        response = admin_session.get(f"{BASE_URL}/api/contacts", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        admin_session.delete(f"{BASE_URL}/api/contacts/{created.json()['contact_id']}")
+        print("SUCCESS: contacts ETag changed after a write")
+
+    def test_reference_data_cache_control(self, admin_session):
+        """Pipelines and stages may be reused by the browser for a while"""
+        pipelines = admin_session.get(f"{BASE_URL}/api/pipelines")
+        assert "max-age=" in pipelines.headers.get("Cache-Control", "")
+        pipeline_id = pipelines.json()[0]["pipeline_id"]
+        stages = admin_session.get(f"{BASE_URL}/api/pipelines/{pipeline_id}/stages")
+        assert "max-age=" in stages.headers.get("Cache-Control", "")
+        print(f"SUCCESS: {pipelines.headers['Cache-Control']}")
+
+    def test_requires_auth(self):
+        """A 304 still requires a valid session"""
+        response = requests.get(f"{BASE_URL}/api/organizations", headers={"If-None-Match": "*"})
+        assert response.status_code == 401
+        print("SUCCESS: conditional GET requires auth")
+
+class TestDetailETags:
+    """Test updated_at based ETags"""
+
+    def test_update_changes_etag(self, admin_session):
+        """An opportunity's ETag changes when it is updated"""
+        opps = admin_session.get(f"{BASE_URL}/api/opportunities").json()
+        if not opps:
+            pytest.skip("No opportunities")
+        url = f"{BASE_URL}/api/opportunities/{opps[0]['opp_id']}"
+        etag = admin_session.get(url).headers["ETag"]
+        assert admin_session.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        admin_session.put(url, json={"notes": f"etag test {time.time()}"})
+        response = admin_session.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        print("SUCCESS: detail ETag follows updated_at")
+
+    def test_missing_document(self, admin_session):
+        """Unknown ids still 404"""
+        response = admin_session.get(f"{BASE_URL}/api/opportunities/opp_does_not_exist", headers={"If-None-Match": "*"})
+        assert response.status_code == 404
+        print("SUCCESS: missing opportunity returns 404")
+
+class TestSharedGenerations:
+    """Test cross-process write generations against a throwaway database on MONGO_URL"""
+
+    def test_other_process_write_changes_snapshot(self):
+        """A write counted and flushed by one process changes the snapshot another process refreshes"""
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        async def scenario():
+            client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), serverSelectionTimeoutMS=1000)
+            try:
+                await client.admin.command("ping")
+            except Exception:
+                pytest.skip("No mongod reachable at MONGO_URL")
+            db = client[f"compassx_generations_test_{uuid.uuid4().hex[:8]}"]
+            try:
+                server = SharedGenerations(db.write_generations, CollectionVersions())
+                cli = SharedGenerations(db.write_generations, CollectionVersions())
+                await server.refresh()
+                before = server.snapshot(["contacts", "organizations"])
+
+                cli.versions.bump("contacts")
+                cli.versions.bump("contacts")
+                await cli.flush()
+                await cli.flush()  # nothing new to flush
+                await server.refresh()
+                return before, server.snapshot(["contacts", "organizations"])
+            finally:
+                await client.drop_database(db.name)
+                client.close()
+
+        before, after = asyncio.run(scenario())
+        assert before == (0, 0)
+        assert after == (1, 0), "One flush per batch of writes, other collections untouched"
+        print("SUCCESS: another process's write reached the shared generations")
+
+    def test_instances_share_snapshots(self):
+        """Two instances agree on snapshots; pending writes show until flushed; a wipe gets a new epoch"""
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        async def scenario():
+            client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), serverSelectionTimeoutMS=1000)
+            try:
+                await client.admin.command("ping")
+            except Exception:
+                pytest.skip("No mongod reachable at MONGO_URL")
+            db = client[f"compassx_generations_test_{uuid.uuid4().hex[:8]}"]
+            names = (SharedGenerations.EPOCH, "contacts")
+            try:
+                first = SharedGenerations(db.write_generations, CollectionVersions())
+                second = SharedGenerations(db.write_generations, CollectionVersions())
+                await first.refresh()
+                await second.refresh()
+                same = first.snapshot(names) == second.snapshot(names)
+
+                first.versions.bump("contacts")
+                pending = first.pending(["contacts"]), second.pending(["contacts"])
+                before_flush = first.snapshot(names)
+                await first.flush()
+                after_flush = first.snapshot(names), first.pending(["contacts"])
+                await second.refresh()
+                caught_up = second.snapshot(names) == first.snapshot(names)
+
+                await db.write_generations.drop()
+                await second.refresh()
+                return same, pending, before_flush, after_flush, caught_up, second.snapshot(names)
+            finally:
+                await client.drop_database(db.name)
+                client.close()
+
+        same, pending, before_flush, after_flush, caught_up, wiped = asyncio.run(scenario())
+        assert same
+        assert pending == ((("contacts", 1),), ())
+        assert after_flush[0] != before_flush and after_flush[1] == ()
+        assert caught_up
+        assert wiped[0] != before_flush[0] and wiped[1] == 0
+        print("SUCCESS: instances share snapshots")
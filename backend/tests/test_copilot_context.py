@@ -0,0 +1,86 @@
+"""
+Copilot Context Tests
+Tests for:
+1. build_copilot_context adds sections in priority order
+2. The section that overflows the token budget is cut at the budget and later sections are dropped
+3. Identical input always yields identical output
+
+Runs in-process on build_copilot_context; no backend or database needed.
+"""
+
+import copy
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "compassx_test")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+from server import build_copilot_context, estimate_tokens  # noqa: E402
+
+
+@pytest.fixture
+def opp():
+    """An opportunity as load_copilot_context returns it"""
+    return {
+        "name": "Data Platform Modernization",
+        "engagement_type": "Strategy",
+        "estimated_value": 250000,
+        "confidence_level": 60,
+        "target_close_date": "2026-12-15T00:00:00+00:00",
+        "value_hypothesis": "Consolidate reporting onto one platform",
+        "notes": "Sponsor wants a roadmap before budget season",
+        "org": {"name": "Acme Corp", "industry": "Manufacturing", "region": "North America"},
+        "contact": {"name": "Dana Lee", "title": "CIO", "buying_role": "Decision Maker"},
+        "stage": {"name": "Discovery", "order": 2, "win_probability": 20},
+        "activities": [
+            {"activity_type": "Meeting", "title": f"Workshop {i}", "status": "Completed",
+             "due_date": f"2026-09-{28 - i:02d}T00:00:00+00:00", "notes": "Reviewed current reporting stack"}
+            for i in range(20)
+        ],
+    }
+
+
+class TestCopilotContext:
+    """Test deterministic, budgeted context assembly"""
+
+    def test_sections_in_priority_order(self, opp):
+        """With room for everything, sections appear in priority order"""
+        context = build_copilot_context(opp, "Focus on timeline", token_budget=10_000)
+        markers = ["Opportunity:", "Additional Context:", "Value Hypothesis:", "Primary Contact:",
+                   "Notes:", "Recent Activities (newest first):", "Organization Profile:"]
+        positions = [context.index(marker) for marker in markers]
+        assert positions == sorted(positions)
+        assert "Workshop 19" in context
+        print("SUCCESS: sections in priority order")
+
+    def test_cut_at_budget(self, opp):
+        """The overflowing section is cut at whole lines and later sections are dropped"""
+        budget = 200
+        context = build_copilot_context(opp, token_budget=budget)
+        assert estimate_tokens(context) <= budget
+        assert "Value Hypothesis:" in context
+        assert "Recent Activities (newest first):" in context
+        assert context.endswith(" …")
+        assert "Workshop 0" in context and "Workshop 19" not in context
+        assert "Organization Profile:" not in context
+        print(f"SUCCESS: context cut to {estimate_tokens(context)} tokens")
+
+    def test_low_priority_sections_dropped_first(self, opp):
+        """A budget that only fits the opportunity facts drops everything after them"""
+        full = build_copilot_context(opp, token_budget=10_000)
+        facts_only = full[:full.index("\nValue Hypothesis:")]
+        context = build_copilot_context(opp, token_budget=estimate_tokens(facts_only) + 1)
+        assert context == facts_only
+        print("SUCCESS: only the opportunity facts fit")
+
+    def test_identical_input_identical_output(self, opp):
+        """The same opportunity always yields the same context"""
+        first = build_copilot_context(opp, "extra", token_budget=150)
+        second = build_copilot_context(copy.deepcopy(opp), "extra", token_budget=150)
+        assert first == second
+        print("SUCCESS: context is deterministic")
@@ -0,0 +1,56 @@
+"""
+DB Query Monitoring Tests
+Tests for:
+1. Every API response carries X-DB-Queries and X-DB-Time headers
+2. Query counts reflect the Mongo round trips a request makes
+3. Requests that don't touch Mongo report zero queries
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def auth_session():
+    """Create authenticated session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "brian.clements@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+class TestDBMonitoring:
+    """Test per-request Mongo query headers"""
+
+    def test_headers_present(self, auth_session):
+        """List endpoints should report their query count and DB time"""
+        response = auth_session.get(f"{BASE_URL}/api/opportunities")
+        assert response.status_code == 200
+        queries = int(response.headers["X-DB-Queries"])
+        db_time = float(response.headers["X-DB-Time"])
+        assert queries >= 2, "Expected at least the session lookup and the opportunities query"
+        assert db_time >= 0
+        print(f"SUCCESS: /opportunities made {queries} queries in {db_time}ms")
+
+    def test_health_has_no_queries(self):
+        """Health check doesn't touch Mongo"""
+        response = requests.get(f"{BASE_URL}/api/health")
+        assert response.status_code == 200
+        assert response.headers["X-DB-Queries"] == "0"
+        print("SUCCESS: health check reports zero queries")
+
+    def test_detail_cheaper_than_list(self, auth_session):
+        """A single-record fetch should not cost more round trips than the org list"""
+        orgs = auth_session.get(f"{BASE_URL}/api/organizations")
+        assert orgs.status_code == 200
+        if not orgs.json():
+            pytest.skip("No organizations to test with")
+        org_id = orgs.json()[0]["org_id"]
+        detail = auth_session.get(f"{BASE_URL}/api/organizations/{org_id}")
+        assert detail.status_code == 200
+        assert int(detail.headers["X-DB-Queries"]) <= int(orgs.headers["X-DB-Queries"])
+        print(f"SUCCESS: list {orgs.headers['X-DB-Queries']} vs detail {detail.headers['X-DB-Queries']} queries")
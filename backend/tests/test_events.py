@@ -0,0 +1,121 @@
+"""
+Change Events (SSE) Tests
+Tests for:
+1. GET /api/events opens a text/event-stream right away
+2. A write is pushed as a `change` event with entity, op, id and fields
+3. The entities filter drops other collections
+4. Unknown entities return 400; the stream requires auth
+"""
+
+import json
+import threading
+import time
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+def read_events(response, count, timeout=10):
+    """Collect `count` change events (as dicts) from an open SSE response"""
+    events = []
+    deadline = time.time() + timeout
+    event = {}
+    for line in response.iter_lines(decode_unicode=True):
+        if time.time() > deadline:
+            break
+        if line.startswith("event: "):
+            event["event"] = line[7:]
+        elif line.startswith("data: "):
+            event["data"] = json.loads(line[6:])
+        elif line.startswith("id: "):
+            event["id"] = line[4:]
+        elif not line and event:
+            if event.get("event") == "change":
+                events.append(event)
+                if len(events) >= count:
+                    break
+            event = {}
+    return events
+
+def delayed(fn, seconds=1.0):
+    """Run a write shortly after the stream has been opened"""
+    timer = threading.Timer(seconds, fn)
+    timer.start()
+    return timer
+
+class TestEvents:
+    """Test the /api/events stream"""
+
+    def test_stream_opens(self, admin_session):
+        """Headers and the retry hint arrive without waiting for a change"""
+        with admin_session.get(f"{BASE_URL}/api/events", stream=True, timeout=10) as response:
+            assert response.status_code == 200
+            assert response.headers["Content-Type"].startswith("text/event-stream")
+            first = next(response.iter_lines(decode_unicode=True))
+            assert first.startswith("retry:")
+        print("SUCCESS: event stream opened")
+
+    def test_change_event(self, admin_session):
+        """Updating an organization is pushed to subscribers"""
+        org = admin_session.get(f"{BASE_URL}/api/organizations").json()[0]
+        timer = delayed(lambda: admin_session.put(f"{BASE_URL}/api/organizations/{org['org_id']}",
+                                                  json={"name": org["name"]}))
+        with admin_session.get(f"{BASE_URL}/api/events", params={"entities": "organizations"},
+                               stream=True, timeout=15) as response:
+            events = read_events(response, 1)
+        timer.join()
+        assert events, "No change event received"
+        data = events[0]["data"]
+        assert data["entity"] == "organizations"
+        assert data["op"] == "update"
+        assert data["id"] == org["org_id"]
+        assert data["fields"]["name"] == org["name"]
+        assert ":" in events[0]["id"]
+        print(f"SUCCESS: received {data['op']} for {data['id']}")
+
+    def test_entities_filter(self, admin_session):
+        """A contacts-only subscriber doesn't see the organization update but does see a contact create"""
+        org = admin_session.get(f"{BASE_URL}/api/organizations").json()[0]
+        created = {}
+
+        def writes():
+            admin_session.put(f"{BASE_URL}/api/organizations/{org['org_id']}", json={"name": org["name"]})
+            created.update(admin_session.post(
+                f"{BASE_URL}/api/contacts",
+                json={"name": f"TEST_Events {int(time.time())}", "org_id": org["org_id"]}
+            ).json())
+
+        timer = delayed(writes)
+        with admin_session.get(f"{BASE_URL}/api/events", params={"entities": "contacts"},
+                               stream=True, timeout=15) as response:
+            events = read_events(response, 1)
+        timer.join()
+        admin_session.delete(f"{BASE_URL}/api/contacts/{created['contact_id']}")
+        assert events and events[0]["data"]["entity"] == "contacts"
+        assert events[0]["data"]["op"] == "create"
+        print("SUCCESS: entities filter applied")
+
+    def test_unknown_entity(self, admin_session):
+        """Filters must name entities that have change events"""
+        response = admin_session.get(f"{BASE_URL}/api/events", params={"entities": "invoices"})
+        assert response.status_code == 400
+        print("SUCCESS: unknown entity rejected")
+
+    def test_requires_auth(self):
+        """The stream requires a session"""
+        response = requests.get(f"{BASE_URL}/api/events", timeout=10)
+        assert response.status_code == 401
+        print("SUCCESS: events require auth")
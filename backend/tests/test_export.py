@@ -0,0 +1,162 @@
+"""
+Streaming Export Tests
+Tests for:
+1. GET /api/export/opportunities?format=csv streams a CSV with header and resolved names
+2. GET /api/export/activities?format=ndjson honours filter query params
+3. GET /api/export/organizations?format=xlsx returns an XLSX workbook
+4. Unknown collections / formats are rejected, auth is required
+5. Cells that start like a formula are escaped; XLSX strips control characters
+6. The XLSX temp file is removed even if streaming never starts
+"""
+
+import asyncio
+import csv
+import io
+import json
+import pytest
+import requests
+import os
+import sys
+from pathlib import Path
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def auth_session():
+    """Create authenticated session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "brian.clements@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+class TestExport:
+    """Test streaming exports"""
+
+    def test_export_opportunities_csv(self, auth_session):
+        """CSV export should include every opportunity plus resolved names"""
+        response = auth_session.get(f"{BASE_URL}/api/export/opportunities?format=csv")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        for column in ["opp_id", "name", "stage_id", "owner_name", "org_name", "stage_name"]:
+            assert column in rows[0], f"Missing column {column}"
+
+        opps = auth_session.get(f"{BASE_URL}/api/opportunities").json()
+        assert len(rows) >= len(opps)
+        print(f"SUCCESS: exported {len(rows)} opportunities as CSV")
+
+    def test_export_without_names(self, auth_session):
+        """resolve_names=false should omit the name columns"""
+        response = auth_session.get(f"{BASE_URL}/api/export/contacts?format=csv&resolve_names=false")
+        assert response.status_code == 200
+        header = response.text.splitlines()[0].split(",")
+        assert "contact_id" in header
+        assert "owner_name" not in header
+        print("SUCCESS: name resolution can be disabled")
+
+    def test_export_activities_ndjson_filtered(self, auth_session):
+        """NDJSON export should apply filters passed as query params"""
+        activities = auth_session.get(f"{BASE_URL}/api/activities").json()
+        with_opp = [a for a in activities if a.get("opp_id")]
+        if not with_opp:
+            pytest.skip("No activities linked to opportunities")
+        opp_id = with_opp[0]["opp_id"]
+
+        response = auth_session.get(f"{BASE_URL}/api/export/activities?format=ndjson&opp_id={opp_id}")
+        assert response.status_code == 200
+        docs = [json.loads(line) for line in response.text.splitlines() if line]
+        assert len(docs) > 0
+        assert all(d["opp_id"] == opp_id for d in docs)
+        print(f"SUCCESS: {len(docs)} activities exported for {opp_id}")
+
+    def test_export_organizations_xlsx(self, auth_session):
+        """XLSX export should return a zip-based workbook"""
+        response = auth_session.get(f"{BASE_URL}/api/export/organizations?format=xlsx")
+        assert response.status_code == 200
+        assert "spreadsheetml" in response.headers["content-type"]
+        assert response.content[:2] == b"PK"
+        print(f"SUCCESS: XLSX export {len(response.content)} bytes")
+
+    def test_export_rejects_unknown_collection(self, auth_session):
+        """Users and other collections are not exportable"""
+        response = auth_session.get(f"{BASE_URL}/api/export/users")
+        assert response.status_code == 404
+        print("SUCCESS: unknown collection rejected")
+
+    def test_export_rejects_unknown_format(self, auth_session):
+        """Only csv, ndjson and xlsx are supported"""
+        response = auth_session.get(f"{BASE_URL}/api/export/opportunities?format=pdf")
+        assert response.status_code == 400
+        print("SUCCESS: unknown format rejected")
+
+    def test_export_requires_auth(self):
+        """Unauthenticated export should be rejected"""
+        response = requests.get(f"{BASE_URL}/api/export/opportunities")
+        assert response.status_code == 401
+        print("SUCCESS: export requires authentication")
+
+@pytest.fixture(scope="module")
+def server_module():
+    """The server module, imported in-process (no backend or database needed)"""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "compassx_test")
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+    import server
+    return server
+
+async def as_rows(docs):
+    for doc in docs:
+        yield doc
+
+class TestExportCells:
+    """Test cell escaping and XLSX building in-process"""
+
+    def test_formula_prefixes_escaped(self, server_module):
+        """Strings starting with = + - @ are prefixed with a quote; numbers are untouched"""
+        for value in ("=HYPERLINK(\"http://x\")", "+1 555 0100", "-2+3", "@SUM(A1)"):
+            assert server_module.export_cell(value) == "'" + value
+        assert server_module.export_cell("Acme") == "Acme"
+        assert server_module.export_cell(-5) == -5
+        print("SUCCESS: formula prefixes escaped")
+
+    def test_csv_escapes_formulas(self, server_module):
+        """CSV rows carry the escaped value"""
+        async def build():
+            chunks = [c async for c in server_module.stream_csv(as_rows([{"name": "=1+1"}]), ["name"])]
+            return b"".join(chunks).decode()
+        rows = list(csv.reader(io.StringIO(asyncio.run(build()))))
+        assert rows == [["name"], ["'=1+1"]]
+        print("SUCCESS: CSV cell escaped")
+
+    def test_xlsx_strips_control_characters(self, server_module):
+        """Control characters are dropped instead of failing the workbook"""
+        from openpyxl import load_workbook
+        path = asyncio.run(server_module.build_xlsx(as_rows([{"name": "Acme\x00\x07 Corp", "notes": "=cmd"}]),
+                                                    ["name", "notes"], "organizations"))
+        try:
+            sheet = load_workbook(path).active
+            assert [c.value for c in sheet[2]] == ["Acme Corp", "'=cmd"]
+        finally:
+            server_module.remove_file(path)
+        print("SUCCESS: XLSX built with control characters stripped")
+
+    def test_xlsx_temp_file_removed(self, server_module):
+        """The temp file goes away when the stream is closed early, and removing it again is harmless"""
+        path = asyncio.run(server_module.build_xlsx(as_rows([{"name": "Acme"}]), ["name"], "organizations"))
+
+        async def read_one_chunk():
+            stream = server_module.stream_file(path, chunk_bytes=16)
+            await stream.__anext__()
+            await stream.aclose()
+
+        asyncio.run(read_one_chunk())
+        assert not os.path.exists(path)
+        # As the response's background task does after the stream
+        server_module.remove_file(path)
+        print("SUCCESS: XLSX temp file removed")
@@ -149,15 +149,15 @@ class TestOrganizationNotes:
         assert "created_by_name" in note_entry, "Note should have created_by_name"
         print(f"Note added: {note_entry}")
         
-        # Verify note appears in organization's notes_history
-        org_response = self.session.get(f"{BASE_URL}/api/organizations/{org_id}")
-        assert org_response.status_code == 200
-        org = org_response.json()
+        # Verify note is the newest in the organization's notes
+        notes_response = self.session.get(f"{BASE_URL}/api/organizations/{org_id}/notes")
+        assert notes_response.status_code == 200
+        notes = notes_response.json()["notes"]
+        assert notes and notes[0].get("text") == note_text, "Note should be first in organization's notes"
         
-        notes_history = org.get("notes_history") or []
-        matching_notes = [n for n in notes_history if n.get("text") == note_text]
-        assert len(matching_notes) > 0, "Note should be in organization's notes_history"
-        print(f"Verified note in notes_history for org {org_id}")
+        org = self.session.get(f"{BASE_URL}/api/organizations/{org_id}").json()
+        assert org["latest_note"]["note_id"] == note_entry["note_id"], "Org should show the note as latest_note"
+        print(f"Verified note in notes for org {org_id}")
     
     def test_add_empty_note_fails(self):
         """Test that adding an empty note returns an error"""
@@ -0,0 +1,156 @@
+"""
+LLM Provider Tests
+Tests for:
+1. CircuitBreaker transitions closed -> open -> half-open -> closed (and half-open -> open)
+2. ResilientProvider deadlines for complete() and stream() time-to-first-token
+3. Provider failures open the circuit and later calls are rejected without reaching the provider
+4. A stream abandoned by its consumer doesn't count as a failure
+
+Runs in-process against the fake provider; no backend, network or database needed.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_providers import (CircuitBreaker, CircuitOpenError, FakeProvider, LLMError, LLMTimeoutError,  # noqa: E402
+                           ResilientProvider)
+
+
+async def collect(stream):
+    return [token async for token in stream]
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_threshold(self):
+        """Consecutive failures up to the threshold open the circuit"""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        print("SUCCESS: closed -> open after 3 failures")
+
+    def test_success_resets_failure_count(self):
+        """A success between failures keeps the circuit closed"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        print("SUCCESS: success resets consecutive failures")
+
+    def test_half_open_trial_closes(self):
+        """After reset_timeout one trial call is allowed; its success closes the circuit"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        assert breaker.state == "open"
+        time.sleep(0.06)
+        assert breaker.state == "half_open"
+        breaker.before_call()
+        # Only one trial at a time
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        breaker.before_call()
+        print("SUCCESS: open -> half_open -> closed")
+
+    def test_half_open_trial_failure_reopens(self):
+        """A failed trial re-opens the circuit for another reset_timeout"""
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0.05)
+        for _ in range(5):
+            breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        print("SUCCESS: half_open -> open on failed trial")
+
+    def test_abandoned_trial_released(self):
+        """An abandoned trial lets the next call be the trial"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.release_trial()
+        breaker.before_call()
+        assert breaker.state == "half_open"
+        print("SUCCESS: abandoned trial released")
+
+
+class TestResilientProvider:
+    """Test call deadlines and breaker integration"""
+
+    def test_complete_within_deadline(self):
+        """A call inside the deadline returns the fake provider's reply and counts as ok"""
+        provider = ResilientProvider(FakeProvider(first_token_ms=5, token_ms=0), timeout=1)
+        result = asyncio.run(provider.complete("hello", "system", "s1"))
+        assert result == asyncio.run(FakeProvider(first_token_ms=0, token_ms=0).complete("hello", "system", "s1"))
+        assert provider.calls["ok"].value == 1
+        print("SUCCESS: complete within deadline")
+
+    def test_complete_timeout(self):
+        """A call slower than the deadline raises LLMTimeoutError and counts as a timeout"""
+        provider = ResilientProvider(FakeProvider(first_token_ms=500), timeout=0.05)
+        with pytest.raises(LLMTimeoutError):
+            asyncio.run(provider.complete("hello", "system", "s1"))
+        assert provider.calls["timeout"].value == 1
+        assert provider.breaker.failures == 1
+        print("SUCCESS: complete times out")
+
+    def test_stream_first_token_timeout(self):
+        """`timeout` bounds the wait for the first streamed token"""
+        provider = ResilientProvider(FakeProvider(first_token_ms=500), timeout=0.05, stream_timeout=5)
+        with pytest.raises(LLMTimeoutError):
+            asyncio.run(collect(provider.stream("hello", "system", "s1")))
+        assert provider.calls["timeout"].value == 1
+        print("SUCCESS: stream first-token deadline")
+
+    def test_stream_total_timeout(self):
+        """`stream_timeout` bounds the whole stream even while tokens keep arriving"""
+        provider = ResilientProvider(FakeProvider(first_token_ms=0, token_ms=20, num_tokens=50),
+                                     timeout=1, stream_timeout=0.2)
+        with pytest.raises(LLMTimeoutError):
+            asyncio.run(collect(provider.stream("hello", "system", "s1")))
+        print("SUCCESS: stream total deadline")
+
+    def test_failures_open_circuit(self):
+        """Once the breaker opens, calls are rejected without reaching the provider"""
+        provider = ResilientProvider(FakeProvider(first_token_ms=0, token_ms=0, error_rate=1.0),
+                                     breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        for _ in range(2):
+            with pytest.raises(LLMError):
+                asyncio.run(provider.complete("hello", "system", "s1"))
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(provider.complete("hello", "system", "s1"))
+        assert provider.calls["error"].value == 2
+        assert provider.calls["rejected"].value == 1
+        assert provider.stats()["circuit_state"] == "open"
+        print("SUCCESS: failures open the circuit")
+
+    def test_abandoned_stream_not_a_failure(self):
+        """Closing a stream early doesn't count against the provider"""
+        provider = ResilientProvider(FakeProvider(first_token_ms=0, token_ms=1))
+
+        async def read_one():
+            stream = provider.stream("hello", "system", "s1")
+            await stream.__anext__()
+            await stream.aclose()
+
+        asyncio.run(read_one())
+        assert provider.breaker.failures == 0
+        assert provider.calls["error"].value == 0
+        print("SUCCESS: abandoned stream not counted")
@@ -0,0 +1,60 @@
+"""
+Event Loop Monitor Tests
+Tests for:
+1. GET /api/debug/blocking reports lag stats and recent blocking episodes (admin only)
+2. Loop lag and blocking counters are exported on /api/metrics
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+class TestLoopMonitor:
+    """Test event-loop lag and blocking-call reporting"""
+
+    def test_blocking_report(self, admin_session):
+        """Report should include threshold, lag histogram and events list"""
+        response = admin_session.get(f"{BASE_URL}/api/debug/blocking")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["threshold_ms"] > 0
+        assert "p99" in data["lag"]
+        assert isinstance(data["events"], list)
+        for event in data["events"]:
+            assert event["duration_ms"] >= 0
+            assert isinstance(event["stack"], list)
+        print(f"SUCCESS: {data['blocked_total']} blocking episodes, lag p99 {data['lag']['p99']}")
+
+    def test_blocking_report_requires_admin(self):
+        """Sales users can't read stacks"""
+        session = requests.Session()
+        login = session.post(
+            f"{BASE_URL}/api/auth/login",
+            json={"email": "brian.clements@compassx.com", "password": "CompassX2026!"}
+        )
+        assert login.status_code == 200
+        response = session.get(f"{BASE_URL}/api/debug/blocking")
+        assert response.status_code == 403
+        print("SUCCESS: blocking report is admin only")
+
+    def test_lag_metrics_exported(self):
+        """Lag histogram and blocked counter should be on /api/metrics"""
+        headers = {"Authorization": f"Bearer {METRICS_TOKEN}"} if METRICS_TOKEN else {}
+        text = requests.get(f"{BASE_URL}/api/metrics", headers=headers).text
+        assert "event_loop_lag_seconds_bucket" in text
+        assert "event_loop_blocked_total" in text
+        print("SUCCESS: loop metrics exported")
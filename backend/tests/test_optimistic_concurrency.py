@@ -0,0 +1,140 @@
+"""
+Optimistic Concurrency Tests
+Tests for:
+1. Detail ETags carry the document version ("N.hash")
+2. PUT with a current If-Match succeeds and returns the new ETag
+3. PUT with a stale or weak If-Match returns 412
+4. PUT without If-Match still updates (last write wins)
+5. PUT on a missing document returns 404
+6. Creates return the stored document and its ETag without a re-read
+"""
+
+import pytest
+import requests
+import os
+import time
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+@pytest.fixture
+def contact(admin_session):
+    """A throwaway contact, deleted afterwards"""
+    org_id = admin_session.get(f"{BASE_URL}/api/organizations").json()[0]["org_id"]
+    response = admin_session.post(
+        f"{BASE_URL}/api/contacts",
+        json={"name": f"TEST_IfMatch {int(time.time())}", "org_id": org_id}
+    )
+    assert response.status_code == 200
+    created = response.json()
+    yield created
+    admin_session.delete(f"{BASE_URL}/api/contacts/{created['contact_id']}")
+
+def etag_of(session, contact_id):
+    response = session.get(f"{BASE_URL}/api/contacts/{contact_id}", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+class TestIfMatch:
+    """Test If-Match on contact updates"""
+
+    def test_new_document_version(self, admin_session, contact):
+        """A created contact starts at version 1 and its ETag says so"""
+        assert contact["version"] == 1
+        etag = etag_of(admin_session, contact["contact_id"])
+        assert etag.startswith('"1.')
+        print(f"SUCCESS: new contact ETag {etag}")
+
+    def test_create_returns_stored_document(self, admin_session, contact):
+        """The POST response is what a GET returns, with the same ETag"""
+        created = admin_session.post(
+            f"{BASE_URL}/api/contacts",
+            json={"name": contact["name"], "org_id": contact["org_id"]},
+            headers={"Accept-Encoding": "identity"}
+        )
+        assert created.status_code == 200
+        body = created.json()
+        fetched = admin_session.get(f"{BASE_URL}/api/contacts/{body['contact_id']}", headers={"Accept-Encoding": "identity"})
+        admin_session.delete(f"{BASE_URL}/api/contacts/{body['contact_id']}")
+        assert "_id" not in body
+        assert fetched.json() == body
+        assert created.headers["ETag"] == fetched.headers["ETag"]
+        print(f"SUCCESS: create returned {created.headers['ETag']}")
+
+    def test_current_if_match(self, admin_session, contact):
+        """A current If-Match updates and returns the next version's ETag"""
+        url = f"{BASE_URL}/api/contacts/{contact['contact_id']}"
+        etag = etag_of(admin_session, contact["contact_id"])
+        response = admin_session.put(url, json={"name": contact["name"], "org_id": contact["org_id"], "title": "CTO"},
+                                     headers={"If-Match": etag, "Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        assert response.json()["title"] == "CTO"
+        assert response.headers["ETag"].startswith('"2.')
+        assert response.headers["ETag"] == etag_of(admin_session, contact["contact_id"])
+        print(f"SUCCESS: {etag} -> {response.headers['ETag']}")
+
+    def test_stale_if_match(self, admin_session, contact):
+        """A second writer holding the old ETag gets 412 and changes nothing"""
+        url = f"{BASE_URL}/api/contacts/{contact['contact_id']}"
+        etag = etag_of(admin_session, contact["contact_id"])
+        first = admin_session.put(url, json={"name": contact["name"], "org_id": contact["org_id"], "title": "A"},
+                                  headers={"If-Match": etag})
+        assert first.status_code == 200
+        second = admin_session.put(url, json={"name": contact["name"], "org_id": contact["org_id"], "title": "B"},
+                                   headers={"If-Match": etag})
+        assert second.status_code == 412
+        assert admin_session.get(url).json()["title"] == "A"
+        print("SUCCESS: stale If-Match rejected with 412")
+
+    def test_weak_if_match(self, admin_session, contact):
+        """If-Match uses strong comparison, so a weak tag never matches"""
+        url = f"{BASE_URL}/api/contacts/{contact['contact_id']}"
+        etag = etag_of(admin_session, contact["contact_id"])
+        response = admin_session.put(url, json={"name": contact["name"], "org_id": contact["org_id"]},
+                                     headers={"If-Match": f"W/{etag}"})
+        assert response.status_code == 412
+        print("SUCCESS: weak If-Match rejected")
+
+    def test_without_if_match(self, admin_session, contact):
+        """Clients that don't send If-Match keep last-write-wins behaviour"""
+        url = f"{BASE_URL}/api/contacts/{contact['contact_id']}"
+        response = admin_session.put(url, json={"name": contact["name"], "org_id": contact["org_id"], "title": "VP"})
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        print("SUCCESS: unconditional PUT still works")
+
+    def test_missing_document(self, admin_session):
+        """A conditional PUT on a missing document is a 404, not a 412"""
+        response = admin_session.put(f"{BASE_URL}/api/contacts/contact_missing", json={"name": "x", "org_id": "x"},
+                                     headers={"If-Match": '"1.abc"'})
+        assert response.status_code == 404
+        print("SUCCESS: missing contact returns 404")
+
+class TestOpportunityIfMatch:
+    """Test If-Match on opportunity updates"""
+
+    def test_stale_opportunity_update(self, admin_session):
+        """Concurrent opportunity edits: the second one is rejected"""
+        opps = admin_session.get(f"{BASE_URL}/api/opportunities").json()
+        if not opps:
+            pytest.skip("No opportunities")
+        url = f"{BASE_URL}/api/opportunities/{opps[0]['opp_id']}"
+        etag = admin_session.get(url, headers={"Accept-Encoding": "identity"}).headers["ETag"]
+        notes = opps[0].get("notes")
+        first = admin_session.put(url, json={"notes": f"TEST_IfMatch {time.time()}"}, headers={"If-Match": etag})
+        assert first.status_code == 200
+        second = admin_session.put(url, json={"notes": "stale"}, headers={"If-Match": etag})
+        assert second.status_code == 412
+        admin_session.put(url, json={"notes": notes})
+        print("SUCCESS: stale opportunity update rejected")
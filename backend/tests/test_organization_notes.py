@@ -0,0 +1,108 @@
+"""
+Organization Notes Tests
+Tests for:
+1. GET /api/organizations/{org_id}/notes pages newest first with next_cursor
+2. The organization carries notes_count and latest_note instead of the full history
+3. Long notes are truncated in latest_note but kept whole in the notes list
+4. Reading or adding notes on a missing org returns 404; an invalid cursor returns 400
+5. A deleted organization's notes are gone with it
+"""
+
+import pytest
+import requests
+import os
+import time
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+@pytest.fixture
+def test_org(admin_session):
+    """A fresh organization, deleted after the test"""
+    response = admin_session.post(
+        f"{BASE_URL}/api/organizations",
+        json={"name": f"TEST_Notes {int(time.time() * 1000)}"}
+    )
+    assert response.status_code == 200, f"Failed to create org: {response.text}"
+    org = response.json()
+    yield org
+    admin_session.delete(f"{BASE_URL}/api/organizations/{org['org_id']}")
+
+class TestOrganizationNotes:
+    """Test notes stored outside the organization document"""
+
+    def test_notes_page_newest_first(self, admin_session, test_org):
+        """Notes come back newest first and the cursor walks through all of them"""
+        org_id = test_org["org_id"]
+        texts = [f"TEST note {i}" for i in range(5)]
+        for text in texts:
+            response = admin_session.post(f"{BASE_URL}/api/organizations/{org_id}/notes", json={"text": text})
+            assert response.status_code == 200, f"Add note failed: {response.text}"
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = admin_session.get(f"{BASE_URL}/api/organizations/{org_id}/notes", params=params)
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["notes"]) <= 2
+            seen.extend(n["text"] for n in data["notes"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        assert seen == list(reversed(texts))
+        print(f"SUCCESS: paged through {len(seen)} notes newest first")
+
+    def test_org_has_count_and_latest_note(self, admin_session, test_org):
+        """The org document keeps a count and a truncated preview of the newest note"""
+        org_id = test_org["org_id"]
+        long_text = "TEST " + "x" * 1000
+        note = admin_session.post(f"{BASE_URL}/api/organizations/{org_id}/notes", json={"text": long_text}).json()
+
+        org = admin_session.get(f"{BASE_URL}/api/organizations/{org_id}").json()
+        assert "notes_history" not in org
+        assert org["notes_count"] == 1
+        assert org["latest_note"]["note_id"] == note["note_id"]
+        assert len(org["latest_note"]["text"]) < len(long_text)
+
+        notes = admin_session.get(f"{BASE_URL}/api/organizations/{org_id}/notes").json()["notes"]
+        assert notes[0]["text"] == long_text
+        print(f"SUCCESS: org shows notes_count=1 and a {len(org['latest_note']['text'])}-char preview")
+
+    def test_delete_org_deletes_notes(self, admin_session):
+        """Notes go away with their organization"""
+        org = admin_session.post(f"{BASE_URL}/api/organizations", json={"name": f"TEST_Notes delete {int(time.time())}"}).json()
+        admin_session.post(f"{BASE_URL}/api/organizations/{org['org_id']}/notes", json={"text": "TEST note"})
+        admin_session.delete(f"{BASE_URL}/api/organizations/{org['org_id']}")
+
+        response = admin_session.get(f"{BASE_URL}/api/organizations/{org['org_id']}/notes")
+        assert response.status_code == 404
+        print("SUCCESS: deleting the org deleted its notes")
+
+    def test_missing_org(self, admin_session):
+        """Adding or reading notes of an unknown org returns 404"""
+        response = admin_session.post(f"{BASE_URL}/api/organizations/org_missing/notes", json={"text": "TEST note"})
+        assert response.status_code == 404
+        response = admin_session.get(f"{BASE_URL}/api/organizations/org_missing/notes")
+        assert response.status_code == 404
+        print("SUCCESS: missing org returns 404")
+
+    def test_invalid_cursor(self, admin_session, test_org):
+        """A malformed cursor returns 400"""
+        response = admin_session.get(
+            f"{BASE_URL}/api/organizations/{test_org['org_id']}/notes",
+            params={"cursor": "not-a-cursor"}
+        )
+        assert response.status_code == 400
+        print("SUCCESS: invalid cursor returns 400")
@@ -0,0 +1,108 @@
+"""
+Profiling Endpoint Tests
+Tests for:
+1. POST /api/debug/profile returns collapsed stacks or JSON samples (admin only)
+2. tracemalloc start / snapshot / diff / stop lifecycle
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+class TestCPUProfile:
+    """Test the sampling CPU profiler"""
+
+    def test_collapsed_profile(self, admin_session):
+        """Collapsed output is one 'frame;frame count' line per stack"""
+        response = admin_session.post(f"{BASE_URL}/api/debug/profile?seconds=1")
+        assert response.status_code == 200
+        assert "attachment" in response.headers.get("Content-Disposition", "")
+        lines = response.text.strip().splitlines()
+        assert len(lines) > 0
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+        print(f"SUCCESS: {len(lines)} distinct stacks")
+
+    def test_json_profile(self, admin_session):
+        """JSON output reports sample counts"""
+        response = admin_session.post(f"{BASE_URL}/api/debug/profile?seconds=0.5&format=json&loop_only=true")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["samples"] > 0
+        assert all(s["count"] > 0 for s in data["stacks"])
+        print(f"SUCCESS: {data['samples']} samples")
+
+    def test_profile_duration_capped(self, admin_session):
+        """Overlong profiles are rejected"""
+        response = admin_session.post(f"{BASE_URL}/api/debug/profile?seconds=100000")
+        assert response.status_code == 400
+        print("SUCCESS: profile duration capped")
+
+    def test_profile_requires_admin(self):
+        """Sales users can't profile the process"""
+        session = requests.Session()
+        login = session.post(
+            f"{BASE_URL}/api/auth/login",
+            json={"email": "brian.clements@compassx.com", "password": "CompassX2026!"}
+        )
+        assert login.status_code == 200
+        response = session.post(f"{BASE_URL}/api/debug/profile?seconds=1")
+        assert response.status_code == 403
+        print("SUCCESS: profiling is admin only")
+
+class TestTracemalloc:
+    """Test allocation snapshots and diffs"""
+
+    def test_snapshot_diff_lifecycle(self, admin_session):
+        """Start, generate some traffic, snapshot, diff, stop"""
+        start = admin_session.post(f"{BASE_URL}/api/debug/tracemalloc/start")
+        assert start.status_code == 200
+        base = start.json()["snapshot"]["snapshot_id"]
+
+        for _ in range(5):
+            admin_session.get(f"{BASE_URL}/api/opportunities")
+
+        snapshot = admin_session.post(f"{BASE_URL}/api/debug/tracemalloc/snapshots")
+        assert snapshot.status_code == 200
+        current = snapshot.json()["snapshot_id"]
+
+        diff = admin_session.get(f"{BASE_URL}/api/debug/tracemalloc/diff", params={"base": base, "current": current})
+        assert diff.status_code == 200
+        for stat in diff.json()["stats"]:
+            assert "size_diff_bytes" in stat
+            assert stat["traceback"][0]["file"]
+
+        top = admin_session.get(f"{BASE_URL}/api/debug/tracemalloc/snapshots/{current}?limit=5")
+        assert top.status_code == 200
+        assert len(top.json()["stats"]) <= 5
+
+        stop = admin_session.post(f"{BASE_URL}/api/debug/tracemalloc/stop")
+        assert stop.status_code == 200
+        assert stop.json()["tracing"] is False
+        print(f"SUCCESS: diffed {base} -> {current}")
+
+    def test_snapshot_requires_tracing(self, admin_session):
+        """Snapshots need tracemalloc running"""
+        admin_session.post(f"{BASE_URL}/api/debug/tracemalloc/stop")
+        response = admin_session.post(f"{BASE_URL}/api/debug/tracemalloc/snapshots")
+        assert response.status_code == 409
+        print("SUCCESS: snapshot without tracing returns 409")
+
+    def test_unknown_snapshot(self, admin_session):
+        """Diffing a missing snapshot returns 404"""
+        response = admin_session.get(f"{BASE_URL}/api/debug/tracemalloc/diff", params={"base": "snap_x", "current": "snap_y"})
+        assert response.status_code == 404
+        print("SUCCESS: unknown snapshot returns 404")
@@ -0,0 +1,95 @@
+"""
+JSON Response Pipeline Tests
+Tests for:
+1. Responses are JSON with ISO datetimes (orjson encoder)
+2. Dashboard/analytics responses are served from the encoded-response cache (X-Cache)
+3. Writes to a collection a cached response reads invalidate it
+"""
+
+import pytest
+import requests
+import os
+import time
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+class TestJSONEncoding:
+    """Test the orjson response path"""
+
+    def test_json_content_type(self, admin_session):
+        """Plain endpoint results are JSON"""
+        response = admin_session.get(f"{BASE_URL}/api/opportunities")
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("application/json")
+        assert isinstance(response.json(), list)
+        print("SUCCESS: opportunities encoded as JSON")
+
+    def test_datetime_encoding(self, admin_session):
+        """Model datetimes come back as ISO 8601 strings"""
+        response = admin_session.post(
+            f"{BASE_URL}/api/organizations",
+            json={"name": f"TEST_Encoding {int(time.time())}"}
+        )
+        assert response.status_code == 200
+        org = response.json()
+        assert "T" in org["created_at"] and org["created_at"].endswith("+00:00")
+        admin_session.delete(f"{BASE_URL}/api/organizations/{org['org_id']}")
+        print(f"SUCCESS: created_at {org['created_at']}")
+
+class TestResponseCache:
+    """Test cached dashboard/analytics responses"""
+
+    def test_repeat_request_hits_cache(self, admin_session):
+        """Second identical request is a cache hit with the same body"""
+        url = f"{BASE_URL}/api/analytics/engagement-types?owner_id=cache_test_{int(time.time())}"
+        first = admin_session.get(url)
+        second = admin_session.get(url)
+        assert first.status_code == 200 and second.status_code == 200
+        assert first.headers.get("X-Cache") == "MISS"
+        assert second.headers.get("X-Cache") == "HIT"
+        assert first.content == second.content
+        print("SUCCESS: second request served from cache")
+
+    def test_write_invalidates_cache(self, admin_session):
+        """Updating an opportunity refreshes the dashboard"""
+        admin_session.get(f"{BASE_URL}/api/dashboard/executive")
+        opps = admin_session.get(f"{BASE_URL}/api/opportunities").json()
+        if not opps:
+            pytest.skip("No opportunities to update")
+        opp = opps[0]
+        marker = f"cache test {time.time()}"
+        update = admin_session.put(f"{BASE_URL}/api/opportunities/{opp['opp_id']}", json={"notes": marker})
+        assert update.status_code == 200
+
+        response = admin_session.get(f"{BASE_URL}/api/dashboard/executive")
+        assert response.status_code == 200
+        assert response.headers.get("X-Cache") == "MISS"
+        updated = next(o for o in response.json()["opportunities"] if o["opp_id"] == opp["opp_id"])
+        assert updated["notes"] == marker
+        print("SUCCESS: write invalidated cached dashboard")
+
+    def test_per_user_dashboard(self, admin_session):
+        """My Pipeline is cached per user"""
+        session = requests.Session()
+        login = session.post(
+            f"{BASE_URL}/api/auth/login",
+            json={"email": "brian.clements@compassx.com", "password": "CompassX2026!"}
+        )
+        assert login.status_code == 200
+        admin_pipeline = admin_session.get(f"{BASE_URL}/api/dashboard/my-pipeline").json()
+        sales_pipeline = session.get(f"{BASE_URL}/api/dashboard/my-pipeline").json()
+        admin_ids = {o["opp_id"] for o in admin_pipeline["opportunities"]}
+        sales_ids = {o["opp_id"] for o in sales_pipeline["opportunities"]}
+        assert not admin_ids & sales_ids
+        print("SUCCESS: my-pipeline not shared between users")
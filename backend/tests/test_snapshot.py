@@ -0,0 +1,103 @@
+"""
+Parquet Snapshot Tests
+Tests for:
+1. write_snapshot dumps a collection to Parquet with typed columns that read back
+2. An unchanged collection is skipped on the next run (streaming-hash path, no dbHash)
+3. A changed collection, a schema version change or --force rewrites the file
+
+Runs snapshot.py in-process against a throwaway database on MONGO_URL
+(default mongodb://localhost:27017); skipped when no mongod is reachable.
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "compassx_test")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+import pyarrow as pa  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+import snapshot  # noqa: E402
+
+ORGS = [
+    {"org_id": f"org_{i}", "name": f"Org {i}", "industry": "Manufacturing", "strategic_tier": "Active",
+     "notes_count": i, "created_at": f"2026-01-0{i + 1}T00:00:00+00:00"}
+    for i in range(3)
+]
+
+
+def run_with_temp_db(monkeypatch, scenario):
+    """Run `scenario(db)` against a fresh database bound into snapshot.py, dropping it afterwards"""
+    async def main():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000)
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            pytest.skip("No mongod reachable at MONGO_URL")
+        db = client[f"compassx_snapshot_test_{uuid.uuid4().hex[:8]}"]
+        monkeypatch.setattr(snapshot, "db", db)
+        try:
+            await db.organizations.insert_many([dict(org) for org in ORGS])
+            return await scenario(db)
+        finally:
+            await client.drop_database(db.name)
+            client.close()
+    return asyncio.run(main())
+
+
+class TestSnapshot:
+    """Test dump and unchanged-skip of Parquet snapshots"""
+
+    def test_round_trip(self, monkeypatch, tmp_path):
+        """Rows and typed columns read back from the Parquet file"""
+        async def scenario(db):
+            return await snapshot.write_snapshot("organizations", str(tmp_path), {}, chunk_size=2, force=False)
+
+        entry = run_with_temp_db(monkeypatch, scenario)
+        assert entry["status"] == "written"
+        assert entry["rows"] == 3 and entry["row_groups"] == 2
+
+        table = pq.read_table(tmp_path / "organizations.parquet")
+        assert table.column("org_id").to_pylist() == ["org_0", "org_1", "org_2"]
+        assert table.schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+        assert pa.types.is_dictionary(table.schema.field("industry").type)
+        assert table.column("notes_count").to_pylist() == [0, 1, 2]
+        assert table.schema.metadata[b"schema_version"] == str(snapshot.SCHEMA_VERSION).encode()
+        print(f"SUCCESS: {entry['rows']} rows round-tripped")
+
+    def test_unchanged_skipped_with_streaming_hash(self, monkeypatch, tmp_path):
+        """Without dbHash the streamed sha256 decides; unchanged data leaves the file alone"""
+        async def no_server_hash(collection):
+            return None
+        monkeypatch.setattr(snapshot, "server_hash", no_server_hash)
+
+        async def scenario(db):
+            out = str(tmp_path)
+            first = await snapshot.write_snapshot("organizations", out, {}, chunk_size=10, force=False)
+            second = await snapshot.write_snapshot("organizations", out, first, chunk_size=10, force=False)
+            forced = await snapshot.write_snapshot("organizations", out, first, chunk_size=10, force=True)
+            stale = await snapshot.write_snapshot("organizations", out, {**first, "schema_version": 0},
+                                                  chunk_size=10, force=False)
+            await db.organizations.update_one({"org_id": "org_1"}, {"$set": {"name": "Renamed"}})
+            changed = await snapshot.write_snapshot("organizations", out, first, chunk_size=10, force=False)
+            return first, second, forced, stale, changed
+
+        first, second, forced, stale, changed = run_with_temp_db(monkeypatch, scenario)
+        assert first["hash"].startswith("sha256:")
+        assert second["status"] == "skipped" and second["hash"] == first["hash"]
+        assert forced["status"] == "written"
+        assert stale["status"] == "written"
+        assert changed["status"] == "written" and changed["hash"] != first["hash"]
+        assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")], "Temp files should be cleaned up"
+        names = pq.read_table(tmp_path / "organizations.parquet").column("name").to_pylist()
+        assert names == ["Org 0", "Renamed", "Org 2"]
+        print("SUCCESS: unchanged collection skipped, changes rewritten")
@@ -0,0 +1,117 @@
+"""
+Delta Sync Tests
+Tests for:
+1. GET /api/sync without a token returns every CRM collection and a sync token
+2. Replaying the token returns only documents changed since
+3. Deleted ids come back as tombstones, including cascaded activities
+4. Paging with a small limit reaches every document
+5. Invalid tokens return 400
+6. Imported rows reach delta sync even when they carry an old updated_at
+"""
+
+import json
+import pytest
+import requests
+import os
+import time
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Changes younger than the server's SYNC_SETTLE_SECONDS (default 2) wait for the next sync
+SETTLE_SECONDS = 2.5
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+def sync_all(session, token=None, limit=None):
+    """Follow has_more to the end; returns (changes by collection, deleted by collection, token)"""
+    changes, deleted = {}, {}
+    while True:
+        params = {k: v for k, v in (("since", token), ("limit", limit)) if v}
+        response = session.get(f"{BASE_URL}/api/sync", params=params)
+        assert response.status_code == 200, response.text
+        data = response.json()
+        for name, docs in data["changes"].items():
+            changes.setdefault(name, []).extend(docs)
+        for name, ids in data["deleted"].items():
+            deleted.setdefault(name, []).extend(ids)
+        token = data["sync_token"]
+        if not data["has_more"]:
+            return changes, deleted, token
+
+class TestSync:
+    """Test the delta sync endpoint"""
+
+    def test_full_sync(self, admin_session):
+        """A first sync returns all four collections and a token"""
+        response = admin_session.get(f"{BASE_URL}/api/sync")
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data["changes"]) == {"organizations", "contacts", "opportunities", "activities"}
+        assert data["full"] is True
+        assert data["sync_token"]
+        print(f"SUCCESS: full sync returned {', '.join(f'{k}={len(v)}' for k, v in data['changes'].items())}")
+
+    def test_delta_and_tombstones(self, admin_session):
+        """Only the changed contact comes back, then its deletion as a tombstone"""
+        _, _, token = sync_all(admin_session)
+        org_id = admin_session.get(f"{BASE_URL}/api/organizations").json()[0]["org_id"]
+        created = admin_session.post(
+            f"{BASE_URL}/api/contacts",
+            json={"name": f"TEST_Sync {int(time.time())}", "org_id": org_id}
+        ).json()
+        time.sleep(SETTLE_SECONDS)
+
+        changes, deleted, token = sync_all(admin_session, token)
+        assert [c["contact_id"] for c in changes["contacts"]] == [created["contact_id"]]
+        assert not deleted["contacts"]
+
+        admin_session.delete(f"{BASE_URL}/api/contacts/{created['contact_id']}")
+        time.sleep(SETTLE_SECONDS)
+        changes, deleted, _ = sync_all(admin_session, token)
+        assert deleted["contacts"] == [created["contact_id"]]
+        assert not changes["contacts"]
+        print("SUCCESS: delta returned the new contact, then its tombstone")
+
+    def test_paging(self, admin_session):
+        """limit=2 pages through the same documents as one large sync"""
+        everything, _, _ = sync_all(admin_session)
+        paged, _, _ = sync_all(admin_session, limit=2)
+        assert {d["org_id"] for d in paged["organizations"]} == {d["org_id"] for d in everything["organizations"]}
+        assert {d["opp_id"] for d in paged["opportunities"]} == {d["opp_id"] for d in everything["opportunities"]}
+        print(f"SUCCESS: paged sync saw {len(paged['opportunities'])} opportunities")
+
+    def test_import_with_old_updated_at(self, admin_session):
+        """An export -> import round trip keeps old updated_at values; the import stamps its own"""
+        _, _, token = sync_all(admin_session)
+        name = f"TEST_SyncImport {int(time.time())}"
+        row = {"name": name, "updated_at": "2020-01-01T00:00:00+00:00"}
+        response = admin_session.post(f"{BASE_URL}/api/import/organizations?format=ndjson",
+                                      data=(json.dumps(row) + "\n").encode())
+        assert response.status_code == 200 and response.json()["inserted"] == 1, response.text
+        time.sleep(SETTLE_SECONDS)
+
+        changes, _, _ = sync_all(admin_session, token)
+        assert [o["name"] for o in changes["organizations"]] == [name]
+        assert changes["organizations"][0]["updated_at"] > "2020-01-01T00:00:00+00:00"
+        print("SUCCESS: imported organization reached delta sync")
+
+    def test_invalid_token(self, admin_session):
+        """A token that doesn't decode is rejected"""
+        response = admin_session.get(f"{BASE_URL}/api/sync", params={"since": "not-a-token"})
+        assert response.status_code == 400
+        print("SUCCESS: invalid sync token returns 400")
+
+    def test_requires_auth(self):
+        """Sync requires a session"""
+        response = requests.get(f"{BASE_URL}/api/sync")
+        assert response.status_code == 401
+        print("SUCCESS: sync requires auth")
@@ -0,0 +1,204 @@
+"""
+Synthetic Data Generator Tests
+Tests for:
+1. POST /api/seed/synthetic bulk-loads the requested volumes and reports throughput
+2. Generated opportunities reference generated organizations and real pipeline stages
+3. Requests above SYNTHETIC_MAX_DOCS or without organizations are rejected
+4. Only admins can generate data
+5. Rerunning a seed without clear is rejected with 409 instead of duplicating entities
+6. The generator is deterministic: same seed and anchor give identical documents; seeds never share ids
+7. A failed batch stops the load with no writes left running, and the event loop stays responsive meanwhile
+   (throwaway database on MONGO_URL; skipped when no mongod is reachable)
+"""
+
+import asyncio
+import random
+import uuid
+import pytest
+import requests
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "compassx_test")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+def generated(docs: list, id_field: str, prefix: str, seed: int) -> list:
+    """Documents generated with `seed`: the seed in hex followed by an 8-digit row number"""
+    start = f"{prefix}_{seed:04x}"
+    return [d for d in docs if d[id_field].startswith(start) and len(d[id_field]) == len(start) + 8]
+
+@pytest.fixture(scope="module")
+def seed():
+    """Fresh seed per run; a seed whose data already exists is rejected"""
+    return random.randint(1, 2 ** 32)
+
+class TestSyntheticData:
+    """Test the synthetic data generator endpoint"""
+
+    def test_generate_small_dataset(self, admin_session, seed):
+        """Small volumes should be inserted exactly and reported per collection"""
+        response = admin_session.post(
+            f"{BASE_URL}/api/seed/synthetic",
+            json={"organizations": 5, "contacts": 20, "opportunities": 30, "activities": 60, "seed": seed}
+        )
+        assert response.status_code == 200, response.text
+        report = response.json()
+        assert report["seed"] == seed
+        expected = {"organizations": 5, "contacts": 20, "opportunities": 30, "activities": 60}
+        for collection, count in expected.items():
+            assert report["collections"][collection]["inserted"] == count
+            assert "docs_per_second" in report["collections"][collection]
+        print(f"SUCCESS: generated 115 docs in {report['seconds']}s")
+
+    def test_generated_opportunities_are_consistent(self, admin_session, seed):
+        """Generated opportunities should point at generated orgs and real stages"""
+        opps = generated(admin_session.get(f"{BASE_URL}/api/opportunities").json(), "opp_id", "opp", seed)
+        assert len(opps) == 30
+
+        pipelines = admin_session.get(f"{BASE_URL}/api/pipelines").json()
+        stage_ids = set()
+        for pipeline in pipelines:
+            stages = admin_session.get(f"{BASE_URL}/api/pipelines/{pipeline['pipeline_id']}/stages").json()
+            stage_ids.update(s["stage_id"] for s in stages)
+
+        for opp in opps:
+            assert generated([opp], "org_id", "org", seed)
+            assert opp["stage_id"] in stage_ids
+            assert 0 <= opp["confidence_level"] <= 100
+            assert opp["estimated_value"] > 0
+        print(f"SUCCESS: {len(opps)} generated opportunities are consistent")
+
+    def test_rerun_same_seed_rejected(self, admin_session, seed):
+        """A second run with the same seed would reuse its ids, so it's rejected"""
+        response = admin_session.post(
+            f"{BASE_URL}/api/seed/synthetic",
+            json={"organizations": 5, "contacts": 0, "opportunities": 0, "activities": 0, "seed": seed}
+        )
+        assert response.status_code == 409
+        orgs = generated(admin_session.get(f"{BASE_URL}/api/organizations").json(), "org_id", "org", seed)
+        assert len(orgs) == 5, "No duplicates should have been inserted"
+        print("SUCCESS: rerun of the same seed rejected")
+
+    def test_rejects_oversized_request(self, admin_session):
+        """Requests above the per-request cap should point at the CLI"""
+        response = admin_session.post(f"{BASE_URL}/api/seed/synthetic", json={"activities": 100_000_000})
+        assert response.status_code == 400
+        assert "generate_data.py" in response.json()["detail"]
+        print("SUCCESS: oversized request rejected")
+
+    def test_rejects_contacts_without_orgs(self, admin_session):
+        """Contacts can't be generated without organizations"""
+        response = admin_session.post(
+            f"{BASE_URL}/api/seed/synthetic",
+            json={"organizations": 0, "contacts": 5, "opportunities": 0, "activities": 0}
+        )
+        assert response.status_code == 400
+        print("SUCCESS: contacts without organizations rejected")
+
+    def test_requires_admin(self):
+        """Sales users can't generate data"""
+        session = requests.Session()
+        login = session.post(
+            f"{BASE_URL}/api/auth/login",
+            json={"email": "brian.clements@compassx.com", "password": "CompassX2026!"}
+        )
+        assert login.status_code == 200
+        response = session.post(f"{BASE_URL}/api/seed/synthetic", json={"organizations": 1})
+        assert response.status_code == 403
+        print("SUCCESS: non-admin rejected")
+
+def generate(seed: int) -> dict:
+    """Generate a small dataset in memory, without writing it"""
+    from server import SyntheticDataGenerator
+    stages = [{"stage_id": f"stage_{i}", "pipeline_id": "pipe_default", "name": name, "order": i, "win_probability": p}
+              for i, (name, p) in enumerate([("Discovery", 20), ("Proposal", 60), ("Closed – Won", 100), ("Closed – Lost", 0)])]
+    generator = SyntheticDataGenerator(["user_b", "user_a"], stages, seed=seed,
+                                       anchor=datetime(2026, 6, 1, tzinfo=timezone.utc))
+    return {
+        "organizations": list(generator.organizations(5)),
+        "contacts": list(generator.contacts(20)),
+        "opportunities": list(generator.opportunities(30)),
+        "activities": list(generator.activities(60)),
+    }
+
+class TestSyntheticGenerator:
+    """Test generator determinism in-process (no backend or database needed)"""
+
+    def test_same_seed_identical_documents(self):
+        """Two runs with the same seed and anchor produce identical documents"""
+        first, second = generate(7), generate(7)
+        assert first == second
+        assert generate(8) != first
+        print("SUCCESS: same seed, identical documents")
+
+    def test_seeds_never_share_ids(self):
+        """Seeds that differ only above 16 bits still get distinct ids"""
+        low, high = generate(0x1234), generate(0x1234 + 0x10000)
+        for collection, id_field in [("organizations", "org_id"), ("contacts", "contact_id"),
+                                     ("opportunities", "opp_id"), ("activities", "activity_id")]:
+            low_ids = {d[id_field] for d in low[collection]}
+            assert len(low_ids) == len(low[collection])
+            assert low_ids.isdisjoint(d[id_field] for d in high[collection])
+        print("SUCCESS: ids are unique per seed")
+
+    def test_failed_batch_leaves_nothing_running(self, monkeypatch):
+        """A duplicate in one batch raises 409 after the other in-flight writes finished"""
+        import server
+        from fastapi import HTTPException
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        async def scenario():
+            client = AsyncIOMotorClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000)
+            try:
+                await client.admin.command("ping")
+            except Exception:
+                pytest.skip("No mongod reachable at MONGO_URL")
+            db = client[f"compassx_synthetic_test_{uuid.uuid4().hex[:8]}"]
+            monkeypatch.setattr(server, "db", db)
+            try:
+                stages = [{"stage_id": "stage_0", "pipeline_id": "pipe_default", "name": "Discovery", "order": 0, "win_probability": 20}]
+                generator = server.SyntheticDataGenerator(["user_a"], stages, seed=9, batch_size=50, concurrency=4,
+                                                          anchor=datetime(2026, 6, 1, tzinfo=timezone.utc))
+                await db.organizations.create_index("org_id", unique=True)
+                await db.organizations.insert_one({"org_id": generator._id("org", 120)})
+                ticks = 0
+
+                async def ticker():
+                    nonlocal ticks
+                    while True:
+                        ticks += 1
+                        await asyncio.sleep(0)
+
+                ticking = asyncio.create_task(ticker())
+                with pytest.raises(HTTPException) as e:
+                    await generator.load("organizations", generator.organizations(2000))
+                ticking.cancel()
+                count = await db.organizations.count_documents({})
+                await asyncio.sleep(0.2)
+                return e.value.status_code, count, await db.organizations.count_documents({}), ticks
+            finally:
+                await client.drop_database(db.name)
+                client.close()
+
+        status, count, later, ticks = asyncio.run(scenario())
+        assert status == 409
+        assert count == later < 2000, "No batch should still be inserting after the error"
+        assert ticks > 1, "Other tasks should run while batches are generated"
+        print(f"SUCCESS: load stopped at {count} documents")
@@ -0,0 +1,158 @@
+"""
+Request Tracing Tests
+Tests for:
+1. Responses carry X-Trace-Id and traceparent headers
+2. An incoming traceparent keeps its trace id; its sampled flag is only honoured with TRACE_TRUST_PARENT
+3. GET /api/debug/traces/{trace_id} returns the span tree (admin only)
+4. A long streamed response isn't counted as slow; a slow-to-start one is
+5. The JSONL exporter rotates its file at max_bytes and keeps `backups` old files
+"""
+
+import asyncio
+import pytest
+import requests
+import os
+import sys
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tracing import JSONLExporter, Tracer, TracingMiddleware  # noqa: E402
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+@pytest.fixture(scope="module")
+def admin_session():
+    """Create authenticated admin session for all tests"""
+    session = requests.Session()
+    login_response = session.post(
+        f"{BASE_URL}/api/auth/login",
+        json={"email": "seth.cushing@compassx.com", "password": "CompassX2026!"}
+    )
+    assert login_response.status_code == 200, f"Login failed: {login_response.text}"
+    return session
+
+class TestTracing:
+    """Test trace propagation and the trace lookup endpoint"""
+
+    def test_trace_headers(self, admin_session):
+        """Every response should name its trace"""
+        response = admin_session.get(f"{BASE_URL}/api/organizations")
+        assert response.status_code == 200
+        trace_id = response.headers.get("X-Trace-Id")
+        assert trace_id and len(trace_id) == 32
+        assert response.headers["traceparent"].startswith(f"00-{trace_id}-")
+        print(f"SUCCESS: trace id {trace_id}")
+
+    def test_sampled_trace_span_tree(self, admin_session):
+        """A sampled incoming traceparent should be exported with request, auth and handler spans"""
+        trace_id = uuid.uuid4().hex
+        response = admin_session.get(
+            f"{BASE_URL}/api/organizations",
+            headers={"traceparent": f"00-{trace_id}-{'1' * 16}-01"}
+        )
+        assert response.status_code == 200
+        assert response.headers["X-Trace-Id"] == trace_id
+        if not response.headers["traceparent"].endswith("-01"):
+            pytest.skip("server doesn't trust incoming traceparent flags (TRACE_TRUST_PARENT)")
+
+        trace = admin_session.get(f"{BASE_URL}/api/debug/traces/{trace_id}")
+        assert trace.status_code == 200
+        spans = trace.json()["spans"]
+        names = [s["name"] for s in spans]
+        assert "GET /api/organizations" in names
+        assert "get_current_user" in names
+        assert "handler get_organizations" in names
+        assert "serialize response" in names
+        root = next(s for s in spans if s["name"] == "GET /api/organizations")
+        assert root["parent_id"] == "1" * 16
+        assert all(s["trace_id"] == trace_id for s in spans)
+        print(f"SUCCESS: {len(spans)} spans: {names}")
+
+    def test_unknown_trace(self, admin_session):
+        """Unsampled or unknown traces return 404"""
+        response = admin_session.get(f"{BASE_URL}/api/debug/traces/{'0' * 32}")
+        assert response.status_code == 404
+        print("SUCCESS: unknown trace returns 404")
+
+    def test_traces_require_admin(self):
+        """Sales users can't read traces"""
+        session = requests.Session()
+        login = session.post(
+            f"{BASE_URL}/api/auth/login",
+            json={"email": "brian.clements@compassx.com", "password": "CompassX2026!"}
+        )
+        assert login.status_code == 200
+        response = session.get(f"{BASE_URL}/api/debug/traces/{'0' * 32}")
+        assert response.status_code == 403
+        print("SUCCESS: traces are admin only")
+
+def streaming_app(first_delay: float, stream_seconds: float):
+    """ASGI app that waits `first_delay`, starts a response, then streams for `stream_seconds`"""
+    async def app(scope, receive, send):
+        await asyncio.sleep(first_delay)
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        await send({"type": "http.response.body", "body": b"data: 1\n\n", "more_body": True})
+        await asyncio.sleep(stream_seconds)
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return app
+
+def run_request(app, headers=(), **tracer_options) -> Tracer:
+    tracer = Tracer(**{"sample_rate": 0, "slow_ms": 100, **tracer_options})
+    middleware = TracingMiddleware(app, tracer)
+    scope = {"type": "http", "method": "GET", "path": "/api/events", "headers": list(headers)}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    asyncio.run(middleware(scope, receive, send))
+    return tracer
+
+class TestTracingInProcess:
+    """Test the slow rule for streams and JSONL rotation (no backend needed)"""
+
+    def test_long_stream_not_slow(self):
+        """A stream that starts quickly isn't exported however long it stays open"""
+        tracer = run_request(streaming_app(first_delay=0, stream_seconds=0.3))
+        assert not tracer.recent
+        print("SUCCESS: long-lived stream not counted as slow")
+
+    def test_slow_to_start_stream_exported(self):
+        """A stream that takes longer than slow_ms to start is exported, timed to its start"""
+        tracer = run_request(streaming_app(first_delay=0.15, stream_seconds=0.3))
+        (spans,) = tracer.recent.values()
+        root = spans[0]
+        assert root["attributes"]["http.streamed"] is True
+        assert 150 <= root["duration_ms"] < 400
+        print(f"SUCCESS: slow-to-start stream exported ({root['duration_ms']}ms)")
+
+    def test_parent_sampled_flag_needs_trust(self):
+        """A client's sampled traceparent keeps its trace id but only forces export when trusted"""
+        trace_id = uuid.uuid4().hex
+        headers = [(b"traceparent", f"00-{trace_id}-{'1' * 16}-01".encode())]
+        app = streaming_app(first_delay=0, stream_seconds=0)
+
+        tracer = run_request(app, headers)
+        assert not tracer.recent
+
+        tracer = run_request(app, headers, trust_parent=True)
+        (spans,) = tracer.recent.values()
+        assert spans[0]["trace_id"] == trace_id
+        assert spans[0]["parent_id"] == "1" * 16
+        print("SUCCESS: incoming sampled flag honoured only with trust_parent")
+
+    def test_jsonl_rotation(self, tmp_path):
+        """The trace file is rotated at max_bytes and only `backups` old files are kept"""
+        path = tmp_path / "traces.jsonl"
+        exporter = JSONLExporter(str(path), max_bytes=200, backups=2)
+        spans = [{"trace_id": "t" * 32, "span_id": "s" * 16, "name": "x" * 150}]
+        for _ in range(5):
+            exporter.write([spans])
+        exporter.close()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["traces.jsonl.1", "traces.jsonl.2"]
+        assert all(p.stat().st_size < 400 for p in tmp_path.iterdir())
+        print("SUCCESS: trace file rotated with 2 backups")
@@ -0,0 +1,426 @@
+"""Lightweight request tracing.
+
+Spans form a tree per request: the HTTP request itself, `get_current_user`,
+the route handler, response serialization, every Mongo command (through a
+pymongo CommandListener) and LLM calls. The current span lives in a context
+variable, which Motor copies onto its executor threads, so Mongo spans
+attach to whichever span issued the command.
+
+A trace is exported when it was sampled (TRACE_SAMPLE_RATE) or when the
+request took longer than the slow threshold, so slow requests can be
+drilled into after the fact. An incoming W3C `traceparent` always keeps its
+trace id, but its sampled flag is only honoured with TRACE_TRUST_PARENT,
+since any client can send one. For streamed responses (SSE, exports) the request span ends when
+the response starts, so a long-lived stream doesn't count as slow; spans
+from later in the stream are still part of the trace. Exporters write
+size-capped, rotated JSONL files or post OTLP/HTTP JSON to a collector
+from a background thread. The trace id is returned in `X-Trace-Id` and
+`traceparent` response headers.
+"""
+
+import asyncio
+import collections
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+logger = logging.getLogger("tracing")
+
+SERVICE_NAME = "compassx-backend"
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: str = "internal",
+                 attributes: Optional[dict] = None, start_ns: Optional[int] = None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            self.trace.add(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """Finished spans of one request; spans may end on Motor executor threads"""
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        # Set when the route handler returns; serialization is timed from here
+        self.handler_end_ns: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Child span of the current span; a no-op outside a traced request"""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent.span_id, kind, attributes)
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        current_span.reset(token)
+        child.end()
+
+
+class Tracer:
+    def __init__(self, exporter=None, sample_rate: float = 0.0, slow_ms: float = 1000, buffer_size: int = 200,
+                 trust_parent: bool = False):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.trust_parent = trust_parent
+        self.slow_ms = slow_ms
+        # Recently exported traces, for GET /api/debug/traces/{trace_id}
+        self.recent: "collections.OrderedDict[str, List[dict]]" = collections.OrderedDict()
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+
+    def should_sample(self, parent_sampled: Optional[bool] = None) -> bool:
+        """Sampling decision for a new request; the caller's flag counts only when trusted"""
+        if parent_sampled is not None and self.trust_parent:
+            return parent_sampled
+        return random.random() < self.sample_rate
+
+    def finish(self, root: Span) -> None:
+        """Called when the request span ends: keep sampled or slow traces"""
+        trace = root.trace
+        duration_ms = (root.end_ns - root.start_ns) / 1e6
+        if not (trace.sampled or duration_ms >= self.slow_ms):
+            return
+        spans = [s.to_dict() for s in sorted(trace.spans, key=lambda s: s.start_ns)]
+        with self._lock:
+            self.recent[trace.trace_id] = spans
+            while len(self.recent) > self.buffer_size:
+                self.recent.popitem(last=False)
+        if self.exporter is not None:
+            self.exporter.export(trace.trace_id, spans)
+
+    def get(self, trace_id: str) -> Optional[List[dict]]:
+        with self._lock:
+            return self.recent.get(trace_id)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator: run an async function inside a span"""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(span_name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def parse_traceparent(value: Optional[str]):
+    """(trace_id, parent span id, sampled) from a W3C traceparent header, or None"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or parts[1] == "0" * 32:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span and returning the trace id"""
+
+    def __init__(self, app, tracer: Tracer, enabled: bool = True):
+        self.app = app
+        self.tracer = tracer
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        if incoming:
+            trace_id, parent_id, parent_sampled = incoming
+        else:
+            trace_id, parent_id, parent_sampled = os.urandom(16).hex(), None, None
+        sampled = self.tracer.should_sample(parent_sampled)
+        trace = Trace(trace_id, sampled)
+        root = Span(trace, f"{scope['method']} {scope['path']}", parent_id, "server",
+                    {"http.method": scope["method"], "http.target": scope["path"]})
+        token = current_span.set(root)
+        response_start_ns = None
+
+        async def send_with_trace(message):
+            nonlocal response_start_ns
+            if message["type"] == "http.response.start":
+                response_start_ns = time.time_ns()
+                root.attributes["http.status_code"] = message["status"]
+                extra = [(b"x-trace-id", trace_id.encode()),
+                         (b"traceparent", f"00-{trace_id}-{root.span_id}-{'01' if sampled else '00'}".encode())]
+                message = {**message, "headers": list(message.get("headers", [])) + extra}
+            elif message["type"] == "http.response.body" and message.get("more_body"):
+                root.attributes["http.streamed"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException as e:
+            root.error = type(e).__name__
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+                root.attributes["http.route"] = route.path
+            root.end(response_start_ns if root.attributes.get("http.streamed") else None)
+            self.tracer.finish(root)
+
+
+class TracedRoute(APIRoute):
+    """APIRoute that times the endpoint and the response serialization separately"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        endpoint = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint):
+            name = f"handler {self.name}"
+
+            @functools.wraps(endpoint)
+            async def traced_endpoint(*a, **kw):
+                with span(name) as handler_span:
+                    try:
+                        return await endpoint(*a, **kw)
+                    finally:
+                        if handler_span is not None:
+                            handler_span.trace.handler_end_ns = time.time_ns()
+
+            self.dependant.call = traced_endpoint
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            response = await handler(request)
+            root = current_span.get()
+            if root is not None and root.trace.handler_end_ns is not None:
+                Span(root.trace, "serialize response", root.span_id, start_ns=root.trace.handler_end_ns).end()
+            return response
+
+        return traced_handler
+
+
+class TracingCommandListener(monitoring.CommandListener):
+    """One client span per Mongo command, parented to the span that issued it"""
+
+    def __init__(self):
+        self._inflight: Dict[tuple, Span] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        parent = current_span.get()
+        if parent is None:
+            return
+        collection = event.command.get(event.command_name)
+        span = Span(parent.trace, f"mongo {event.command_name}", parent.span_id, "client", {
+            "db.system": "mongodb",
+            "db.name": event.database_name,
+            "db.operation": event.command_name,
+            "db.mongodb.collection": collection if isinstance(collection, str) else None,
+        })
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = span
+
+    def _finish(self, event, error: Optional[str] = None):
+        with self._lock:
+            span = self._inflight.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.error = error
+            span.end(span.start_ns + event.duration_micros * 1000)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure.get("codeName") or "error"))
+
+
+class BackgroundExporter:
+    """Hands finished traces to a worker thread so exporting never blocks a request"""
+
+    def __init__(self, max_queue: int = 1000, batch_size: int = 50, flush_interval: float = 2.0):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name=f"{type(self).__name__}", daemon=True)
+        self._thread.start()
+
+    def export(self, trace_id: str, spans: List[dict]) -> None:
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued traces and stop the worker"""
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self.queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                stopping = True
+                batch.pop()
+            if not batch:
+                continue
+            try:
+                self.write(batch)
+            except Exception as e:
+                logger.warning(f"Trace export failed ({len(batch)} traces): {e}")
+
+    def write(self, batch: List[List[dict]]) -> None:
+        raise NotImplementedError
+
+
+class JSONLExporter(BackgroundExporter):
+    """One JSON object per trace: {trace_id, spans}.
+
+    Once the file reaches `max_bytes` it is rotated to <path>.1 (older files
+    shift to .2 ... .<backups>, the oldest is dropped), so at most
+    (backups + 1) * max_bytes are kept on disk.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024, backups: int = 2, **kwargs):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        super().__init__(**kwargs)
+
+    def write(self, batch):
+        with open(self.path, "a") as f:
+            for spans in batch:
+                f.write(json.dumps({"trace_id": spans[0]["trace_id"], "spans": spans}, default=str) + "\n")
+            size = f.tell()
+        if size >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self) -> None:
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+OTLP_KIND = {"internal": 1, "server": 2, "client": 3}
+
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPExporter(BackgroundExporter):
+    """Posts OTLP/HTTP JSON to a collector, e.g. http://localhost:4318/v1/traces"""
+
+    def __init__(self, endpoint: str, **kwargs):
+        self.endpoint = endpoint
+        self.client = httpx.Client(timeout=5)
+        super().__init__(**kwargs)
+
+    def write(self, batch):
+        spans = []
+        for trace_spans in batch:
+            for s in trace_spans:
+                span = {
+                    "traceId": s["trace_id"],
+                    "spanId": s["span_id"],
+                    "name": s["name"],
+                    "kind": OTLP_KIND.get(s["kind"], 1),
+                    "startTimeUnixNano": str(s["start_ns"]),
+                    "endTimeUnixNano": str(s["start_ns"] + int(s["duration_ms"] * 1e6)),
+                    "attributes": [{"key": k, "value": otlp_value(v)} for k, v in s["attributes"].items() if v is not None],
+                    "status": {"code": 2, "message": s["error"]} if s["error"] else {"code": 1},
+                }
+                if s["parent_id"]:
+                    span["parentSpanId"] = s["parent_id"]
+                spans.append(span)
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "compassx.tracing"}, "spans": spans}],
+        }]}
+        self.client.post(self.endpoint, json=payload).raise_for_status()
+
+    def close(self, timeout: float = 5.0) -> None:
+        super().close(timeout)
+        self.client.close()
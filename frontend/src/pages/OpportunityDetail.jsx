@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
 import Sidebar from '@/components/layout/Sidebar';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
@@ -87,30 +87,41 @@ const OpportunityDetail = () => {
   // AI Copilot state
   const [aiLoading, setAiLoading] = useState(null);
   const [aiResponse, setAiResponse] = useState(null);
+  const aiAbortRef = useRef(null);
 
   useEffect(() => {
     fetchData();
   }, [oppId]);
 
+  // Stop any in-flight copilot stream when leaving the page
+  useEffect(() => () => aiAbortRef.current?.abort(), []);
+
   const fetchData = async () => {
     try {
-      const [oppRes, activitiesRes, pipelinesRes, usersRes] = await Promise.all([
+      const [oppRes, activitiesRes, pipelinesRes, usersRes, aiResultsRes] = await Promise.all([
         fetch(`${API}/opportunities/${oppId}`, { credentials: 'include' }),
         fetch(`${API}/activities?opp_id=${oppId}`, { credentials: 'include' }),
         fetch(`${API}/pipelines`, { credentials: 'include' }),
-        fetch(`${API}/auth/users`, { credentials: 'include' })
+        fetch(`${API}/auth/users`, { credentials: 'include' }),
+        fetch(`${API}/ai/copilot/results/${oppId}`, { credentials: 'include' })
       ]);
       
       const oppData = await oppRes.json();
       const activitiesData = await activitiesRes.json();
       const pipelines = await pipelinesRes.json();
       const usersData = await usersRes.json();
+      const aiResults = aiResultsRes.ok ? await aiResultsRes.json() : [];
       
       setOpportunity(oppData);
       setEditData(oppData);
       setActivities(activitiesData);
       setUsers(usersData);
       
+      // Show the latest precomputed copilot result (e.g. from the weekly batch run)
+      if (aiResults.length > 0) {
+        setAiResponse({ action: aiResults[0].action, result: aiResults[0].result });
+      }
+      
       if (pipelines.length > 0) {
         const defaultPipeline = pipelines.find(p => p.is_default) || pipelines[0];
         const stagesRes = await fetch(`${API}/pipelines/${defaultPipeline.pipeline_id}/stages`, { credentials: 'include' });
@@ -240,29 +251,60 @@ const OpportunityDetail = () => {
   };
 
   const handleAICopilot = async (action) => {
+    aiAbortRef.current?.abort();
+    const controller = new AbortController();
+    aiAbortRef.current = controller;
     setAiLoading(action);
     setAiResponse(null);
     
     try {
-      const response = await fetch(`${API}/ai/copilot`, {
+      const response = await fetch(`${API}/ai/copilot/stream`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         credentials: 'include',
+        signal: controller.signal,
         body: JSON.stringify({
           action,
           opp_id: oppId
         })
       });
       
-      if (!response.ok) throw new Error('AI service error');
+      if (!response.ok || !response.body) throw new Error('AI service error');
       
-      const data = await response.json();
-      setAiResponse({ action, result: data.result });
+      // Parse server-sent events and append tokens as they arrive
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let result = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const raw of events) {
+          const eventLine = raw.split('\n').find((line) => line.startsWith('event: '));
+          const dataLine = raw.split('\n').find((line) => line.startsWith('data: '));
+          if (!eventLine || !dataLine) continue;
+          const event = eventLine.slice(7);
+          const data = JSON.parse(dataLine.slice(6));
+          if (event === 'token') {
+            result += data.text;
+            setAiResponse({ action, result });
+          } else if (event === 'error') {
+            throw new Error(data.detail);
+          }
+        }
+      }
     } catch (error) {
+      if (error.name === 'AbortError') return;
       console.error('AI Copilot error:', error);
       toast.error('AI service temporarily unavailable');
     } finally {
-      setAiLoading(null);
+      if (aiAbortRef.current === controller) {
+        aiAbortRef.current = null;
+        setAiLoading(null);
+      }
     }
   };
 
@@ -121,6 +121,8 @@ const OrganizationDetail = () => {
   });
   
   const [newNote, setNewNote] = useState('');
+  const [notes, setNotes] = useState([]);
+  const [notesCursor, setNotesCursor] = useState(null);
   const [orgSummary, setOrgSummary] = useState({ buyer: null, opportunities: { count: 0, total_value: 0, avg_confidence: 0 } });
 
   useEffect(() => {
@@ -129,14 +131,15 @@ const OrganizationDetail = () => {
 
   const fetchData = async () => {
     try {
-      const [orgRes, contactsRes, oppsRes, usersRes, pipelinesRes, activitiesRes, summaryRes] = await Promise.all([
+      const [orgRes, contactsRes, oppsRes, usersRes, pipelinesRes, activitiesRes, summaryRes, notesRes] = await Promise.all([
         fetch(`${API}/organizations/${orgId}`, { credentials: 'include' }),
         fetch(`${API}/contacts?org_id=${orgId}`, { credentials: 'include' }),
         fetch(`${API}/opportunities`, { credentials: 'include' }),
         fetch(`${API}/auth/users`, { credentials: 'include' }),
         fetch(`${API}/pipelines`, { credentials: 'include' }),
         fetch(`${API}/activities?org_id=${orgId}`, { credentials: 'include' }),
-        fetch(`${API}/organizations/${orgId}/summary`, { credentials: 'include' })
+        fetch(`${API}/organizations/${orgId}/summary`, { credentials: 'include' }),
+        fetch(`${API}/organizations/${orgId}/notes`, { credentials: 'include' })
       ]);
       
       const orgData = await orgRes.json();
@@ -146,6 +149,7 @@ const OrganizationDetail = () => {
       const pipelines = await pipelinesRes.json();
       const activitiesData = await activitiesRes.json();
       const summaryData = summaryRes.ok ? await summaryRes.json() : { buyer: null, opportunities: { count: 0, total_value: 0, avg_confidence: 0 } };
+      const notesData = notesRes.ok ? await notesRes.json() : { notes: [], next_cursor: null };
       
       setOrganization(orgData);
       setEditData(orgData);
@@ -154,6 +158,8 @@ const OrganizationDetail = () => {
       setUsers(usersData);
       setActivities(activitiesData);
       setOrgSummary(summaryData);
+      setNotes(notesData.notes);
+      setNotesCursor(notesData.next_cursor);
       
       // Get stages for opportunity creation
       if (pipelines.length > 0) {
@@ -394,9 +400,11 @@ const OrganizationDetail = () => {
       const noteEntry = await response.json();
       
       // Update local state
+      setNotes(prev => [noteEntry, ...prev]);
       setOrganization(prev => ({
         ...prev,
-        notes_history: [...(prev.notes_history || []), noteEntry]
+        notes_count: (prev.notes_count || 0) + 1,
+        latest_note: noteEntry
       }));
       setNewNote('');
       toast.success('Note added');
@@ -406,6 +414,23 @@ const OrganizationDetail = () => {
     }
   };
 
+  const handleLoadMoreNotes = async () => {
+    try {
+      const response = await fetch(`${API}/organizations/${orgId}/notes?cursor=${encodeURIComponent(notesCursor)}`, {
+        credentials: 'include'
+      });
+      
+      if (!response.ok) throw new Error('Failed to load notes');
+      
+      const data = await response.json();
+      setNotes(prev => [...prev, ...data.notes]);
+      setNotesCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Error loading notes:', error);
+      toast.error('Failed to load notes');
+    }
+  };
+
   const getStatusColor = (status) => {
     switch (status) {
       case 'Current': return 'bg-emerald-100 text-emerald-700';
@@ -835,7 +860,7 @@ const OrganizationDetail = () => {
             <CardHeader>
               <CardTitle className="text-lg font-heading flex items-center gap-2">
                 <FileText className="w-5 h-5 text-slate-400" />
-                Notes
+                Notes{organization.notes_count > 0 && ` (${organization.notes_count})`}
               </CardTitle>
             </CardHeader>
             <CardContent>
@@ -860,9 +885,9 @@ const OrganizationDetail = () => {
               
               {/* Notes History */}
               <div className="space-y-3 max-h-64 overflow-y-auto">
-                {organization.notes_history?.length > 0 ? (
-                  [...organization.notes_history].reverse().map((note, idx) => (
-                    <div key={idx} className="p-3 bg-slate-50 rounded-lg">
+                {notes.length > 0 ? (
+                  notes.map((note) => (
+                    <div key={note.note_id} className="p-3 bg-slate-50 rounded-lg">
                       <p className="text-sm text-slate-700">{note.text}</p>
                       <div className="flex items-center gap-2 mt-2 text-xs text-slate-400">
                         <span>{note.created_by_name || 'Unknown'}</span>
@@ -884,6 +909,17 @@ const OrganizationDetail = () => {
                 ) : (
                   <p className="text-sm text-slate-400 italic text-center py-4">No notes yet</p>
                 )}
+                {notesCursor && (
+                  <Button
+                    variant="ghost"
+                    size="sm"
+                    onClick={handleLoadMoreNotes}
+                    className="w-full text-slate-500"
+                    data-testid="load-more-notes-btn"
+                  >
+                    Load older notes
+                  </Button>
+                )}
               </div>
             </CardContent>
           </GlassCard>
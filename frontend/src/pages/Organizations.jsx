@@ -489,13 +489,11 @@ const Organizations = () => {
                         </div>
                         
                         {/* Latest Note Preview */}
-                        {(org.notes_history?.length > 0 || org.notes) && (
+                        {(org.latest_note || org.notes) && (
                           <div className="mt-2 flex items-start gap-2 text-sm text-slate-500">
                             <FileText className="w-4 h-4 mt-0.5 flex-shrink-0" />
                             <span className="line-clamp-2">
-                              {org.notes_history?.length > 0 
-                                ? org.notes_history[org.notes_history.length - 1].text 
-                                : org.notes}
+                              {org.latest_note ? org.latest_note.text : org.notes}
                             </span>
                           </div>
                         )}